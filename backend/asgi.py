@@ -7,9 +7,11 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
 django_asgi_app = get_asgi_application()
 
+from core.middleware import TokenAuthMiddleware  # noqa: E402  (needs the app registry)
+
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": URLRouter(
+    "websocket": TokenAuthMiddleware(URLRouter(
         __import__("core.routing").routing.websocket_urlpatterns
-    ),
+    )),
 })
@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from urllib.parse import urlparse
 
@@ -188,16 +191,106 @@ REST_FRAMEWORK = {
     ],
 }
 
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Serve swipes, recommendations and session polling from the native async
+# views in core/async_views.py (compare with: manage.py bench_async_views)
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
 ASGI_APPLICATION = "backend.asgi.application"
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer"
-    }
+
+# Channel layer profile. "memory" only reaches sockets in this process, so
+# more than one worker needs Redis: "pubsub" (channels_redis' Pub/Sub
+# layer, fire-and-forget like our match/presence events) or "redis" (the
+# list-based layer with per-channel capacity and expiry, much slower to
+# fan out to many sockets in one worker).
+# CHANNEL_REDIS_HOSTS is a comma-separated list of redis:// URLs; with
+# several, channels and groups are sharded across them by consistent hash.
+# Compare the profiles with: manage.py bench_channel_layers
+CHANNEL_LAYER = os.getenv("CHANNEL_LAYER", "pubsub" if REDIS_URL else "memory")
+CHANNEL_REDIS_HOSTS = [
+    url.strip() for url in os.getenv("CHANNEL_REDIS_HOSTS", REDIS_URL or "").split(",") if url.strip()
+]
+# Connections per host and worker process
+CHANNEL_REDIS_POOL_SIZE = int(os.getenv("CHANNEL_REDIS_POOL_SIZE", "50"))
+# Messages a channel buffers before group_send starts dropping for it
+CHANNEL_CAPACITY = int(os.getenv("CHANNEL_CAPACITY", "100"))
+
+CHANNEL_REDIS_BACKENDS = {
+    "redis": "channels_redis.core.RedisChannelLayer",
+    "pubsub": "channels_redis.pubsub.RedisPubSubChannelLayer",
 }
 
+if CHANNEL_LAYER == "memory":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+            "CONFIG": {"capacity": CHANNEL_CAPACITY},
+        }
+    }
+elif CHANNEL_LAYER in CHANNEL_REDIS_BACKENDS:
+    if not CHANNEL_REDIS_HOSTS:
+        raise ImproperlyConfigured(f"CHANNEL_LAYER={CHANNEL_LAYER} needs CHANNEL_REDIS_HOSTS or REDIS_URL")
+
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": CHANNEL_REDIS_BACKENDS[CHANNEL_LAYER],
+            "CONFIG": {
+                "hosts": [
+                    {"address": url, "max_connections": CHANNEL_REDIS_POOL_SIZE}
+                    for url in CHANNEL_REDIS_HOSTS
+                ],
+                "prefix": "flick",
+                **({"capacity": CHANNEL_CAPACITY} if CHANNEL_LAYER == "redis" else {}),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown CHANNEL_LAYER: {CHANNEL_LAYER}")
+
+# Shared cache: idempotency keys, the cached catalog and tag graph versions
+# and the match detection sets. (Session counters stay per process and are
+# flushed to the database.) A Redis channel layer means several
+# workers, so without REDIS_URL the cache goes to the first channel host
+# (only one: RedisCache reads the other locations as replicas).
+# Falls back to per-process memory when no Redis is configured.
+CACHE_REDIS_URL = REDIS_URL or (CHANNEL_REDIS_HOSTS[0] if CHANNEL_LAYER != "memory" else None)
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# uvicorn reads its worker count from WEB_CONCURRENCY
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Match detection sets (see core/services/likes.py): per-process sets only
+# see this worker's swipes, so several workers (WEB_CONCURRENCY, or a Redis
+# channel layer) share them through the cache instead. Several workers with
+# neither REDIS_URL nor CHANNEL_REDIS_HOSTS refuse to start (see start.sh)
+MULTIPLE_WORKERS = WEB_CONCURRENCY > 1 or CHANNEL_LAYER != "memory"
+LIKE_STORE_BACKEND = "cache" if CACHE_REDIS_URL or MULTIPLE_WORKERS else "local"
+
+if MULTIPLE_WORKERS and not CACHE_REDIS_URL:
+    raise ImproperlyConfigured(
+        "Several workers need a shared cache (idempotency, versions, match detection): set REDIS_URL"
+    )
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "https://flick-frontend-alpha.vercel.app",
 ]
 
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Retried mutations carry an Idempotency-Key (core/services/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
\ No newline at end of file
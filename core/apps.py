@@ -1,6 +1,20 @@
+import atexit
+
 from django.apps import AppConfig
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .services.analytics import analytics_queue
+        from .services.counters import session_counters
+        from .services.exposure import exposure_buffer
+
+        # Don't lose buffered exposure counts, swipe events or session
+        # counters when the worker shuts down
+        atexit.register(exposure_buffer.stop)
+        atexit.register(analytics_queue.stop)
+        atexit.register(session_counters.stop)
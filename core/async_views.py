@@ -0,0 +1,248 @@
+import json
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+
+from .middleware import get_token_user
+from .models import Session
+from .serializers import SessionDetailSerializer, SwipeRequestSerializer
+from .services.idempotency import async_idempotent
+from .services.metrics import Timeline
+from .services.swipe_events import apublish_swipes
+from .services.swipes import SwipeRejected, record_swipe
+from .views import recommendation_payload
+
+
+# -------------------------------------------------------------------
+# Native async versions of the hot-path views (settings.ASYNC_VIEWS)
+#
+# DRF's APIView only runs sync handlers, so these are plain Django
+# async views speaking the same contract: DRF token auth, the same
+# JSON bodies and status codes.
+# -------------------------------------------------------------------
+
+class AsyncAPIView(View):
+    """
+    Authenticates "Authorization: Token <key>" with the async ORM and
+    sets request.user before dispatching to an async handler. A body
+    that is not valid JSON is answered like DRF's parse error.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token auth only, like the DRF views
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        keyword, _, key = request.headers.get("Authorization", "").partition(" ")
+
+        if keyword.lower() != "token" or not key.strip():
+            return self.unauthorized("Authentication credentials were not provided.")
+
+        request.user = await get_token_user(key.strip())
+        if not request.user.is_authenticated:
+            return self.unauthorized("Invalid token.")
+
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ParseError as e:
+            return JsonResponse(
+                {"success": False, "errors": {"detail": e.detail}},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+    @staticmethod
+    def unauthorized(detail):
+        response = JsonResponse(
+            {"success": False, "errors": {"detail": detail}},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+        response["WWW-Authenticate"] = "Token"
+        return response
+
+    @staticmethod
+    def request_data(request):
+        if request.content_type == "application/json":
+            try:
+                return json.loads(request.body or b"{}")
+            except ValueError as e:
+                # Same detail as DRF's JSONParser
+                raise ParseError(f"JSON parse error - {e}")
+        return request.POST
+
+
+class AsyncSwipeCreateView(AsyncAPIView):
+    """
+    SwipeCreateView without the thread hop per group_send: the swipe
+    transaction runs in one sync_to_async call (the async ORM cannot hold
+    the session lock), the channel layer is awaited directly.
+    """
+
+    @async_idempotent
+    async def post(self, request):
+        serializer = SwipeRequestSerializer(data=self.request_data(request))
+
+        if not serializer.is_valid():
+            return JsonResponse(
+                {"success": False, "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        reaction = serializer.validated_data["reaction"]
+
+        try:
+            result = await sync_to_async(record_swipe)(
+                serializer.validated_data["session"],
+                request.user.id,
+                serializer.validated_data["movie"],
+                reaction,
+            )
+        except SwipeRejected as e:
+            return JsonResponse(
+                {"success": False, "error": e.error},
+                status=e.status_code
+            )
+        except Exception:
+            return JsonResponse(
+                {"success": False, "error": "Failed to record swipe"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        match_created = result.match_created
+        await apublish_swipes(get_channel_layer(), result.session, request.user.id, [result])
+
+        return JsonResponse(
+            {
+                "success": True,
+                "match": match_created,
+                "ask_to_end": match_created,
+                "message": "It's a match!" if match_created else "Swipe recorded",
+                "reaction": reaction,
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class AsyncRecommendationView(AsyncAPIView):
+    """
+    RecommendationView with the session checks on the async ORM. Ranking
+    and deck paging are sync code and run as one sync_to_async call.
+    """
+
+    async def get(self, request):
+        session_id = request.GET.get("session_id")
+
+        if not session_id:
+            return JsonResponse(
+                {"success": False, "error": "session_id is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        session = None
+        if session_id.isdigit():
+            session = await Session.objects.select_related("genre").filter(id=session_id).afirst()
+
+        if session is None:
+            return JsonResponse(
+                {"success": False, "error": "Session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if request.user.id not in (session.host_id, session.guest_id):
+            return JsonResponse(
+                {"success": False, "error": "Not part of this session"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not session.genre:
+            return JsonResponse(
+                {"success": False, "error": "Genre not selected yet"},
+                status=400
+            )
+
+        timeline = Timeline("recommendations")
+        data = await sync_to_async(recommendation_payload)(session, request.user, timeline)
+        timeline.finish()
+
+        if not request.user.is_staff:
+            return JsonResponse(data, status=status.HTTP_200_OK)
+
+        if request.GET.get("debug") == "timing":
+            data["timing"] = timeline.as_dict()
+
+        response = JsonResponse(data, status=status.HTTP_200_OK)
+        response["Server-Timing"] = timeline.server_timing()
+        return response
+
+
+class AsyncSessionDetailView(AsyncAPIView):
+    """
+    SessionDetailView on the async ORM.
+    """
+
+    async def get(self, request, session_id):
+        session = await Session.objects.select_related("genre", "stats").filter(id=session_id).afirst()
+
+        if session is None:
+            return JsonResponse(
+                {"success": False, "error": "Session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if request.user.id not in (session.host_id, session.guest_id):
+            return JsonResponse(
+                {"success": False, "error": "Not allowed"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = SessionDetailSerializer(session)
+        return JsonResponse(
+            {"success": True, "session": serializer.data},
+            status=status.HTTP_200_OK
+        )
+
+
+class AsyncSessionStatusView(AsyncAPIView):
+    """
+    SessionStatusView on the async ORM.
+    """
+
+    async def get(self, request):
+        code = request.GET.get("code")
+
+        if not code:
+            return JsonResponse(
+                {"success": False, "error": "Session code required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        session = await Session.objects.select_related("genre").filter(code=code).afirst()
+
+        if session is None:
+            return JsonResponse(
+                {"success": False, "exists": False},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return JsonResponse(
+            {
+                "success": True,
+                "exists": True,
+                "session": {
+                    "id": session.id,
+                    "host_joined": True,
+                    "guest_joined": session.guest_id is not None,
+                    "ended": session.ended_at is not None,
+                    "genre": {
+                        "id": session.genre.id,
+                        "name": session.genre.name
+                    } if session.genre else None,
+                },
+            },
+            status=status.HTTP_200_OK
+        )
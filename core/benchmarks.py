@@ -0,0 +1,221 @@
+"""
+Synthetic data and reporting helpers shared by the benchmark commands.
+"""
+import json
+import platform
+import random
+import subprocess
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import Genre, Match, Movie, MovieTag, MovieTagRelation, Session, Swipe, UserTasteVector
+from .services.scoring import MOOD_KEYWORDS, PACE_KEYWORDS, VIBE_KEYWORDS
+from .services.tagging import tag_movies
+from .services.taste import pack
+
+
+LANGUAGES = ["en", "en", "en", "hi", "hi", "ta", "te", "ml", "fr", "ko"]
+GENRES = [(28, "Action"), (35, "Comedy"), (18, "Drama"), (27, "Horror"), (10749, "Romance")]
+FILLER = "a story about people places and time in the city at night".split()
+
+VOCABULARY = sorted({
+    keyword
+    for table in (MOOD_KEYWORDS, PACE_KEYWORDS, VIBE_KEYWORDS)
+    for keywords in table.values()
+    for keyword in keywords
+})
+
+
+def build_catalog(movies, tags=40, swipes=200, taste_tags=20, seed=42):
+    """
+    Populates an empty database with a synthetic catalog and one active
+    session between two users. Returns (session, host, guest).
+    """
+    rng = random.Random(seed)
+
+    genres = Genre.objects.bulk_create([
+        Genre(tmdb_id=tmdb_id, name=name, industry="mixed") for tmdb_id, name in GENRES
+    ])
+    movie_tags = MovieTag.objects.bulk_create([
+        MovieTag(name=f"vibe-{i}") for i in range(tags)
+    ])
+
+    batch = []
+    for i in range(movies):
+        words = rng.sample(FILLER, 6) + rng.sample(VOCABULARY, rng.randint(0, 4))
+        rng.shuffle(words)
+        batch.append(Movie(
+            tmdb_id=i + 1,
+            title=f"Synthetic {i}",
+            overview=" ".join(words),
+            release_date=date(rng.randint(1970, 2025), rng.randint(1, 12), 1),
+            rating=round(rng.uniform(3, 9), 1),
+            original_language=rng.choice(LANGUAGES),
+            backdrop_path="/backdrop.jpg",
+            poster_path="/poster.jpg",
+        ))
+    created = Movie.objects.bulk_create(batch, batch_size=5000)
+
+    GenreLink = Movie.genres.through
+    TagLink = Movie.tags.through
+    GenreLink.objects.bulk_create([
+        GenreLink(movie_id=movie.id, genre_id=genre.id)
+        for movie in created
+        for genre in rng.sample(genres, rng.randint(1, 2))
+    ], batch_size=10000)
+    TagLink.objects.bulk_create([
+        TagLink(movie_id=movie.id, movietag_id=tag.id)
+        for movie in created
+        for tag in rng.sample(movie_tags, rng.randint(1, 3))
+    ], batch_size=10000)
+
+    # Keyword tags the way sync_movies derives them, plus a sparse tag graph
+    tag_movies(created)
+    MovieTagRelation.objects.bulk_create([
+        MovieTagRelation(from_tag=a, to_tag=b, weight=round(rng.uniform(0.1, 1), 2))
+        for a, b in zip(movie_tags, rng.sample(movie_tags, len(movie_tags)))
+        if a.id != b.id
+    ], ignore_conflicts=True)
+
+    host = User.objects.create_user("bench-host", "bench-host@example.com", "bench-pass")
+    guest = User.objects.create_user("bench-guest", "bench-guest@example.com", "bench-pass")
+    Token.objects.create(user=host)
+    Token.objects.create(user=guest)
+
+    session = Session.objects.create(
+        code="BENCH1",
+        host=host,
+        guest=guest,
+        genre=genres[0],
+        industry="mixed",
+        selected_languages=["en", "hi"],
+        host_preferences={"mood": ["exciting", "happy"], "pace": ["fast"], "vibe": [], "era": ["recent", "2010s"]},
+        guest_preferences={"mood": ["exciting"], "pace": ["fast", "balanced"], "vibe": ["escapist"], "era": ["recent"]},
+        preferences_set=True,
+    )
+
+    history = rng.sample(created, min(swipes, len(created) // 2))
+    Swipe.objects.bulk_create([
+        Swipe(session=session, user=user, movie=movie, reaction=rng.choice([Swipe.LIKE, Swipe.DISLIKE]))
+        for movie in history
+        for user in (host, guest)
+    ], batch_size=5000)
+
+    size = max(tag.id for tag in movie_tags) + 1
+    UserTasteVector.objects.bulk_create([
+        UserTasteVector(user=user, vector=pack(taste_vector(rng, movie_tags, taste_tags, size)))
+        for user in (host, guest)
+    ])
+
+    return session, host, guest
+
+
+def build_history(sessions, users=200, swipes=30, active=0.05, seed=42):
+    """
+    Adds `users` users and `sessions` past sessions between random pairs
+    of them on top of build_catalog(), each with `swipes` swipes per user
+    and a match for every movie both liked. An `active` share of the
+    sessions has not ended.
+    """
+    rng = random.Random(seed)
+    genre_ids = list(Genre.objects.values_list("id", flat=True))
+    movie_ids = list(Movie.objects.values_list("id", flat=True))
+
+    people = User.objects.bulk_create([
+        User(username=f"bench-user-{i}", email=f"bench-user-{i}@example.com")
+        for i in range(users)
+    ])
+
+    now = timezone.now()
+    history = Session.objects.bulk_create([
+        Session(
+            code=f"H{i:05d}",
+            host=host,
+            guest=guest,
+            genre_id=rng.choice(genre_ids),
+            ended_at=None if rng.random() < active else now - timedelta(days=rng.randint(0, 365)),
+        )
+        for i, (host, guest) in enumerate(rng.sample(people, 2) for _ in range(sessions))
+    ], batch_size=5000)
+
+    batch = []
+    matches = []
+    for session in history:
+        liked = {}
+        for movie_id in rng.sample(movie_ids, min(swipes, len(movie_ids))):
+            for user in (session.host, session.guest):
+                reaction = rng.choice([Swipe.LIKE, Swipe.DISLIKE])
+                batch.append(Swipe(session=session, user=user, movie_id=movie_id, reaction=reaction))
+                if reaction == Swipe.LIKE:
+                    liked[movie_id] = liked.get(movie_id, 0) + 1
+        matches.extend(
+            Match(session=session, movie_id=movie_id)
+            for movie_id, count in liked.items()
+            if count == 2
+        )
+
+        if len(batch) >= 10000:
+            Swipe.objects.bulk_create(batch)
+            batch = []
+
+    Swipe.objects.bulk_create(batch)
+    Match.objects.bulk_create(matches, batch_size=10000)
+
+    return people, history
+
+
+def taste_vector(rng, movie_tags, taste_tags, size):
+    vector = np.zeros(size)
+    for tag in rng.sample(movie_tags, min(taste_tags, len(movie_tags))):
+        vector[tag.id] = rng.randint(0, 20) - rng.randint(0, 10)
+    return vector
+
+
+def summarize(samples_ms):
+    """
+    p50/p95/p99/mean latency in milliseconds.
+    """
+    samples = np.asarray(samples_ms, dtype=float)
+    if not len(samples):
+        return {"n": 0}
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, results, **options):
+    """
+    Machine-readable results so runs can be diffed against each other.
+    """
+    payload = {
+        "benchmark": benchmark,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "database": connection.vendor,
+        "options": options,
+        "results": results,
+    }
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2)
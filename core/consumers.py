@@ -1,7 +1,16 @@
 import json
+import logging
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
 
+from .serializers import SwipeBatchItemSerializer
+from .services.swipe_events import apublish_swipes
+from .services.swipes import SwipeRejected, record_swipes
+
+
+logger = logging.getLogger(__name__)
 
 
 class MatchConsumer(AsyncWebsocketConsumer):
@@ -44,6 +53,71 @@ class MatchConsumer(AsyncWebsocketConsumer):
         )
 
 
+    async def receive(self, text_data=None, bytes_data=None):
+        """
+        Accepts {"type": "swipe", "movie": id, "reaction": "like"|"dislike",
+        "ref": any} and answers with a swipe_ack carrying the same ref.
+        """
+        try:
+            message = json.loads(text_data or "")
+        except ValueError:
+            return await self.send_error(None, "Invalid JSON")
+
+        if not isinstance(message, dict) or message.get("type") != "swipe":
+            return await self.send_error(None, "Unknown message type")
+
+        await self.receive_swipe(message)
+
+    async def receive_swipe(self, message):
+        ref = message.get("ref")
+
+        if not self.user or isinstance(self.user, AnonymousUser):
+            return await self.send_error(ref, "Authentication required", 401)
+
+        serializer = SwipeBatchItemSerializer(data=message)
+        if not serializer.is_valid():
+            return await self.send_error(ref, serializer.errors)
+
+        movie_id = serializer.validated_data["movie"]
+        reaction = serializer.validated_data["reaction"]
+
+        # The async ORM cannot open a transaction, and the swipe needs one
+        # around the session lock, so the write is a single thread hop
+        try:
+            session, (item,) = await database_sync_to_async(record_swipes)(
+                self.session_id, self.user.id, [(movie_id, reaction)]
+            )
+        except SwipeRejected as e:
+            return await self.send_error(ref, e.error, e.status_code)
+        except Exception:
+            # Keep the socket: it also carries matches and presence
+            logger.exception("Swipe failed in session %s", self.session_id)
+            return await self.send_error(ref, "Internal error", 500)
+
+        if not item.recorded:
+            return await self.send_error(ref, item.error, item.status_code)
+
+        await self.send(text_data=json.dumps({
+            "type": "swipe_ack",
+            "ref": ref,
+            "success": True,
+            "movie_id": movie_id,
+            "reaction": reaction,
+            "match": item.match_created,
+            "ask_to_end": item.match_created,
+        }))
+
+        await apublish_swipes(self.channel_layer, session, self.user.id, [item])
+
+    async def send_error(self, ref, error, status=400):
+        await self.send(text_data=json.dumps({
+            "type": "swipe_ack",
+            "ref": ref,
+            "success": False,
+            "error": error,
+            "status": status,
+        }))
+
     async def match_event(self, event):
         await self.send(text_data=json.dumps({
             "type": "match_event",
@@ -66,6 +140,21 @@ class MatchConsumer(AsyncWebsocketConsumer):
             "user_id": event["user_id"],
         }))
 
+    async def deck_ready_event(self, event):
+        # Prefetched cards belong to one user's deck; anonymous sockets
+        # get none (session ids are guessable)
+        if not self.user or isinstance(self.user, AnonymousUser):
+            return
+        if self.user.id != event["user_id"]:
+            return
+
+        await self.send(text_data=json.dumps({
+            "type": "deck_ready",
+            "session_id": event["session_id"],
+            "user_id": event["user_id"],
+            "movies": event["movies"],
+        }))
+
     async def partner_disconnected(self, event):
     # Do not notify the user who disconnected
         if self.channel_name == event.get("channel"):
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.services.partitions import (
+    ARCHIVE_BATCH_SESSIONS,
+    archivable_partitions,
+    archive_ended_sessions,
+    archive_partition,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move swipes of sessions ended or idle for more than --days into core_swipe_archive: "
+        "whole partitions on Postgres, row batches elsewhere"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Archive sessions ended or idle this long")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ARCHIVE_BATCH_SESSIONS,
+            help="Sessions per transaction when moving rows",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would move")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+
+        if is_partitioned():
+            # A partition is archived once every session in its range is over;
+            # younger ones wait for their partition to age out
+            eligible = archivable_partitions(cutoff)
+            for partition in eligible:
+                if options["dry_run"]:
+                    self.stdout.write(f"Would archive {partition.name}")
+                else:
+                    self.stdout.write(f"Archived {partition.name} as {archive_partition(partition)}")
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Swipe partitions archived: {0 if options['dry_run'] else len(eligible)}")
+            )
+            return
+
+        if options["dry_run"]:
+            self.stdout.write("Dry run: row archiving skipped")
+            return
+
+        moved = archive_ended_sessions(cutoff, batch_size=options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Swipes archived: {moved}")
+        )
@@ -0,0 +1,194 @@
+import json
+import re
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import setup_databases, teardown_databases
+
+from core.benchmarks import build_catalog, build_history, write_results
+from core.models import Match, Movie, MovieExposure, PairChemistryVector, Session, Swipe, UserTasteVector
+from core.services.candidates import candidate_index
+from core.services.catalog import get_catalog_version
+from core.services.cold_start import build_cold_start_decks
+from core.services.recommendations import candidate_ids, cold_start_rows, combine_preferences
+from core.services.signals import pair_ids
+from core.views import genres_with_languages
+
+# Rows a sequential scan may read before it is worth an index
+SMALL_TABLE_ROWS = 1000
+
+SQLITE_SCAN_RE = re.compile(r"\bSCAN (\w+)(?![\w ]*USING)")
+
+# Rebuilds that load a whole table on purpose: reported, never flagged
+FULL_LOADS = {"candidate_index"}
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN (ANALYZE, BUFFERS) every hot query shape in core/views.py against a "
+        "seeded throwaway database and flag sequential scans (meaningful on Postgres)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movies", type=int, default=5000, help="Catalog size")
+        parser.add_argument("--sessions", type=int, default=5000, help="Past sessions to seed")
+        parser.add_argument("--swipes", type=int, default=30, help="Swipes per user and session")
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=SMALL_TABLE_ROWS,
+            help="Ignore sequential scans reading fewer rows than this",
+        )
+        parser.add_argument("--output", default=None, help="Also write the plans as JSON")
+        parser.add_argument("--strict", action="store_true", help="Exit non-zero when a scan is flagged")
+
+    def handle(self, *args, **options):
+        # Never touch the real database
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            call_command("flush", verbosity=0, interactive=False)
+            self.stdout.write(
+                f"Seeding {options['movies']} movies and {options['sessions']} sessions..."
+            )
+            build_catalog(options["movies"])
+            people, history = build_history(options["sessions"], swipes=options["swipes"])
+            candidate_index.rebuild()
+            build_cold_start_decks()
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("VACUUM ANALYZE")
+
+            results = [
+                self.audit(name, source, queryset, options["min_rows"])
+                for name, source, queryset in self.query_shapes(people[0], history[len(history) // 2])
+            ]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        if options["output"]:
+            write_results(
+                options["output"], "index_audit", results,
+                movies=options["movies"],
+                sessions=options["sessions"],
+                swipes=options["swipes"],
+            )
+
+        self.print_table(results)
+
+        flagged = [row["query"] for row in results if row["seq_scans"]]
+        if flagged and options["strict"]:
+            raise CommandError(f"Sequential scans in: {', '.join(flagged)}")
+        self.stdout.write(self.style.SUCCESS(f"Queries audited: {len(results)}, flagged: {len(flagged)}"))
+
+    # -------------------------------------------------------------------
+    # Query shapes
+    # -------------------------------------------------------------------
+
+    @staticmethod
+    def query_shapes(user, session):
+        """
+        (name, where it runs, queryset) for every query on a request path.
+        """
+        swipe = Swipe.objects.filter(session=session).first()
+        pool = candidate_ids(session)
+        user_a_id, user_b_id = pair_ids(session)
+
+        return [
+            ("session_by_code", "SessionJoinView, SessionStatusView",
+             Session.objects.filter(code=session.code)),
+            ("active_session_by_code", "Session(code) of a session still running",
+             Session.objects.filter(code=session.code, ended_at__isnull=True)),
+            ("candidate_index", "CandidateIndex.rebuild (RecommendationView pool)",
+             Movie.genres.through.objects.values_list("genre_id", "movie_id", "movie__original_language")),
+            ("pool_features", "FeatureMatrix._load (RecommendationView pool)",
+             Movie.objects.filter(id__in=pool).values_list("id", "release_date", "rating", "tagged_at")),
+            ("pool_tag_names", "FeatureMatrix._load (RecommendationView pool)",
+             Movie.tags.through.objects.filter(movie_id__in=pool).values_list("movie_id", "movietag__name")),
+            ("cold_start_deck", "cold_start_deck (RecommendationView)",
+             cold_start_rows(session, user, combine_preferences(session), get_catalog_version())),
+            ("signal_tags", "load_ranking_signals",
+             Movie.tags.through.objects.filter(movie_id__in=pool).values_list("movie_id", "movietag_id")),
+            ("taste_vector", "load_ranking_signals",
+             UserTasteVector.objects.filter(user=user).values_list("vector", flat=True)),
+            ("chemistry_vector", "load_ranking_signals",
+             PairChemistryVector.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id)
+             .values_list("matches", flat=True)),
+            ("pool_exposure", "load_ranking_signals",
+             MovieExposure.objects.filter(movie_id__in=pool).values_list("movie_id", "exposed_count")),
+            ("session_swipes", "seen_store.refresh",
+             Swipe.objects.filter(session_id=session.id).values_list("id", "movie_id")),
+            ("session_likes", "load_session_likes",
+             Swipe.objects.filter(session_id=session.id).values_list("user_id", "movie_id", "reaction")),
+            ("session_matches", "load_session_likes, recommendation_payload",
+             Match.objects.filter(session_id=session.id).values_list("movie_id", flat=True)),
+            ("swipe_for_undo", "SwipeUndoView",
+             Swipe.objects.filter(user_id=swipe.user_id, session_id=session.id, movie_id=swipe.movie_id)),
+            ("match_exists", "SwipeUndoView",
+             Match.objects.filter(session_id=session.id, movie_id=swipe.movie_id)),
+            ("swipe_history", "SwipeHistoryView",
+             Swipe.objects.filter(user=user).select_related("movie", "session").order_by("-created_at")[:20]),
+            ("session_swipe_history", "SwipeHistoryView?session_id=",
+             Swipe.objects.filter(user=session.host_id, session_id=session.id)
+             .select_related("movie", "session").order_by("-created_at")[:20]),
+            ("match_history", "MatchListView",
+             Match.objects.filter(Q(session__host=user) | Q(session__guest=user))
+             .select_related("movie", "session").order_by("-created_at")),
+            ("genres_by_language", "GenreListView",
+             genres_with_languages(["hi", "ta", "te"])),
+        ]
+
+    # -------------------------------------------------------------------
+    # EXPLAIN
+    # -------------------------------------------------------------------
+
+    def audit(self, name, source, queryset, min_rows):
+        row = {"query": name, "source": source, "sql": str(queryset.query)}
+
+        if connection.vendor == "postgresql":
+            plan = json.loads(queryset.explain(format="json", analyze=True, buffers=True))[0]
+            top = plan["Plan"]
+            row["execution_ms"] = plan.get("Execution Time")
+            row["shared_hit"] = top.get("Shared Hit Blocks", 0)
+            row["shared_read"] = top.get("Shared Read Blocks", 0)
+            row["seq_scans"] = [
+                f"{node['Relation Name']} ({rows} rows)"
+                for node, rows in self.seq_scans(top)
+                if rows >= min_rows
+            ]
+            row["plan"] = plan
+        else:
+            # No ANALYZE outside Postgres: report full table scans from the plan
+            plan = queryset.explain()
+            row["seq_scans"] = SQLITE_SCAN_RE.findall(plan)
+            row["plan"] = plan
+
+        if name in FULL_LOADS:
+            row["full_load"], row["seq_scans"] = row["seq_scans"], []
+
+        return row
+
+    @classmethod
+    def seq_scans(cls, node):
+        """
+        (node, rows read) for every Seq Scan in a JSON plan.
+        """
+        if node["Node Type"] == "Seq Scan":
+            loops = node.get("Actual Loops", 1)
+            yield node, (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+
+        for child in node.get("Plans", []):
+            yield from cls.seq_scans(child)
+
+    def print_table(self, results):
+        header = f"{'query':<24}{'ms':>10}{'hit':>8}{'read':>8}  seq scans"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            scans = ", ".join(row["seq_scans"]) or ("full load" if row.get("full_load") else "-")
+            line = (
+                f"{row['query']:<24}{row.get('execution_ms', '-'):>10}"
+                f"{row.get('shared_hit', '-'):>8}{row.get('shared_read', '-'):>8}  {scans}"
+            )
+            self.stdout.write(self.style.WARNING(line) if row["seq_scans"] else line)
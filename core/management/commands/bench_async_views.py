@@ -0,0 +1,190 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from django.test.utils import setup_databases, teardown_databases
+from django.urls import include, path
+
+from core.benchmarks import build_catalog, summarize, write_results
+from core.models import Movie, Session, Swipe
+from core.services.analytics import analytics_queue
+from core.services.counters import session_counters
+from core.services.decks import deck_store
+from core.services.exposure import exposure_buffer
+from core.services.likes import like_store
+from core.services.seen import seen_store
+from core.urls import hot_path_urls
+
+
+class HotPathUrlConf:
+    """
+    ROOT_URLCONF with only the hot-path views, sync or async.
+    """
+
+    def __init__(self, async_views):
+        self.urlpatterns = [path("api/", include(hot_path_urls(async_views)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the sync and async hot-path views under concurrent "
+        "load through the ASGI handler (uses a throwaway test database; run against "
+        "Postgres for meaningful swipe numbers, SQLite serializes writers)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movies", type=int, default=2000, help="Catalog size")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and mode")
+        parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+        parser.add_argument("--output", default="bench_async_views.json")
+
+    def handle(self, *args, **options):
+        # Never touch the real database
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            call_command("flush", verbosity=0, interactive=False)
+            self.reset_caches()
+            self.stdout.write(f"Building catalog of {options['movies']} movies...")
+            session, host, guest = build_catalog(options["movies"])
+
+            results = []
+            for async_views in (False, True):
+                mode = "async" if async_views else "sync"
+                with override_settings(ROOT_URLCONF=HotPathUrlConf(async_views)):
+                    for row in async_to_sync(self.run_mode)(mode, session, host, guest, options):
+                        row["mode"] = mode
+                        results.append(row)
+                        self.stdout.write(
+                            f"  {mode} {row['endpoint']}: {row['throughput_rps']} req/s, "
+                            f"p95 {row['p95_ms']} ms, {row['errors']} errors"
+                        )
+                self.reset_caches()
+        finally:
+            exposure_buffer.flush()
+            analytics_queue.flush()
+            teardown_databases(old_config, verbosity=0)
+
+        write_results(
+            options["output"], "async_views", results,
+            movies=options["movies"],
+            requests=options["requests"],
+            concurrency=options["concurrency"],
+        )
+        self.print_table(results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    # -------------------------------------------------------------------
+    # One mode (sync or async views)
+    # -------------------------------------------------------------------
+
+    async def run_mode(self, mode, session, host, guest, options):
+        requests = options["requests"]
+        concurrency = options["concurrency"]
+        client = AsyncClient()
+        # Per request: AsyncClient(headers=...) does not reach the ASGI scope
+        auth = {"Authorization": f"Token {host.auth_token.key}"}
+
+        # Swipes spread over one session per worker, as real traffic is
+        sessions = await self.swipe_sessions(mode, session, host, guest, concurrency)
+        movie_ids = await self.unswiped_movies(requests)
+
+        async def status(worker, i):
+            return await client.get(f"/api/sessions/status/?code={session.code}", headers=auth, secure=True)
+
+        async def detail(worker, i):
+            return await client.get(f"/api/sessions/{session.id}/", headers=auth, secure=True)
+
+        async def recommendations(worker, i):
+            return await client.get(f"/api/recommendations/?session_id={session.id}", headers=auth, secure=True)
+
+        async def swipe(worker, i):
+            return await client.post(
+                "/api/swipes/",
+                {"session": sessions[worker].id, "movie": movie_ids[i], "reaction": Swipe.DISLIKE},
+                content_type="application/json",
+                headers=auth,
+                secure=True,
+            )
+
+        # Reads are warmed up first (imports, indexes, the deck)
+        endpoints = [
+            ("session_status", status, True),
+            ("session_detail", detail, True),
+            ("recommendations", recommendations, True),
+            ("swipe", swipe, False),
+        ]
+
+        rows = []
+        for name, call, warm_up in endpoints:
+            if warm_up:
+                await call(0, 0)
+            row = {"endpoint": name}
+            row.update(await self.load(call, requests, concurrency))
+            rows.append(row)
+        return rows
+
+    async def load(self, call, requests, concurrency):
+        latencies = []
+        errors = 0
+        pending = iter(range(requests))
+
+        async def worker(number):
+            nonlocal errors
+            for i in pending:
+                start = time.perf_counter()
+                response = await call(number, i)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(number) for number in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        stats = summarize(latencies)
+        stats["throughput_rps"] = round(requests / elapsed, 1)
+        stats["errors"] = errors
+        return stats
+
+    # -------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------
+
+    @staticmethod
+    async def swipe_sessions(mode, session, host, guest, count):
+        return [
+            await Session.objects.acreate(
+                code=f"{mode[0].upper()}{number:05d}",
+                host=host,
+                guest=guest,
+                genre_id=session.genre_id,
+            )
+            for number in range(count)
+        ]
+
+    @staticmethod
+    async def unswiped_movies(count):
+        return [
+            movie_id
+            async for movie_id in Movie.objects.order_by("-id").values_list("id", flat=True)[:count]
+        ]
+
+    @staticmethod
+    def reset_caches():
+        deck_store.clear()
+        seen_store.clear()
+        like_store.clear()
+        session_counters.clear()
+
+    def print_table(self, results):
+        header = f"{'mode':>6}  {'endpoint':<18}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            self.stdout.write(
+                f"{row['mode']:>6}  {row['endpoint']:<18}{row['throughput_rps']:>9}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['errors']:>8}"
+            )
@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.benchmarks import summarize, write_results
+
+
+LAYERS = {
+    "memory": "channels.layers.InMemoryChannelLayer",
+    "redis": "channels_redis.core.RedisChannelLayer",
+    "pubsub": "channels_redis.pubsub.RedisPubSubChannelLayer",
+}
+
+# Keys of the Redis layers are namespaced so flush() never touches the app's
+BENCH_PREFIX = "flick-bench"
+
+
+def make_layer(profile, hosts, pool_size, capacity):
+    """
+    A channel layer configured like backend/settings.py does for `profile`.
+    """
+    if profile == "memory":
+        return import_string(LAYERS[profile])(capacity=capacity)
+
+    config = {
+        "hosts": [{"address": url, "max_connections": pool_size} for url in hosts],
+        "prefix": BENCH_PREFIX,
+    }
+    if profile == "redis":
+        config["capacity"] = capacity
+    return import_string(LAYERS[profile])(**config)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure group_send fan-out latency on the in-memory and Redis channel layers: "
+        "one group per session, every member channel must receive every event"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="memory,redis,pubsub", help="Comma-separated: memory, redis, pubsub")
+        parser.add_argument(
+            "--hosts",
+            default=",".join(settings.CHANNEL_REDIS_HOSTS) or "redis://localhost:6379/0",
+            help="Comma-separated redis:// URLs; several are sharded like CHANNEL_REDIS_HOSTS",
+        )
+        parser.add_argument("--groups", type=int, default=100, help="Session groups")
+        parser.add_argument("--members", type=int, default=2, help="Sockets per group")
+        parser.add_argument("--messages", type=int, default=20, help="group_send calls per group")
+        parser.add_argument("--pool-size", type=int, default=settings.CHANNEL_REDIS_POOL_SIZE)
+        parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for delivery")
+        parser.add_argument("--output", default="bench_channel_layers.json")
+
+    def handle(self, *args, **options):
+        profiles = [profile for profile in options["profiles"].split(",") if profile]
+        unknown = set(profiles) - set(LAYERS)
+        if unknown:
+            raise CommandError(f"Unknown profiles: {', '.join(sorted(unknown))}")
+
+        hosts = [url for url in options["hosts"].split(",") if url]
+        # Every member buffers one round of messages at most
+        capacity = max(settings.CHANNEL_CAPACITY, options["messages"])
+
+        results = []
+        for profile in profiles:
+            layer = make_layer(profile, hosts, options["pool_size"], capacity)
+            try:
+                row = async_to_sync(self.fan_out)(layer, options)
+            except RedisConnectionError as e:
+                self.stdout.write(self.style.WARNING(f"  {profile}: skipped ({e})"))
+                continue
+
+            row["profile"] = profile
+            row["hosts"] = 0 if profile == "memory" else len(hosts)
+            results.append(row)
+            self.stdout.write(
+                f"  {profile}: {row['throughput_mps']} msg/s, "
+                f"delivery p95 {row['delivery']['p95_ms']} ms, {row['undelivered']} undelivered"
+            )
+
+        write_results(
+            options["output"], "channel_layers", results,
+            groups=options["groups"],
+            members=options["members"],
+            messages=options["messages"],
+            pool_size=options["pool_size"],
+        )
+        self.print_table(results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    # -------------------------------------------------------------------
+    # One layer
+    # -------------------------------------------------------------------
+
+    async def fan_out(self, layer, options):
+        groups = [f"bench_session_{number}" for number in range(options["groups"])]
+        messages = options["messages"]
+
+        members = {}
+        for group in groups:
+            members[group] = [await layer.new_channel() for _ in range(options["members"])]
+            for channel in members[group]:
+                await layer.group_add(group, channel)
+
+        send_ms = []
+        delivery_ms = []
+
+        async def receiver(channel):
+            for _ in range(messages):
+                message = await layer.receive(channel)
+                delivery_ms.append((time.perf_counter() - message["sent_at"]) * 1000)
+
+        async def sender(group):
+            for number in range(messages):
+                start = time.perf_counter()
+                await layer.group_send(group, {"type": "match_event", "number": number, "sent_at": start})
+                send_ms.append((time.perf_counter() - start) * 1000)
+
+        receivers = [
+            asyncio.ensure_future(receiver(channel))
+            for channels in members.values()
+            for channel in channels
+        ]
+        # Let Pub/Sub subscriptions settle before the clock starts
+        await asyncio.sleep(0.1)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(sender(group) for group in groups))
+        _, pending = await asyncio.wait(receivers, timeout=options["timeout"])
+        elapsed = time.perf_counter() - start
+
+        for task in pending:
+            task.cancel()
+        for group, channels in members.items():
+            for channel in channels:
+                await layer.group_discard(group, channel)
+        await layer.flush()
+
+        expected = len(receivers) * messages
+        return {
+            "group_send": summarize(send_ms),
+            "delivery": summarize(delivery_ms),
+            "throughput_mps": round(len(delivery_ms) / elapsed, 1),
+            # Still in flight when --timeout ran out
+            "undelivered": expected - len(delivery_ms),
+        }
+
+    def print_table(self, results):
+        header = f"{'profile':<10}{'hosts':>6}{'send p50':>10}{'send p95':>10}{'deliv p50':>11}{'deliv p95':>11}{'deliv p99':>11}{'msg/s':>10}{'undelivered':>13}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            send, delivery = row["group_send"], row["delivery"]
+            self.stdout.write(
+                f"{row['profile']:<10}{row['hosts']:>6}{send.get('p50_ms', '-'):>10}{send.get('p95_ms', '-'):>10}"
+                f"{delivery.get('p50_ms', '-'):>11}{delivery.get('p95_ms', '-'):>11}{delivery.get('p99_ms', '-'):>11}"
+                f"{row['throughput_mps']:>10}{row['undelivered']:>13}"
+            )
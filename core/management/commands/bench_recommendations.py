@@ -0,0 +1,181 @@
+import time
+import tracemalloc
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+
+from core.benchmarks import build_catalog, summarize, write_results
+from core.services.catalog import bump_catalog_version, bump_tag_graph_version
+from core.services.counters import session_counters
+from core.services.decks import deck_store
+from core.services.exposure import exposure_buffer
+from core.services.likes import like_store
+from core.services.scoring import feature_matrix
+from core.services.seen import seen_store
+
+
+class Command(BaseCommand):
+    help = "Benchmark recommendations, swipes and matches on synthetic catalogs (uses a throwaway test database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="1000,10000,100000",
+            help="Comma-separated catalog sizes",
+        )
+        parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint")
+        parser.add_argument("--swipes", type=int, default=200, help="Swipe history per user")
+        parser.add_argument("--tags", type=int, default=40, help="Extra vibe tags in the catalog")
+        parser.add_argument("--output", default="bench_recommendations.json")
+
+    def handle(self, *args, **options):
+        scales = [int(scale) for scale in options["scales"].split(",") if scale]
+
+        # Never touch the real database
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = []
+            for scale in scales:
+                self.stdout.write(f"Building catalog of {scale} movies...")
+                results.extend(self.run_scale(scale, options))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        write_results(
+            options["output"], "recommendations", results,
+            scales=scales,
+            requests=options["requests"],
+            swipes=options["swipes"],
+            tags=options["tags"],
+        )
+        self.print_table(results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    # -------------------------------------------------------------------
+    # One catalog size
+    # -------------------------------------------------------------------
+
+    def run_scale(self, scale, options):
+        call_command("flush", verbosity=0, interactive=False)
+        self.reset_caches()
+
+        session, host, guest = build_catalog(
+            scale, tags=options["tags"], swipes=options["swipes"]
+        )
+        self.reset_caches()
+
+        clients = {user.id: self.client_for(user) for user in (host, guest)}
+        host_client = clients[host.id]
+        url = f"/api/recommendations/?session_id={session.id}"
+        requests = options["requests"]
+
+        def cold():
+            deck_store.clear()
+            return host_client.get(url, secure=True)
+
+        def warm():
+            return host_client.get(url, secure=True)
+
+        # Both partners swipe the same card so every other call also matches
+        pending = []
+
+        def swipe():
+            if not pending:
+                movies = host_client.get(url, secure=True).json().get("movies", [])
+                pending.extend(movie["id"] for movie in movies)
+                if not pending:
+                    return None
+            movie_id = pending.pop()
+            response = None
+            for client in clients.values():
+                response = client.post(
+                    "/api/swipes/",
+                    {"session": session.id, "movie": movie_id, "reaction": "like"},
+                    secure=True,
+                )
+            return response
+
+        def matches():
+            return host_client.get("/api/matches/", secure=True)
+
+        endpoints = [
+            ("recommendations_cold", cold),
+            ("recommendations_warm", warm),
+            ("swipe_pair", swipe),
+            ("matches", matches),
+        ]
+
+        rows = []
+        for name, call in endpoints:
+            row = {"scale": scale, "endpoint": name}
+            row.update(self.measure(call, requests))
+            row["peak_memory_kb"] = self.peak_memory(call)
+            rows.append(row)
+            self.stdout.write(f"  {name}: p50 {row['p50_ms']} ms, {row['queries_mean']} queries")
+
+        exposure_buffer.flush()
+        return rows
+
+    def measure(self, call, requests):
+        call()  # warm up imports and lazily built indexes
+
+        latencies = []
+        queries = []
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = call()
+                latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+
+            if response is not None and response.status_code >= 400:
+                self.stderr.write(f"    HTTP {response.status_code}: {response.content[:200]!r}")
+
+        stats = summarize(latencies)
+        stats["queries_mean"] = round(sum(queries) / len(queries), 1)
+        stats["queries_max"] = max(queries)
+        return stats
+
+    def peak_memory(self, call):
+        """
+        Measured in a separate pass: tracemalloc slows every allocation.
+        """
+        tracemalloc.start()
+        try:
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return round(peak / 1024, 1)
+
+    # -------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------
+
+    @staticmethod
+    def client_for(user):
+        return Client(HTTP_AUTHORIZATION=f"Token {user.auth_token.key}")
+
+    @staticmethod
+    def reset_caches():
+        bump_catalog_version()
+        bump_tag_graph_version()
+        deck_store.clear()
+        seen_store.clear()
+        like_store.clear()
+        session_counters.clear()
+        feature_matrix.invalidate()
+
+    def print_table(self, results):
+        header = f"{'scale':>8}  {'endpoint':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'peak KB':>10}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in results:
+            self.stdout.write(
+                f"{row['scale']:>8}  {row['endpoint']:<22}"
+                f"{row.get('p50_ms', 0):>9}{row.get('p95_ms', 0):>9}{row.get('p99_ms', 0):>9}"
+                f"{row['queries_mean']:>9}{row['peak_memory_kb']:>10}"
+            )
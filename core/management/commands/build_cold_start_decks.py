@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from core.services.cold_start import (
+    COLD_START_LOOKBACK_DAYS,
+    COLD_START_SIZE,
+    build_cold_start_decks,
+)
+
+
+class Command(BaseCommand):
+    help = "Precompute top-N decks for new sessions per genre, language set and preference bucket"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=COLD_START_SIZE, help="Movies per deck")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=COLD_START_LOOKBACK_DAYS,
+            help="Also build buckets used by sessions created in the last N days",
+        )
+
+    def handle(self, *args, **options):
+        built = build_cold_start_decks(size=options["size"], days=options["days"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Cold start decks built: {built}")
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from core.services.partitions import (
+    SWIPE_PARTITIONS_AHEAD,
+    ensure_swipe_partitions,
+    is_partitioned,
+)
+
+
+class Command(BaseCommand):
+    help = "Create core_swipe partitions ahead of the newest session (Postgres, run on deploy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=SWIPE_PARTITIONS_AHEAD,
+            help="Empty session id ranges to keep ready past the newest session",
+        )
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write("core_swipe is not partitioned on this database; nothing to do")
+            return
+
+        created = ensure_swipe_partitions(ahead=options["ahead"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Swipe partitions created: {len(created)}")
+        )
@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
 from core.models import Movie, Genre
 from core.services.tmdb import get_popular_movies
+from core.services.catalog import bump_catalog_version
+from core.services.cold_start import build_cold_start_decks
+from core.services.tagging import keyword_tags, tag_movies
 
 
 
@@ -9,10 +12,12 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         movies_created = 0
+        tags = keyword_tags()
 
         # Fetch multiple pages for a larger pool
         for page in range(1, 499):  # pages 1–5
             tmdb_data = get_popular_movies(page=page)
+            synced = []
 
             for item in tmdb_data.get("results", []):
                 movie, created = Movie.objects.update_or_create(
@@ -36,8 +41,18 @@ class Command(BaseCommand):
                 if created:
                     movies_created += 1
 
+                synced.append(movie)
+
+            # Derive keyword/vibe tags once, at sync time
+            tag_movies(synced, tags)
+
+        # Running servers rebuild their candidate index on the next request
+        bump_catalog_version()
+        decks_built = build_cold_start_decks()
+
         self.stdout.write(
             self.style.SUCCESS(
-                f"Movies synced successfully. New movies created: {movies_created}"
+                f"Movies synced successfully. New movies created: {movies_created}. "
+                f"Cold start decks rebuilt: {decks_built}"
             )
         )
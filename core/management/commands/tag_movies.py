@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from core.models import Movie
+from core.services.catalog import bump_catalog_version
+from core.services.cold_start import build_cold_start_decks
+from core.services.tagging import keyword_tags, tag_movies
+
+
+class Command(BaseCommand):
+    help = "Backfill keyword/vibe MovieTag links for synced movies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Retag every movie, not only the ones never tagged",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        movies = Movie.objects.only("id", "title", "overview").order_by("id")
+        if not options["all"]:
+            movies = movies.filter(tagged_at__isnull=True)
+
+        tags = keyword_tags()
+        batch_size = options["batch_size"]
+        tagged = 0
+        links = 0
+        last_id = 0
+
+        while True:
+            batch = list(movies.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            links += tag_movies(batch, tags)
+            tagged += len(batch)
+            last_id = batch[-1].id
+
+        if tagged:
+            bump_catalog_version()
+            build_cold_start_decks()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Movies tagged: {tagged}. Tag links written: {links}")
+        )
@@ -0,0 +1,44 @@
+from urllib.parse import parse_qs
+
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authtoken.models import Token
+
+
+async def get_token_user(key):
+    """
+    The active user owning a DRF token, else AnonymousUser.
+    """
+    token = await Token.objects.select_related("user").filter(key=key).afirst()
+    if token is None or not token.user.is_active:
+        return AnonymousUser()
+    return token.user
+
+
+class TokenAuthMiddleware:
+    """
+    Sets scope["user"] for WebSocket connections from the same DRF token
+    the HTTP API uses, passed as ?token=<key> (browsers cannot set headers
+    on a WebSocket) or as an "Authorization: Token <key>" header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        key = self.token_key(scope)
+        scope = dict(scope, user=await get_token_user(key) if key else AnonymousUser())
+        return await self.app(scope, receive, send)
+
+    @staticmethod
+    def token_key(scope):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        if query.get("token"):
+            return query["token"][0]
+
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                keyword, _, key = value.decode().partition(" ")
+                if keyword.lower() == "token":
+                    return key.strip()
+
+        return None
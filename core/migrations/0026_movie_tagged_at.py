@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_remove_movie_streaming_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='tagged_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
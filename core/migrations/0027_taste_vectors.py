@@ -0,0 +1,94 @@
+# Generated by Django 5.2.9 on 2026-10-17 23:05
+
+import django.db.models.deletion
+import numpy as np
+from django.conf import settings
+from django.db import migrations, models
+
+
+def pack(counts):
+    """
+    {tag_id: value} -> float32 bytes indexed by tag id.
+    """
+    vector = np.zeros(max(counts, default=-1) + 1, dtype="<f4")
+    for tag_id, value in counts.items():
+        vector[tag_id] = value
+    return vector.tobytes()
+
+
+def backfill_vectors(apps, schema_editor):
+    UserTasteSignal = apps.get_model("core", "UserTasteSignal")
+    SessionChemistry = apps.get_model("core", "SessionChemistry")
+    MovieTag = apps.get_model("core", "MovieTag")
+    UserTasteVector = apps.get_model("core", "UserTasteVector")
+    PairChemistryVector = apps.get_model("core", "PairChemistryVector")
+
+    taste = {}
+    for user_id, tag_id, likes, dislikes in UserTasteSignal.objects.values_list(
+        "user_id", "tag_id", "like_count", "dislike_count"
+    ).iterator():
+        taste.setdefault(user_id, {})[tag_id] = likes - dislikes
+
+    UserTasteVector.objects.bulk_create([
+        UserTasteVector(user_id=user_id, vector=pack(counts))
+        for user_id, counts in taste.items()
+    ], batch_size=1000)
+
+    # Chemistry rows are keyed by tag name; names with no MovieTag are dropped
+    tag_ids = dict(MovieTag.objects.values_list("name", "id"))
+    matches = {}
+    swipes = {}
+    for user_a_id, user_b_id, name, match_count, swipe_count in SessionChemistry.objects.values_list(
+        "user_a_id", "user_b_id", "tag", "match_count", "swipe_count"
+    ).iterator():
+        tag_id = tag_ids.get(name)
+        if tag_id is None:
+            continue
+        pair = (user_a_id, user_b_id)
+        matches.setdefault(pair, {})[tag_id] = match_count
+        swipes.setdefault(pair, {})[tag_id] = swipe_count
+
+    PairChemistryVector.objects.bulk_create([
+        PairChemistryVector(
+            user_a_id=user_a_id,
+            user_b_id=user_b_id,
+            matches=pack(matches[(user_a_id, user_b_id)]),
+            swipes=pack(swipes[(user_a_id, user_b_id)]),
+        )
+        for user_a_id, user_b_id in matches
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_movie_tagged_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTasteVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vector', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='taste_vector', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PairChemistryVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('matches', models.BinaryField(default=b'')),
+                ('swipes', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chemistry_vectors_as_a', to=settings.AUTH_USER_MODEL)),
+                ('user_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chemistry_vectors_as_b', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user_a', 'user_b')},
+            },
+        ),
+        migrations.RunPython(backfill_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_taste_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ColdStartDeck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('languages_key', models.CharField(max_length=100)),
+                ('preferences_key', models.CharField(max_length=40)),
+                ('movie_ids', models.JSONField(default=list)),
+                ('pool_size', models.PositiveIntegerField(default=0)),
+                ('catalog_version', models.PositiveIntegerField()),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.genre')),
+            ],
+            options={
+                'unique_together': {('genre', 'languages_key', 'preferences_key')},
+            },
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.9 on 2026-10-17 23:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The same widths core/services/partitions.py creates and archives by
+PARTITION_SESSIONS = getattr(settings, "SWIPE_PARTITION_SESSIONS", 50000)
+PARTITIONS_AHEAD = getattr(settings, "SWIPE_PARTITIONS_AHEAD", 2)
+
+
+def partition_swipes(apps, schema_editor):
+    """
+    Postgres only: rebuilds core_swipe as a table partitioned by session_id
+    range (every swipe query is session-scoped, so they prune to one
+    partition) and core_swipe_archive as its partitioned twin, which
+    archive_swipes attaches detached partitions to.
+
+    Unique constraints on a partitioned table must include the partition
+    key, so the primary key becomes (id, session_id); ids still come from
+    one sequence.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Session = apps.get_model("core", "Session")
+    last = Session.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    upper = (last // PARTITION_SESSIONS + 1 + PARTITIONS_AHEAD) * PARTITION_SESSIONS
+
+    statements = [
+        "ALTER TABLE core_swipe RENAME TO core_swipe_unpartitioned",
+        "CREATE TABLE core_swipe (LIKE core_swipe_unpartitioned) PARTITION BY RANGE (session_id)",
+        "CREATE SEQUENCE core_swipe_partitioned_id_seq OWNED BY core_swipe.id",
+        "ALTER TABLE core_swipe ALTER COLUMN id SET DEFAULT nextval('core_swipe_partitioned_id_seq')",
+        "ALTER TABLE core_swipe ADD CONSTRAINT core_swipe_partitioned_pkey PRIMARY KEY (id, session_id)",
+        "ALTER TABLE core_swipe ADD CONSTRAINT core_swipe_partitioned_user_session_movie_uniq "
+        "UNIQUE (user_id, session_id, movie_id)",
+        "CREATE INDEX core_swipe_partitioned_session_id ON core_swipe (session_id)",
+        "CREATE INDEX core_swipe_partitioned_user_id ON core_swipe (user_id)",
+        "CREATE INDEX core_swipe_partitioned_movie_id ON core_swipe (movie_id)",
+        "ALTER TABLE core_swipe ADD CONSTRAINT core_swipe_partitioned_session_id_fk "
+        "FOREIGN KEY (session_id) REFERENCES core_session (id) DEFERRABLE INITIALLY DEFERRED",
+        "ALTER TABLE core_swipe ADD CONSTRAINT core_swipe_partitioned_user_id_fk "
+        "FOREIGN KEY (user_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED",
+        "ALTER TABLE core_swipe ADD CONSTRAINT core_swipe_partitioned_movie_id_fk "
+        "FOREIGN KEY (movie_id) REFERENCES core_movie (id) DEFERRABLE INITIALLY DEFERRED",
+        # Catches sessions beyond the last range until partition_swipes runs
+        "CREATE TABLE core_swipe_default PARTITION OF core_swipe DEFAULT",
+        *[
+            f"CREATE TABLE core_swipe_p{start}_{start + PARTITION_SESSIONS} PARTITION OF core_swipe "
+            f"FOR VALUES FROM ({start}) TO ({start + PARTITION_SESSIONS})"
+            for start in range(0, upper, PARTITION_SESSIONS)
+        ],
+        "INSERT INTO core_swipe SELECT * FROM core_swipe_unpartitioned",
+        "SELECT setval('core_swipe_partitioned_id_seq', "
+        "COALESCE((SELECT MAX(id) FROM core_swipe_unpartitioned), 0) + 1, false)",
+        "DROP TABLE core_swipe_unpartitioned",
+        "DROP TABLE core_swipe_archive",
+        "CREATE TABLE core_swipe_archive (LIKE core_swipe) PARTITION BY RANGE (session_id)",
+        "ALTER TABLE core_swipe_archive ADD CONSTRAINT core_swipe_archive_pkey PRIMARY KEY (id, session_id)",
+        "CREATE INDEX core_swipe_archive_session_id ON core_swipe_archive (session_id)",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def unpartition_swipes(apps, schema_editor):
+    """
+    Postgres only: rebuilds core_swipe as a plain table with the swipes of
+    every partition, archived ones included. Archived rows have no foreign
+    keys, so those whose session, user or movie has since been deleted
+    are dropped.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    columns = "id, session_id, user_id, movie_id, reaction, created_at"
+    schema_editor.execute("ALTER TABLE core_swipe RENAME TO core_swipe_partitioned")
+    schema_editor.create_model(apps.get_model("core", "Swipe"))
+
+    statements = [
+        f"INSERT INTO core_swipe ({columns}) SELECT {columns} FROM core_swipe_partitioned",
+        f"INSERT INTO core_swipe ({columns}) SELECT {columns} FROM core_swipe_archive a "
+        "WHERE EXISTS (SELECT 1 FROM core_session s WHERE s.id = a.session_id) "
+        "AND EXISTS (SELECT 1 FROM auth_user u WHERE u.id = a.user_id) "
+        "AND EXISTS (SELECT 1 FROM core_movie m WHERE m.id = a.movie_id)",
+        "SELECT setval(pg_get_serial_sequence('core_swipe', 'id'), "
+        "COALESCE((SELECT MAX(id) FROM core_swipe), 0) + 1, false)",
+        # Its partitions and id sequence go with it. CASCADE drops the id
+        # defaults archived partitions took from that sequence; the
+        # CreateModel reversal then drops core_swipe_archive itself
+        "DROP TABLE core_swipe_partitioned CASCADE",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_coldstartdeck'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSwipe',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('session_id', models.BigIntegerField(db_index=True)),
+                ('user_id', models.IntegerField()),
+                ('movie_id', models.BigIntegerField()),
+                ('reaction', models.CharField(choices=[('like', 'Like'), ('dislike', 'Dislike')], max_length=10)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'core_swipe_archive',
+            },
+        ),
+        migrations.RunPython(partition_swipes, unpartition_swipes),
+    ]
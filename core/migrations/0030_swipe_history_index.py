@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-17 23:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_swipe_partitions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swipe',
+            index=models.Index(fields=['user', '-created_at'], name='swipe_user_recent_idx'),
+        ),
+    ]
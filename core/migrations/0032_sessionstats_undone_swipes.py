@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionstats',
+            name='undone_swipes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 00:10
+
+from django.db import migrations, models
+
+
+def drop_decks(apps, schema_editor):
+    # Keyed by the old joined languages, which may not fit the new column;
+    # build_cold_start_decks recreates them
+    apps.get_model("core", "ColdStartDeck").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_sessionstats_undone_swipes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_decks, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='coldstartdeck',
+            name='languages_key',
+            field=models.CharField(max_length=40),
+        ),
+    ]
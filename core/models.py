@@ -142,6 +142,8 @@ class Movie(models.Model):
         blank=True,
         db_index=True
     )
+    # When keyword/vibe tags were last derived from the overview
+    tagged_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.title
@@ -171,11 +173,33 @@ class Swipe(models.Model):
 
     class Meta:
         unique_together = ("user", "session", "movie")
+        indexes = [
+            # Swipe history: newest first per user, across partitions
+            models.Index(fields=["user", "-created_at"], name="swipe_user_recent_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} {self.reaction} {self.movie.title}"
 
 
+class ArchivedSwipe(models.Model):
+    """
+    Swipes of long-ended sessions, moved out of core_swipe by
+    `manage.py archive_swipes`. Same columns as Swipe so that whole
+    Postgres partitions can be attached here; plain ids instead of
+    foreign keys so archived rows never block deletes.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    session_id = models.BigIntegerField(db_index=True)
+    user_id = models.IntegerField()
+    movie_id = models.BigIntegerField()
+    reaction = models.CharField(max_length=10, choices=Swipe.REACTION_CHOICES)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "core_swipe_archive"
+
+
 # -------------------------------------------------
 # Match Model
 # -------------------------------------------------
@@ -220,6 +244,8 @@ class SessionStats(models.Model):
     )
     total_swipes = models.PositiveIntegerField(default=0)
     total_matches = models.PositiveIntegerField(default=0)
+    # Undone swipes are deleted but still count towards total_swipes
+    undone_swipes = models.PositiveIntegerField(default=0)
     duration_ms = models.PositiveIntegerField(null=True, blank=True)
     ended_by = models.CharField(
         max_length=20,
@@ -288,6 +314,88 @@ class SessionChemistry(models.Model):
     def __str__(self):
         return f"{self.user_a} + {self.user_b} → {self.tag}"
 
+class UserTasteVector(models.Model):
+    """
+    A user's net taste (likes - dislikes) for every tag, packed as
+    float32 and indexed by MovieTag id. One row per user.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name="taste_vector"
+    )
+
+    vector = models.BinaryField(default=b"")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Taste vector for {self.user}"
+
+class PairChemistryVector(models.Model):
+    """
+    SessionChemistry for a pair as packed float32 vectors indexed by
+    MovieTag id: matches drive ranking, swipes are kept for analysis.
+    """
+    user_a = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="chemistry_vectors_as_a"
+    )
+    user_b = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="chemistry_vectors_as_b"
+    )
+
+    matches = models.BinaryField(default=b"")
+    swipes = models.BinaryField(default=b"")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user_a", "user_b")
+
+    def __str__(self):
+        return f"Chemistry vector for {self.user_a} + {self.user_b}"
+
+class ColdStartDeck(models.Model):
+    """
+    Precomputed top-N deck for sessions with no swipes, taste or chemistry,
+    one per genre, language set and combined-preference bucket.
+    Rebuilt by build_cold_start_decks whenever the catalog version is bumped.
+    """
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+
+    # SHA-1 of the sorted, comma-joined languages; "*" when the session has
+    # no language filter
+    languages_key = models.CharField(max_length=40)
+    preferences_key = models.CharField(max_length=40)
+
+    movie_ids = models.JSONField(default=list)
+    pool_size = models.PositiveIntegerField(default=0)
+
+    catalog_version = models.PositiveIntegerField()
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("genre", "languages_key", "preferences_key")
+
+    def __str__(self):
+        return f"Cold start deck: {self.genre} [{self.languages_key}]"
+
+class CatalogVersion(models.Model):
+    """
+    Counter bumped whenever the catalog (or the tag graph) changes.
+    Lives in the database so every worker, management command and stored
+    ColdStartDeck agrees on it whatever cache backend is configured.
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
 class MovieTagRelation(models.Model):
     """
     Weighted relationship between vibe tags.
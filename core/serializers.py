@@ -4,6 +4,7 @@ from .models import Movie
 from .models import Swipe
 from .models import Session
 from .models import Genre
+from .services.swipes import MAX_BATCH_SIZE
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -52,15 +53,31 @@ class RegisterSerializer(serializers.ModelSerializer):
         )
         return user
     
-class SwipeSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Swipe
-        fields = ['id', 'session', 'movie', 'reaction']
-
-    def validate_reaction(self, value):
-        if value not in ['like', 'dislike']:
-            raise serializers.ValidationError("Reaction must be 'like' or 'dislike'")
-        return value
+class SwipeRequestSerializer(serializers.Serializer):
+    """
+    Swipe payload checked without touching the database;
+    record_swipe() loads the session and movie itself.
+    """
+    session = serializers.IntegerField()
+    movie = serializers.IntegerField()
+    reaction = serializers.ChoiceField(
+        choices=[Swipe.LIKE, Swipe.DISLIKE],
+        error_messages={"invalid_choice": "Reaction must be 'like' or 'dislike'"},
+    )
+
+class SwipeBatchItemSerializer(serializers.Serializer):
+    movie = serializers.IntegerField()
+    reaction = serializers.ChoiceField(
+        choices=[Swipe.LIKE, Swipe.DISLIKE],
+        error_messages={"invalid_choice": "Reaction must be 'like' or 'dislike'"},
+    )
+
+class SwipeBatchRequestSerializer(serializers.Serializer):
+    """
+    Ordered swipes for one session, recorded by record_swipes().
+    """
+    session = serializers.IntegerField()
+    swipes = SwipeBatchItemSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_SIZE)
 
 class SessionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -109,10 +126,10 @@ class SessionDetailSerializer(serializers.ModelSerializer):
         return None
 
     def get_host_joined(self, obj):
-        return obj.host is not None
+        return obj.host_id is not None
 
     def get_guest_joined(self, obj):
-        return obj.guest is not None
+        return obj.guest_id is not None
 
     def get_ended(self, obj):
         return obj.ended_at is not None
\ No newline at end of file
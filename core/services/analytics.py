@@ -0,0 +1,211 @@
+import logging
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Movie, PairChemistryVector, UserTasteVector
+from .buffers import BackgroundFlusher
+from .metrics import metrics
+from .taste import add_counts
+
+
+FLUSH_THRESHOLD = getattr(settings, "ANALYTICS_FLUSH_THRESHOLD", 200)
+FLUSH_INTERVAL_SECONDS = getattr(settings, "ANALYTICS_FLUSH_INTERVAL_SECONDS", 2)
+# Flushes a failed batch gets before it is dropped
+MAX_FLUSH_ATTEMPTS = getattr(settings, "ANALYTICS_MAX_FLUSH_ATTEMPTS", 5)
+# Events held while the database is unreachable; later ones are dropped
+MAX_PENDING = getattr(settings, "ANALYTICS_MAX_PENDING", 50000)
+
+logger = logging.getLogger(__name__)
+
+# One swipe, as published by the swipe path. queued_at is time.monotonic()
+SwipeEvent = namedtuple(
+    "SwipeEvent", ["user_id", "pair", "movie_id", "liked", "matched", "queued_at"]
+)
+
+
+def swipe_event(user_id, pair, movie_id, liked, matched):
+    return SwipeEvent(user_id, pair, movie_id, liked, matched, time.monotonic())
+
+
+def fold_events(events, tags_by_movie):
+    """
+    Sums events into per-tag deltas:
+    taste {user_id: {tag_id: +/-n}}, swipes/matches {pair: {tag_id: n}}.
+    """
+    taste = defaultdict(lambda: defaultdict(int))
+    swipes = defaultdict(lambda: defaultdict(int))
+    matches = defaultdict(lambda: defaultdict(int))
+
+    for event in events:
+        for tag_id in tags_by_movie.get(event.movie_id, ()):
+            taste[event.user_id][tag_id] += 1 if event.liked else -1
+            swipes[event.pair][tag_id] += 1
+            if event.matched:
+                matches[event.pair][tag_id] += 1
+
+    return taste, swipes, matches
+
+
+def write_swipe_events(events):
+    """
+    Folds a batch of swipe events into the taste and chemistry vectors.
+    Every affected row is locked, updated in memory and written back with
+    one bulk UPDATE per table, so the cost does not grow with the batch.
+    Rows are locked in primary key order so that concurrent flushes over
+    overlapping users or pairs cannot deadlock. Events of users deleted
+    since the swipe are dropped (counted in analytics.dropped): their
+    vectors would fail the foreign key.
+    Returns the number of vectors written.
+    """
+    user_ids = set()
+    for event in events:
+        user_ids.add(event.user_id)
+        user_ids.update(event.pair)
+    existing = set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+    if len(existing) < len(user_ids):
+        kept = [e for e in events if e.user_id in existing and existing.issuperset(e.pair)]
+        metrics.increment("analytics.dropped", len(events) - len(kept))
+        events = kept
+
+    tags_by_movie = defaultdict(list)
+    for movie_id, tag_id in Movie.tags.through.objects.filter(
+        movie_id__in={event.movie_id for event in events}
+    ).values_list("movie_id", "movietag_id"):
+        tags_by_movie[movie_id].append(tag_id)
+
+    taste, swipes, matches = fold_events(events, tags_by_movie)
+    if not taste:
+        return 0
+
+    now = timezone.now()
+
+    with transaction.atomic():
+        UserTasteVector.objects.bulk_create(
+            [UserTasteVector(user_id=user_id) for user_id in taste],
+            ignore_conflicts=True,
+        )
+        vectors = list(
+            UserTasteVector.objects.select_for_update().filter(user_id__in=list(taste)).order_by("pk")
+        )
+        for vector in vectors:
+            vector.vector = add_counts(vector.vector, taste[vector.user_id])
+            vector.updated_at = now
+        UserTasteVector.objects.bulk_update(vectors, ["vector", "updated_at"])
+
+        PairChemistryVector.objects.bulk_create(
+            [PairChemistryVector(user_a_id=a, user_b_id=b) for a, b in swipes],
+            ignore_conflicts=True,
+        )
+        # Two IN lists instead of one OR per pair; the few extra rows this
+        # can match (a from one pair, b from another) are locked, not written
+        candidates = PairChemistryVector.objects.select_for_update().filter(
+            user_a_id__in={a for a, _ in swipes},
+            user_b_id__in={b for _, b in swipes},
+        ).order_by("pk")
+        pairs = [
+            chemistry for chemistry in candidates
+            if (chemistry.user_a_id, chemistry.user_b_id) in swipes
+        ]
+        for chemistry in pairs:
+            pair = (chemistry.user_a_id, chemistry.user_b_id)
+            chemistry.swipes = add_counts(chemistry.swipes, swipes[pair])
+            if pair in matches:
+                chemistry.matches = add_counts(chemistry.matches, matches[pair])
+            chemistry.updated_at = now
+        PairChemistryVector.objects.bulk_update(pairs, ["swipes", "matches", "updated_at"])
+
+    return len(vectors) + len(pairs)
+
+
+class AnalyticsQueue(BackgroundFlusher):
+    """
+    In-process queue of swipe events, drained in batches by a background
+    thread every FLUSH_INTERVAL_SECONDS, or sooner once FLUSH_THRESHOLD
+    events are waiting. Keeps taste/chemistry writes off the swipe request.
+
+    A batch that fails is retried on its own ahead of newer events, up
+    to MAX_FLUSH_ATTEMPTS flushes, then dropped. At most MAX_PENDING
+    events wait; the queue drops new ones past that.
+
+    Gauges: analytics.lag_seconds (age of the oldest event in the last
+    batch when it was written), analytics.pending and analytics.dropped
+    (events given up on so far).
+    """
+
+    thread_name = "analytics-flush"
+
+    def __init__(
+        self,
+        threshold=FLUSH_THRESHOLD,
+        interval=FLUSH_INTERVAL_SECONDS,
+        autostart=True,
+        max_attempts=MAX_FLUSH_ATTEMPTS,
+        max_pending=MAX_PENDING,
+    ):
+        super().__init__(interval, autostart)
+        self.threshold = threshold
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self._pending = []
+        # (events, failed attempts) of the batch that failed last
+        self._retry = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending) + (len(self._retry[0]) if self._retry else 0)
+
+    def add(self, event):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                metrics.increment("analytics.dropped")
+                return
+            self._pending.append(event)
+            full = len(self._pending) >= self.threshold
+
+        if self.autostart:
+            self.start()
+        if full:
+            self.wake()
+
+    def flush(self):
+        with self._lock:
+            retry, self._retry = self._retry, None
+
+        # The failed batch goes first and alone, so newer events are not
+        # held back with it once it is dropped
+        written = self._write(*retry) if retry else 0
+
+        with self._lock:
+            events, self._pending = self._pending, []
+
+        return written + self._write(events)
+
+    def _write(self, events, attempts=0):
+        if not events:
+            return 0
+
+        start = time.monotonic()
+        try:
+            written = write_swipe_events(events)
+        except Exception:
+            if attempts + 1 >= self.max_attempts:
+                metrics.increment("analytics.dropped", len(events))
+                logger.error("Dropped %d swipe events after %d failed flushes", len(events), attempts + 1)
+            else:
+                with self._lock:
+                    self._retry = (events, attempts + 1)
+            raise
+
+        finished = time.monotonic()
+        metrics.record("analytics.flush", (finished - start) * 1000)
+        metrics.set_gauge("analytics.lag_seconds", round(finished - events[0].queued_at, 3))
+        metrics.set_gauge("analytics.pending", len(self._pending))
+        return written
+
+
+analytics_queue = AnalyticsQueue()
@@ -0,0 +1,62 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundFlusher(ABC):
+    """
+    Runs flush() on a daemon thread every `interval` seconds, or as soon
+    as wake() is called. Subclasses implement flush().
+    """
+
+    thread_name = "background-flush"
+
+    def __init__(self, interval, autostart=True):
+        self.interval = interval
+        self.autostart = autostart
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @abstractmethod
+    def flush(self):
+        ...
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=self.thread_name, daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s failed", self.thread_name)
+            finally:
+                close_old_connections()
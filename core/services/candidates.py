@@ -0,0 +1,87 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from ..models import Movie
+from .catalog import get_catalog_version
+
+
+EMPTY = np.zeros(0, dtype=np.int64)
+
+
+class CandidateIndex:
+    """
+    Process-wide inverted index from (genre id, language) to sorted
+    movie-id arrays. Rebuilt whenever the catalog version moves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._by_language = {}
+        self._by_genre = {}
+
+    def rebuild(self, version=None):
+        if version is None:
+            version = get_catalog_version()
+
+        grouped = defaultdict(list)
+        rows = Movie.genres.through.objects.values_list(
+            "genre_id", "movie_id", "movie__original_language"
+        )
+        for genre_id, movie_id, language in rows.iterator(chunk_size=10000):
+            grouped[(genre_id, language)].append(movie_id)
+
+        by_language = {
+            key: np.unique(np.array(ids, dtype=np.int64))
+            for key, ids in grouped.items()
+        }
+
+        per_genre = defaultdict(list)
+        for (genre_id, _), ids in by_language.items():
+            per_genre[genre_id].append(ids)
+        by_genre = {
+            genre_id: np.unique(np.concatenate(arrays))
+            for genre_id, arrays in per_genre.items()
+        }
+
+        with self._lock:
+            self._by_language = by_language
+            self._by_genre = by_genre
+            self.version = version
+
+    def ensure_current(self, version=None):
+        if version is None:
+            version = get_catalog_version()
+        if version != self.version:
+            self.rebuild(version)
+
+    def lookup(self, genre_id, languages=None):
+        """
+        Sorted movie ids for a genre, optionally restricted to languages.
+        languages=None means no language filter.
+        """
+        if languages is None:
+            return self._by_genre.get(genre_id, EMPTY)
+
+        arrays = [
+            self._by_language[(genre_id, language)]
+            for language in set(languages)
+            if (genre_id, language) in self._by_language
+        ]
+        if not arrays:
+            return EMPTY
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def genre_ids(self, languages):
+        """
+        Genres with at least one movie in one of the languages.
+        """
+        languages = set(languages)
+        return {genre_id for genre_id, language in self._by_language if language in languages}
+
+
+candidate_index = CandidateIndex()
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from ..models import CatalogVersion
+
+
+CATALOG_VERSION_KEY = "core:catalog_version"
+TAG_GRAPH_VERSION_KEY = "core:tag_graph_version"
+
+# How long a worker may keep using a stored version after another
+# process bumped it, when they don't share a cache
+STORED_VERSION_CACHE_SECONDS = getattr(settings, "CATALOG_VERSION_CACHE_SECONDS", 30)
+
+
+def get_version(key, timeout=None):
+    """
+    Shared counter stored in the Django cache.
+    Process-local indexes compare against it to know when to rebuild.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=timeout)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(key, timeout=None):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=timeout)
+        return 2
+
+
+def get_stored_version(key):
+    """
+    Counter persisted in a CatalogVersion row, read through the Django
+    cache. Unlike get_version() it survives cache eviction and is the
+    same in every process, so it can be stored next to derived data.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = CatalogVersion.objects.filter(key=key).values_list("value", flat=True).first() or 1
+        cache.set(key, version, STORED_VERSION_CACHE_SECONDS)
+    return version
+
+
+def bump_stored_version(key):
+    with transaction.atomic():
+        CatalogVersion.objects.get_or_create(key=key)
+        CatalogVersion.objects.filter(key=key).update(value=F("value") + 1)
+        version = CatalogVersion.objects.values_list("value", flat=True).get(key=key)
+
+    cache.set(key, version, STORED_VERSION_CACHE_SECONDS)
+    return version
+
+
+def get_catalog_version():
+    """
+    Bumped whenever the movie catalog changes.
+    """
+    return get_stored_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return bump_stored_version(CATALOG_VERSION_KEY)
+
+
+def get_tag_graph_version():
+    """
+    Bumped whenever a MovieTagRelation is saved or deleted.
+    """
+    return get_stored_version(TAG_GRAPH_VERSION_KEY)
+
+
+def bump_tag_graph_version():
+    return bump_stored_version(TAG_GRAPH_VERSION_KEY)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ColdStartDeck, Genre, Session
+from .buffers import BackgroundFlusher
+from .catalog import get_catalog_version
+from .recommendations import cold_start_bucket, combine_preferences, candidate_pool, rank_candidates
+
+
+COLD_START_SIZE = getattr(settings, "COLD_START_DECK_SIZE", 100)
+COLD_START_LOOKBACK_DAYS = getattr(settings, "COLD_START_LOOKBACK_DAYS", 30)
+
+# The builder thread only runs when request() wakes it; this just bounds
+# how long it sleeps otherwise
+REBUILD_INTERVAL_SECONDS = 3600
+
+# Language filters built for every genre even before any session used them
+DEFAULT_LANGUAGE_FILTERS = {
+    "bollywood": {"industry": "bollywood", "selected_languages": []},
+    "hollywood": {"industry": "hollywood", "selected_languages": []},
+    "mixed": {"industry": "mixed", "selected_languages": []},
+}
+
+
+def cold_start_buckets(days=COLD_START_LOOKBACK_DAYS):
+    """
+    Unsaved sessions, one per bucket: every genre with each industry
+    default and no preferences, plus every genre/language/preference
+    combination used by a session in the last `days` days.
+    """
+    sessions = [
+        Session(genre_id=genre_id, **filters)
+        for genre_id in Genre.objects.values_list("id", flat=True)
+        for filters in DEFAULT_LANGUAGE_FILTERS.values()
+    ]
+
+    since = timezone.now() - timedelta(days=days)
+    sessions.extend(
+        Session.objects.filter(created_at__gte=since, genre__isnull=False).only(
+            "genre_id", "industry", "selected_languages",
+            "host_preferences", "guest_preferences",
+        ).iterator()
+    )
+
+    buckets = {}
+    for session in sessions:
+        combined_prefs = combine_preferences(session)
+        buckets.setdefault(cold_start_bucket(session, combined_prefs), (session, combined_prefs))
+    return buckets
+
+
+def build_cold_start_decks(size=COLD_START_SIZE, days=COLD_START_LOOKBACK_DAYS):
+    """
+    Ranks every bucket the way a session with no history would be ranked
+    and replaces the stored decks. Returns the number of decks written.
+    """
+    catalog_version = get_catalog_version()
+    decks = []
+
+    for (genre_id, languages, prefs), (session, combined_prefs) in cold_start_buckets(days).items():
+        ids, features = candidate_pool(session, catalog_version)
+        ranked_ids = []
+        if len(ids):
+            ranked_ids = rank_candidates(
+                session, None, (ids.copy(), features.copy()), combined_prefs
+            )[:size].tolist()
+
+        decks.append(ColdStartDeck(
+            genre_id=genre_id,
+            languages_key=languages,
+            preferences_key=prefs,
+            movie_ids=ranked_ids,
+            pool_size=len(ids),
+            catalog_version=catalog_version,
+        ))
+
+    with transaction.atomic():
+        ColdStartDeck.objects.all().delete()
+        ColdStartDeck.objects.bulk_create(decks, batch_size=500)
+
+    return len(decks)
+
+
+class ColdStartBuilder(BackgroundFlusher):
+    """
+    Rebuilds the cold start decks on a background thread. Anything that
+    bumps the catalog version calls request(), so the decks are restamped
+    with the new version without ranking every bucket inside a request.
+    Requests made while a build runs coalesce into one more build.
+    """
+
+    thread_name = "cold-start-build"
+
+    def __init__(self, interval=REBUILD_INTERVAL_SECONDS, autostart=True):
+        super().__init__(interval, autostart)
+        self._pending = False
+
+    def request(self):
+        with self._lock:
+            self._pending = True
+
+        if self.autostart:
+            self.start()
+        self.wake()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, False
+
+        if not pending:
+            return 0
+
+        try:
+            return build_cold_start_decks()
+        except Exception:
+            with self._lock:
+                self._pending = True
+            raise
+
+
+cold_start_builder = ColdStartBuilder()
@@ -0,0 +1,195 @@
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+
+from ..models import Match, Session, SessionStats, Swipe
+from .buffers import BackgroundFlusher
+
+
+FLUSH_INTERVAL_SECONDS = getattr(settings, "SESSION_COUNTERS_FLUSH_INTERVAL_SECONDS", 60)
+
+# Cached counts are re-derived from the rows this often, which picks up
+# swipes recorded by other workers
+REFRESH_SECONDS = getattr(settings, "SESSION_COUNTERS_REFRESH_SECONDS", 30)
+
+MAX_SESSIONS = 2000
+
+
+def count_session_events(session_ids):
+    """
+    {session_id: (swipes, matches)} counted from the session's Swipe and
+    Match rows. Undone swipes no longer have a row, so they are not
+    counted here; see SessionStats.undone_swipes.
+    """
+    counts = {session_id: [0, 0] for session_id in session_ids}
+
+    for column, model in enumerate((Swipe, Match)):
+        rows = model.objects.filter(session_id__in=counts).values_list("session_id").annotate(
+            n=Count("id")
+        ).order_by()
+        for session_id, n in rows:
+            counts[session_id][column] = n
+
+    return {session_id: tuple(pair) for session_id, pair in counts.items()}
+
+
+def write_session_counts(counts):
+    """
+    Applies {session_id: (swipes, matches)} to SessionStats as one bulk
+    upsert: missing rows are inserted, then one UPDATE sets every total.
+    total_swipes adds back the undone swipes, as it always counted them.
+    """
+    session_ids = list(
+        Session.objects.filter(id__in=list(counts)).values_list("id", flat=True)
+    )
+    if not session_ids:
+        return 0
+
+    def totals(index):
+        return Case(
+            *[When(session_id=s, then=Value(counts[s][index])) for s in session_ids],
+            output_field=IntegerField(),
+        )
+
+    with transaction.atomic():
+        SessionStats.objects.bulk_create(
+            [SessionStats(session_id=session_id) for session_id in session_ids],
+            ignore_conflicts=True,
+        )
+        SessionStats.objects.filter(session_id__in=session_ids).update(
+            total_swipes=totals(0) + F("undone_swipes"),
+            total_matches=totals(1),
+        )
+
+    return len(session_ids)
+
+
+class SessionCount:
+    def __init__(self, swipes, matches, loaded_at):
+        self.swipes = swipes
+        self.matches = matches
+        self.loaded_at = loaded_at
+
+
+class SessionCounters(BackgroundFlusher):
+    """
+    Swipe and match counts of live sessions, kept in memory so neither
+    the swipe path nor the recommendation view touches SessionStats.
+
+    The swipe path only bumps the in-memory counts and marks the session
+    dirty. Every FLUSH_INTERVAL_SECONDS a background thread recounts the
+    dirty sessions from Swipe/Match and writes the totals; persist() does
+    the same once when a session ends. Totals are always recounted, never
+    incremented, so flushes from several workers cannot double count.
+    Undone swipes are the exception: their rows are gone, so undo()
+    counts them in SessionStats as it happens.
+    """
+
+    thread_name = "session-counters-flush"
+
+    def __init__(
+        self,
+        interval=FLUSH_INTERVAL_SECONDS,
+        refresh=REFRESH_SECONDS,
+        max_sessions=MAX_SESSIONS,
+        autostart=True,
+    ):
+        super().__init__(interval, autostart)
+        self.refresh = refresh
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._dirty = set()
+
+    def __len__(self):
+        return len(self._dirty)
+
+    def get(self, session_id):
+        """
+        (swipes, matches) for the session, at most `refresh` seconds behind
+        other workers and never behind this one.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry.loaded_at < self.refresh:
+                self._sessions.move_to_end(session_id)
+                return entry.swipes, entry.matches
+
+        swipes, matches = count_session_events([session_id])[session_id]
+
+        with self._lock:
+            self._sessions[session_id] = SessionCount(swipes, matches, now)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        return swipes, matches
+
+    def add(self, session_id, swipes=0, matches=0):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry.swipes += swipes
+                entry.matches += matches
+            self._dirty.add(session_id)
+
+        if self.autostart:
+            self.start()
+
+    def flush(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+
+        if not dirty:
+            return 0
+
+        try:
+            return write_session_counts(count_session_events(dirty))
+        except Exception:
+            with self._lock:
+                self._dirty |= dirty
+            raise
+
+    def persist(self, session_id):
+        """
+        Writes the final counts of an ended session and forgets it.
+        Returns its SessionStats row.
+        """
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._dirty.discard(session_id)
+
+        swipes, matches = count_session_events([session_id])[session_id]
+        stats, _ = SessionStats.objects.get_or_create(session_id=session_id)
+        stats.total_swipes = swipes + stats.undone_swipes
+        stats.total_matches = matches
+        stats.save(update_fields=["total_swipes", "total_matches"])
+        return stats
+
+    def undo(self, session_id):
+        """
+        Takes an undone swipe off the in-memory count, which follows the
+        rows, and records it in SessionStats.undone_swipes right away so
+        total_swipes keeps counting it.
+        """
+        SessionStats.objects.get_or_create(session_id=session_id)
+        SessionStats.objects.filter(session_id=session_id).update(
+            undone_swipes=F("undone_swipes") + 1
+        )
+        self.add(session_id, swipes=-1)
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._dirty.clear()
+
+
+session_counters = SessionCounters()
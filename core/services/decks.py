@@ -0,0 +1,195 @@
+import json
+import threading
+from collections import OrderedDict
+
+
+RERANK_EVERY_SWIPES = 20
+MAX_SESSIONS = 2000
+
+
+def preferences_json(combined_prefs):
+    """
+    Canonical form of combined preferences: same prefs, same string.
+    """
+    return json.dumps({key: sorted(values) for key, values in combined_prefs.items()}, sort_keys=True)
+
+
+def deck_fingerprint(session, combined_prefs, total_swipes, catalog_version=None):
+    """
+    Everything a ranked deck depends on. A change here forces a rerank.
+    Taste signals are folded in as one bucket per RERANK_EVERY_SWIPES swipes.
+    """
+    return (
+        catalog_version,
+        session.genre_id,
+        session.industry,
+        tuple(session.selected_languages or ()),
+        preferences_json(combined_prefs),
+        total_swipes // RERANK_EVERY_SWIPES,
+    )
+
+
+class Deck:
+    """
+    Ranked movie ids for one user in one session.
+
+    The cursor points at the first id not yet swiped or matched, so both
+    partners keep seeing the same head of the deck until they act on it.
+
+    Request threads and the prefetch executor page the same deck, so
+    every read or move of the cursor holds the deck's lock.
+    """
+
+    def __init__(self, fingerprint, ranked_ids, pool_size, seen_count, partial=False):
+        self.fingerprint = fingerprint
+        self.ranked_ids = ranked_ids
+        self.pool_size = pool_size
+        self.seen_count = seen_count
+        # Only the top of the ranking (a cold start deck); rerank once served
+        self.partial = partial
+        self.cursor = 0
+        self.served_until = 0
+        self.seen = set()
+        # Ids pushed over the socket by prefetch; HTTP pages leave them out
+        self.pushed = set()
+        self.prefetching = False
+        self._lock = threading.RLock()
+
+    def page(self, seen, size, start=None, skip=(), push=False):
+        """
+        Next `size` unseen ids, from the cursor or from `start` if later,
+        leaving out anything in `skip`. Pages for the socket (push=True)
+        are remembered and left out of the pages that follow over HTTP.
+        Cost is the page size plus whatever has been swiped since the
+        last call, never the whole deck.
+        """
+        with self._lock:
+            ranked = self.ranked_ids
+            self.seen = seen
+            if not push:
+                skip = self.pushed.union(skip)
+
+            while self.cursor < len(ranked) and ranked[self.cursor] in seen:
+                self.cursor += 1
+
+            page = []
+            i = max(self.cursor, start or 0)
+            while i < len(ranked) and len(page) < size:
+                if ranked[i] not in seen and ranked[i] not in skip:
+                    page.append(ranked[i])
+                i += 1
+
+            self.served_until = max(self.served_until, i)
+            if push:
+                self.pushed.update(page)
+            return page
+
+    def unswiped_served(self):
+        """
+        Cards already handed to the client that nobody has acted on yet.
+        """
+        with self._lock:
+            return [
+                movie_id for movie_id in self.ranked_ids[self.cursor:self.served_until]
+                if movie_id not in self.seen
+            ]
+
+    def has_more(self):
+        return self.served_until < len(self.ranked_ids)
+
+    def claim_prefetch(self, threshold):
+        """
+        True, and marks the deck as prefetching, when fewer than
+        `threshold` served cards are left unswiped and no prefetch is
+        running yet.
+        """
+        with self._lock:
+            if self.prefetching or not self.has_more():
+                return False
+            if len(self.unswiped_served()) >= threshold:
+                return False
+
+            self.prefetching = True
+            return True
+
+    def mark_seen(self, movie_id):
+        with self._lock:
+            self.seen.add(movie_id)
+
+    def rewind(self, movie_id=None):
+        with self._lock:
+            self.cursor = 0
+            self.seen.discard(movie_id)
+
+    def candidates_left(self, seen):
+        """
+        Pool candidates not yet swiped or matched (before preference filtering).
+        """
+        return self.pool_size - (len(seen) - self.seen_count)
+
+
+class DeckStore:
+    """
+    Process-wide, LRU-bounded store of ranked decks keyed by session and user.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self.max_sessions = max_sessions
+
+    def get(self, session_id, user_id, fingerprint):
+        """
+        Returns the stored deck if it was ranked for the same fingerprint.
+        """
+        with self._lock:
+            decks = self._sessions.get(session_id)
+            if decks is None:
+                return None
+
+            self._sessions.move_to_end(session_id)
+            deck = decks.get(user_id)
+
+        if deck is None or deck.fingerprint != fingerprint:
+            return None
+        return deck
+
+    def put(self, session_id, user_id, deck):
+        with self._lock:
+            self._sessions.setdefault(session_id, {})[user_id] = deck
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def peek(self, session_id, user_id):
+        with self._lock:
+            return self._sessions.get(session_id, {}).get(user_id)
+
+    def mark_seen(self, session_id, movie_id):
+        """
+        Records a swipe/match on every deck of the session without a DB read.
+        """
+        with self._lock:
+            for deck in self._sessions.get(session_id, {}).values():
+                deck.mark_seen(movie_id)
+
+    def rewind(self, session_id, movie_id=None):
+        """
+        Moves every cursor back to the top, e.g. after an undo made
+        an earlier movie swipeable again.
+        """
+        with self._lock:
+            for deck in self._sessions.get(session_id, {}).values():
+                deck.rewind(movie_id)
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+deck_store = DeckStore()
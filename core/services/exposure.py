@@ -0,0 +1,108 @@
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from ..models import Movie, MovieExposure
+from .buffers import BackgroundFlusher
+
+
+FLUSH_THRESHOLD = getattr(settings, "EXPOSURE_FLUSH_THRESHOLD", 500)
+FLUSH_INTERVAL_SECONDS = getattr(settings, "EXPOSURE_FLUSH_INTERVAL_SECONDS", 15)
+
+
+def write_exposures(pending):
+    """
+    Applies {movie_id: (count, last_exposed_at)} as one bulk upsert:
+    missing rows are inserted, then every row is bumped with F() in a
+    single UPDATE keeping the latest last_exposed_at.
+    """
+    movie_ids = list(
+        Movie.objects.filter(id__in=list(pending)).values_list("id", flat=True)
+    )
+    if not movie_ids:
+        return 0
+
+    with transaction.atomic():
+        MovieExposure.objects.bulk_create(
+            [MovieExposure(movie_id=movie_id) for movie_id in movie_ids],
+            ignore_conflicts=True,
+        )
+
+        increments = Case(
+            *[When(movie_id=m, then=Value(pending[m][0])) for m in movie_ids],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        exposed_at = Case(
+            *[When(movie_id=m, then=Value(pending[m][1])) for m in movie_ids],
+            output_field=DateTimeField(),
+        )
+
+        MovieExposure.objects.filter(movie_id__in=movie_ids).update(
+            exposed_count=F("exposed_count") + increments,
+            last_exposed_at=Greatest(Coalesce("last_exposed_at", exposed_at), exposed_at),
+        )
+
+    return len(movie_ids)
+
+
+class ExposureBuffer(BackgroundFlusher):
+    """
+    Write-behind accumulator for MovieExposure counters.
+
+    Exposures are counted in memory and flushed by a background thread
+    every FLUSH_INTERVAL_SECONDS, or sooner once FLUSH_THRESHOLD distinct
+    movies are pending. flush() is also called at process shutdown.
+    """
+
+    thread_name = "exposure-flush"
+
+    def __init__(self, threshold=FLUSH_THRESHOLD, interval=FLUSH_INTERVAL_SECONDS, autostart=True):
+        super().__init__(interval, autostart)
+        self.threshold = threshold
+        self._pending = {}
+        self.last_flush_at = time.monotonic()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, movie_ids, exposed_at=None):
+        exposed_at = exposed_at or timezone.now()
+
+        with self._lock:
+            for movie_id in movie_ids:
+                count, _ = self._pending.get(movie_id, (0, None))
+                self._pending[movie_id] = (count + 1, exposed_at)
+            full = len(self._pending) >= self.threshold
+
+        if self.autostart:
+            self.start()
+        if full:
+            self.wake()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        try:
+            written = write_exposures(pending)
+        except Exception:
+            # Put the counts back so the next flush retries them
+            with self._lock:
+                for movie_id, (count, exposed_at) in pending.items():
+                    current, latest = self._pending.get(movie_id, (0, exposed_at))
+                    self._pending[movie_id] = (current + count, max(latest, exposed_at))
+            raise
+
+        self.last_flush_at = time.monotonic()
+        return written
+
+
+exposure_buffer = ExposureBuffer()
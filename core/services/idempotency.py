@@ -0,0 +1,167 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+IDEMPOTENCY_TTL_SECONDS = getattr(settings, "IDEMPOTENCY_TTL_SECONDS", 60 * 60)
+
+# Stored in the shared Django cache, so a retry landing on another worker
+# still sees the claim or the response: cache_key() -> IN_PROGRESS or StoredResponse
+IN_PROGRESS = "in-progress"
+
+
+class StoredResponse:
+    def __init__(self, fingerprint, status_code, data):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.data = data
+
+
+class Answer:
+    """
+    A response to send without running the handler.
+    """
+
+    def __init__(self, status_code, data, replayed=False):
+        self.status_code = status_code
+        self.data = data
+        self.replayed = replayed
+
+    def apply(self, response):
+        if self.replayed:
+            response["Idempotent-Replayed"] = "true"
+        return response
+
+
+def request_fingerprint(request):
+    return hashlib.sha1(request.body).hexdigest()
+
+
+def cache_key(user_id, method, path, key):
+    # Client keys may hold anything up to MAX_KEY_LENGTH; hash them to a safe cache key
+    digest = hashlib.sha1(f"{method} {path} {key}".encode()).hexdigest()
+    return f"idempotency:{user_id}:{digest}"
+
+
+def begin(request):
+    """
+    Looks up the request's Idempotency-Key. Returns (claim, None) when the
+    handler should run, (None, None) without a key, or (None, Answer):
+    the stored response of an earlier attempt, or an error for a key
+    still in flight or reused for a different body.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return None, None
+
+    if len(key) > MAX_KEY_LENGTH:
+        return None, Answer(
+            status.HTTP_400_BAD_REQUEST,
+            {"success": False, "error": f"{IDEMPOTENCY_HEADER} is too long"},
+        )
+
+    # Hashed before the handler runs: DRF cannot re-read a parsed body
+    stored_key = cache_key(request.user.id, request.method, request.path, key)
+    claim = (stored_key, request_fingerprint(request))
+
+    if cache.add(stored_key, IN_PROGRESS, IDEMPOTENCY_TTL_SECONDS):
+        return claim, None
+
+    stored = cache.get(stored_key)
+    if stored is None:
+        # Evicted between add() and get(); treat as a first attempt
+        cache.set(stored_key, IN_PROGRESS, IDEMPOTENCY_TTL_SECONDS)
+        return claim, None
+
+    if stored == IN_PROGRESS:
+        return None, Answer(
+            status.HTTP_409_CONFLICT,
+            {"success": False, "error": "A request with this Idempotency-Key is still in progress"},
+        )
+
+    if stored.fingerprint != claim[1]:
+        return None, Answer(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            {"success": False, "error": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+        )
+
+    return None, Answer(stored.status_code, stored.data, replayed=True)
+
+
+def finish(claim, status_code, data):
+    """
+    Keeps the response for replay, unless it was a server error the
+    client should be able to retry.
+    """
+    stored_key, fingerprint = claim
+    if status_code >= 500:
+        cache.delete(stored_key)
+    else:
+        cache.set(stored_key, StoredResponse(fingerprint, status_code, data), IDEMPOTENCY_TTL_SECONDS)
+
+
+def abandon(claim):
+    cache.delete(claim[0])
+
+
+def idempotent(handler):
+    """
+    Replays the first response to a retried DRF request that carries the
+    same Idempotency-Key (per user, method and path) for
+    IDEMPOTENCY_TTL_SECONDS. Keys live in the shared cache.
+    """
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        claim, answer = begin(request)
+        if answer is not None:
+            return answer.apply(Response(answer.data, status=answer.status_code))
+        if claim is None:
+            return handler(self, request, *args, **kwargs)
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except Exception:
+            abandon(claim)
+            raise
+
+        finish(claim, response.status_code, response.data)
+        return response
+
+    return wrapper
+
+
+def async_idempotent(handler):
+    """
+    idempotent() for the async views, which answer with JsonResponse.
+    """
+
+    @wraps(handler)
+    async def wrapper(self, request, *args, **kwargs):
+        claim, answer = begin(request)
+        if answer is not None:
+            return answer.apply(JsonResponse(answer.data, status=answer.status_code))
+        if claim is None:
+            return await handler(self, request, *args, **kwargs)
+
+        try:
+            response = await handler(self, request, *args, **kwargs)
+        except Exception:
+            abandon(claim)
+            raise
+
+        # JsonResponse keeps only the encoded body
+        finish(claim, response.status_code, json.loads(response.content))
+        return response
+
+    return wrapper
+
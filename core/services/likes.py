@@ -0,0 +1,184 @@
+import threading
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import Match, Swipe
+
+
+# "local": per-process sets, for a single worker (like InMemoryChannelLayer).
+# "cache": the shared Django cache, for several workers behind Redis.
+LIKE_STORE_BACKEND = getattr(settings, "LIKE_STORE_BACKEND", "local")
+
+MAX_SESSIONS = 2000
+
+LIKES_KEY = "core:likes:{}"
+LIKES_TIMEOUT = 60 * 60 * 24
+
+
+class SessionLikes:
+    """
+    What match detection needs to know about one session: each
+    participant's swiped and liked movie ids, and the matched movie ids.
+    """
+
+    def __init__(self):
+        self.swiped = defaultdict(set)
+        self.liked = defaultdict(set)
+        self.matched = set()
+
+    def add(self, user_id, movie_id, reaction):
+        self.swiped[user_id].add(movie_id)
+        if reaction == Swipe.LIKE:
+            self.liked[user_id].add(movie_id)
+
+    def remove(self, user_id, movie_id):
+        self.swiped[user_id].discard(movie_id)
+        self.liked[user_id].discard(movie_id)
+
+    def reaction(self, user_id, movie_id):
+        if movie_id in self.liked[user_id]:
+            return Swipe.LIKE
+        if movie_id in self.swiped[user_id]:
+            return Swipe.DISLIKE
+        return None
+
+    def reactions(self, user_ids, movie_ids):
+        """
+        {movie_id: {user_id: reaction}} and the matched subset for movie_ids.
+        """
+        reactions = {}
+        for movie_id in movie_ids:
+            by_user = {}
+            for user_id in user_ids:
+                reaction = self.reaction(user_id, movie_id)
+                if reaction:
+                    by_user[user_id] = reaction
+            reactions[movie_id] = by_user
+
+        return reactions, self.matched & set(movie_ids)
+
+
+def load_session_likes(session_id):
+    likes = SessionLikes()
+
+    for user_id, movie_id, reaction in Swipe.objects.filter(
+        session_id=session_id
+    ).values_list("user_id", "movie_id", "reaction"):
+        likes.add(user_id, movie_id, reaction)
+
+    likes.matched.update(
+        Match.objects.filter(session_id=session_id).values_list("movie_id", flat=True)
+    )
+    return likes
+
+
+class LikeStore:
+    """
+    Process-wide, LRU-bounded SessionLikes keyed by session, loaded from
+    Swipe/Match the first time a session is looked up.
+
+    Writers hold the session row lock (record_swipes), so a session's sets
+    change one swipe at a time. The unique constraints on Swipe and Match
+    stay the final arbiter.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self.max_sessions = max_sessions
+
+    def reactions(self, session_id, user_ids, movie_ids):
+        with self._lock:
+            likes = self._sessions.get(session_id)
+            if likes is not None:
+                self._sessions.move_to_end(session_id)
+                return likes.reactions(user_ids, movie_ids)
+
+        likes = load_session_likes(session_id)
+
+        with self._lock:
+            self._sessions[session_id] = likes
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            return likes.reactions(user_ids, movie_ids)
+
+    def record(self, session_id, user_id, swipes, matched=()):
+        """
+        Adds committed (movie_id, reaction) swipes and matched movie ids.
+        """
+        with self._lock:
+            likes = self._sessions.get(session_id)
+            if likes is None:
+                return
+
+            for movie_id, reaction in swipes:
+                likes.add(user_id, movie_id, reaction)
+            likes.matched.update(matched)
+
+    def remove(self, session_id, user_id, movie_id):
+        with self._lock:
+            likes = self._sessions.get(session_id)
+            if likes is not None:
+                likes.remove(user_id, movie_id)
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+class CacheLikeStore:
+    """
+    LikeStore on the shared Django cache: a session's SessionLikes is one
+    key, core:likes:<session>, read with one get and written back with
+    one set. Eviction drops all of the session's facts together, so the
+    next lookup reloads them from the rows instead of missing a
+    partner's like.
+
+    record() rewrites the key under the session row lock (record_swipes),
+    so writers cannot overwrite each other. remove() runs without it
+    (undo), so it drops the key instead of rewriting it.
+    """
+
+    def __init__(self, timeout=LIKES_TIMEOUT):
+        self.timeout = timeout
+
+    def reactions(self, session_id, user_ids, movie_ids):
+        key = LIKES_KEY.format(session_id)
+        likes = cache.get(key)
+        if likes is None:
+            likes = load_session_likes(session_id)
+            cache.set(key, likes, self.timeout)
+
+        return likes.reactions(user_ids, movie_ids)
+
+    def record(self, session_id, user_id, swipes, matched=()):
+        key = LIKES_KEY.format(session_id)
+        likes = cache.get(key)
+        if likes is None:
+            # Loaded from the rows on the next lookup
+            return
+
+        for movie_id, reaction in swipes:
+            likes.add(user_id, movie_id, reaction)
+        likes.matched.update(matched)
+        cache.set(key, likes, self.timeout)
+
+    def remove(self, session_id, user_id, movie_id):
+        self.discard(session_id)
+
+    def discard(self, session_id):
+        cache.delete(LIKES_KEY.format(session_id))
+
+    def clear(self):
+        # Entries expire on their own; nothing process-local to drop
+        pass
+
+
+like_store = CacheLikeStore() if LIKE_STORE_BACKEND == "cache" else LikeStore()
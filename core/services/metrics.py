@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+from django.db import connection
+
+
+RECENT_SAMPLES = 1000
+
+
+# -------------------------------------------------------------------
+# Process-wide aggregate metrics
+# -------------------------------------------------------------------
+
+class MetricsRegistry:
+    """
+    Aggregate timings (count, total, max, recent percentiles, queries)
+    and point-in-time gauges, keyed by name, e.g. "recommendations.rank".
+    Per process: each worker reports its own numbers.
+    """
+
+    def __init__(self, recent=RECENT_SAMPLES):
+        self._lock = threading.Lock()
+        self._recent = recent
+        self._timings = {}
+        self._gauges = {}
+
+    def record(self, name, duration_ms, queries=0):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "queries": 0,
+                    "recent": deque(maxlen=self._recent),
+                }
+            timing["count"] += 1
+            timing["total_ms"] += duration_ms
+            timing["max_ms"] = max(timing["max_ms"], duration_ms)
+            timing["queries"] += queries
+            timing["recent"].append(duration_ms)
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def increment(self, name, amount=1):
+        """
+        Adds to a gauge that counts up from 0, e.g. events dropped so far.
+        """
+        with self._lock:
+            self._gauges[name] = self._gauges.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            timings = {
+                name: dict(timing, recent=list(timing["recent"]))
+                for name, timing in self._timings.items()
+            }
+            gauges = dict(self._gauges)
+
+        result = {}
+        for name, timing in sorted(timings.items()):
+            p50, p95 = np.percentile(timing["recent"], [50, 95])
+            result[name] = {
+                "count": timing["count"],
+                "mean_ms": round(timing["total_ms"] / timing["count"], 3),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "max_ms": round(timing["max_ms"], 3),
+                "queries_mean": round(timing["queries"] / timing["count"], 2),
+            }
+
+        return {"timings": result, "gauges": gauges}
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
+
+
+# -------------------------------------------------------------------
+# Per-request stage timing
+# -------------------------------------------------------------------
+
+class Timeline:
+    """
+    Named stages of one request, each with wall time and query count.
+    Re-entering a stage adds to it. Every stage also feeds the registry
+    as "<prefix>.<stage>".
+    """
+
+    def __init__(self, prefix, registry=metrics):
+        self.prefix = prefix
+        self.registry = registry
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._queries = 0
+
+    def _count_query(self, execute, sql, params, many, context):
+        self._queries += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def stage(self, name):
+        queries_before = self._queries
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(self._count_query):
+                yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            queries = self._queries - queries_before
+
+            stage = self.stages.setdefault(name, {"ms": 0.0, "queries": 0})
+            stage["ms"] += duration_ms
+            stage["queries"] += queries
+
+    def finish(self):
+        """
+        Pushes the stages and the request total to the registry.
+        """
+        total_ms = (time.perf_counter() - self._started) * 1000
+        for name, stage in self.stages.items():
+            self.registry.record(f"{self.prefix}.{name}", stage["ms"], stage["queries"])
+        self.registry.record(f"{self.prefix}.total", total_ms, self._queries)
+        return total_ms
+
+    def as_dict(self):
+        return {
+            name: {"ms": round(stage["ms"], 3), "queries": stage["queries"]}
+            for name, stage in self.stages.items()
+        }
+
+    def server_timing(self):
+        """
+        Server-Timing header value, e.g. 'candidates;dur=1.2;desc="3 queries"'.
+        """
+        return ", ".join(
+            f'{name};dur={stage["ms"]:.3f};desc="{stage["queries"]} queries"'
+            for name, stage in self.stages.items()
+        )
+
+
+class NullTimeline:
+    """
+    Stand-in when the caller is not timing anything.
+    """
+
+    @contextmanager
+    def stage(self, name):
+        yield
+
+
+null_timeline = NullTimeline()
@@ -0,0 +1,196 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, Max, Min, OuterRef, Q
+
+from ..models import ArchivedSwipe, Session, Swipe
+
+
+SWIPE_TABLE = "core_swipe"
+ARCHIVE_TABLE = "core_swipe_archive"
+
+# Sessions per core_swipe partition (see migration 0029)
+SWIPE_PARTITION_SESSIONS = getattr(settings, "SWIPE_PARTITION_SESSIONS", 50000)
+SWIPE_PARTITIONS_AHEAD = getattr(settings, "SWIPE_PARTITIONS_AHEAD", 2)
+
+ARCHIVE_BATCH_SESSIONS = 500
+
+# (name, start, end) session id range; start/end are None for DEFAULT
+Partition = namedtuple("Partition", ["name", "start", "end"])
+
+BOUND_RE = re.compile(r"FROM \('?(-?\d+)'?\) TO \('?(-?\d+)'?\)")
+
+
+# -------------------------------------------------------------------
+# Postgres partitions
+# -------------------------------------------------------------------
+
+def is_partitioned(table=SWIPE_TABLE):
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions(table=SWIPE_TABLE):
+    """
+    The table's partitions ordered by range, DEFAULT last.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid)",
+            [table],
+        )
+        rows = cursor.fetchall()
+
+    result = []
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match:
+            result.append(Partition(name, int(match.group(1)), int(match.group(2))))
+        else:
+            result.append(Partition(name, None, None))
+
+    return sorted(result, key=lambda p: (p.start is None, p.start or 0))
+
+
+def ensure_swipe_partitions(ahead=SWIPE_PARTITIONS_AHEAD, size=SWIPE_PARTITION_SESSIONS):
+    """
+    Creates core_swipe partitions up to `ahead` ranges past the newest
+    session. Swipes that already landed in the DEFAULT partition for a new
+    range are moved into it. Returns the names created.
+    """
+    last = Session.objects.aggregate(last=Max("id"))["last"] or 0
+    upper = (last // size + 1 + ahead) * size
+    start = max((p.end for p in partitions() if p.end is not None), default=0)
+
+    created = []
+    while start < upper:
+        end = start + size
+        name = f"{SWIPE_TABLE}_p{start}_{end}"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {SWIPE_TABLE} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS ("
+                f"DELETE FROM {SWIPE_TABLE}_default WHERE session_id >= %s AND session_id < %s "
+                f"RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {SWIPE_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ({start}) TO ({end})"
+            )
+
+        created.append(name)
+        start = end
+
+    return created
+
+
+def session_activity(cutoff):
+    """
+    (live, over) Qs splitting sessions at cutoff. A session is over once
+    it ended before cutoff, or was never ended but created before it and
+    not swiped in since: abandoned sessions are never ended explicitly
+    and would otherwise stay live forever.
+    """
+    swiped_since = Exists(Swipe.objects.filter(session_id=OuterRef("pk"), created_at__gte=cutoff))
+    live = Q(ended_at__gte=cutoff) | Q(ended_at__isnull=True) & (Q(created_at__gte=cutoff) | swiped_since)
+    over = Q(ended_at__lt=cutoff) | Q(ended_at__isnull=True, created_at__lt=cutoff) & ~swiped_since
+    return live, over
+
+
+def archivable_partitions(cutoff):
+    """
+    core_swipe partitions whose sessions were all over before cutoff.
+    Session ids only grow, so nothing new can land in them.
+    """
+    live, _ = session_activity(cutoff)
+    floor = Session.objects.filter(live).aggregate(first=Min("id"))["first"]
+    if floor is None:
+        floor = (Session.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+    return [p for p in partitions() if p.end is not None and p.end <= floor]
+
+
+def archive_partition(partition):
+    """
+    Detaches a core_swipe partition and attaches it, foreign keys dropped,
+    to core_swipe_archive. Both are catalog-only changes; no rows move.
+    """
+    archived = partition.name.replace(SWIPE_TABLE, ARCHIVE_TABLE, 1)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {SWIPE_TABLE} DETACH PARTITION {partition.name}")
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [partition.name],
+        )
+        for (constraint,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {partition.name} DROP CONSTRAINT "{constraint}"')
+
+        cursor.execute(f"ALTER TABLE {partition.name} RENAME TO {archived}")
+        cursor.execute(
+            f"ALTER TABLE {ARCHIVE_TABLE} ATTACH PARTITION {archived} "
+            f"FOR VALUES FROM ({partition.start}) TO ({partition.end})"
+        )
+
+    return archived
+
+
+# -------------------------------------------------------------------
+# Row by row (unpartitioned tables)
+# -------------------------------------------------------------------
+
+def archive_ended_sessions(cutoff, batch_size=ARCHIVE_BATCH_SESSIONS):
+    """
+    Moves swipes of sessions over before cutoff into core_swipe_archive,
+    batch_size sessions per transaction. Returns the number of swipes moved.
+    """
+    _, over = session_activity(cutoff)
+    session_ids = list(
+        Session.objects.filter(over, swipe__isnull=False)
+        .distinct()
+        .values_list("id", flat=True)
+    )
+
+    moved = 0
+    for i in range(0, len(session_ids), batch_size):
+        batch = session_ids[i:i + batch_size]
+
+        with transaction.atomic():
+            swipes = Swipe.objects.filter(session_id__in=batch)
+            ArchivedSwipe.objects.bulk_create(
+                [
+                    ArchivedSwipe(
+                        id=swipe_id,
+                        session_id=session_id,
+                        user_id=user_id,
+                        movie_id=movie_id,
+                        reaction=reaction,
+                        created_at=created_at,
+                    )
+                    for swipe_id, session_id, user_id, movie_id, reaction, created_at in swipes.values_list(
+                        "id", "session_id", "user_id", "movie_id", "reaction", "created_at"
+                    )
+                ],
+                ignore_conflicts=True,
+            )
+            moved += swipes.delete()[0]
+
+    return moved
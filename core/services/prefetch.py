@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections
+
+from ..models import Session
+from ..serializers import MovieSerializer
+from .counters import session_counters
+from .decks import deck_store
+from .exposure import exposure_buffer
+from .recommendations import movies_in_order, session_deck
+from .seen import seen_store
+
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_THRESHOLD = getattr(settings, "DECK_PREFETCH_THRESHOLD", 8)
+PREFETCH_SIZE = getattr(settings, "DECK_PREFETCH_SIZE", 20)
+PREFETCH_WORKERS = getattr(settings, "DECK_PREFETCH_WORKERS", 2)
+
+executor = ThreadPoolExecutor(
+    max_workers=PREFETCH_WORKERS,
+    thread_name_prefix="deck-prefetch",
+)
+
+
+def maybe_prefetch(session_id, user_id):
+    """
+    Schedules the user's next cards once fewer than PREFETCH_THRESHOLD
+    served cards are left unswiped. Only reads in-memory deck state,
+    so it is cheap enough for the swipe path.
+    """
+    deck = deck_store.peek(session_id, user_id)
+    if deck is None or not deck.claim_prefetch(PREFETCH_THRESHOLD):
+        return False
+
+    executor.submit(prefetch_deck, session_id, user_id)
+    return True
+
+
+def prefetch_deck(session_id, user_id):
+    """
+    Builds the next page of the user's deck (reranking it if stale)
+    and pushes it to the session group as a deck_ready_event.
+    """
+    deck = deck_store.peek(session_id, user_id)
+
+    try:
+        session = Session.objects.select_related("genre", "host", "guest").get(id=session_id)
+        if session.ended_at or not session.genre_id:
+            return
+
+        user = session.host if session.host_id == user_id else session.guest
+
+        seen, _ = seen_store.get(session_id)
+        total_swipes, _ = session_counters.get(session_id)
+
+        current = session_deck(session, user, seen, total_swipes)
+
+        if current is deck:
+            movie_ids = current.page(seen, PREFETCH_SIZE, start=current.served_until, push=True)
+        else:
+            # Reranked in the background: leave out cards the client still holds
+            held = set(deck.unswiped_served()) if deck else set()
+            movie_ids = current.page(seen, PREFETCH_SIZE, skip=held, push=True)
+
+        if not movie_ids:
+            return
+
+        exposure_buffer.add(movie_ids)
+        movies = MovieSerializer(movies_in_order(movie_ids), many=True).data
+
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(
+                f"session_{session_id}",
+                {
+                    "type": "deck_ready_event",
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "movies": [dict(movie) for movie in movies],
+                }
+            )
+    except Exception:
+        logger.exception("Deck prefetch failed for session %s", session_id)
+    finally:
+        if deck is not None:
+            deck.prefetching = False
+        close_old_connections()
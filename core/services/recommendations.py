@@ -0,0 +1,256 @@
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Exists, Value
+
+from ..models import ColdStartDeck, Movie, PairChemistryVector, UserTasteVector
+from . import scoring
+from .candidates import candidate_index
+from .catalog import get_catalog_version
+from .decks import Deck, deck_fingerprint, deck_store, preferences_json
+from .metrics import null_timeline
+from .signals import load_ranking_signals, pair_ids
+from .ttlcache import TTLCache
+
+
+INDIAN_LANGUAGES = ["hi", "ta", "te", "bn", "mr", "gu", "kn", "ml", "pa"]
+PREFERENCE_KEYS = ["mood", "pace", "vibe", "era"]
+MIN_PREFERENCE_SCORE = 10
+
+POOL_CACHE_SIZE = getattr(settings, "CANDIDATE_POOL_CACHE_SIZE", 256)
+POOL_CACHE_TTL = getattr(settings, "CANDIDATE_POOL_CACHE_TTL_SECONDS", 300)
+
+# Base candidate pools shared across sessions, keyed by pool_key()
+pool_cache = TTLCache(POOL_CACHE_SIZE, POOL_CACHE_TTL)
+
+
+def combine_preferences(session):
+    """
+    Common ground between host and guest preferences.
+    Falls back to the union for any key with no overlap.
+    """
+    if not (session.host_preferences and session.guest_preferences):
+        return {}
+
+    host_prefs = session.host_preferences
+    guest_prefs = session.guest_preferences
+
+    # Find intersection (common ground)
+    combined_prefs = {
+        key: list(set(host_prefs.get(key, [])) & set(guest_prefs.get(key, [])))
+        for key in PREFERENCE_KEYS
+    }
+
+    # If no overlap, use union
+    for key in PREFERENCE_KEYS:
+        if not combined_prefs[key]:
+            combined_prefs[key] = list(set(host_prefs.get(key, [])) | set(guest_prefs.get(key, [])))
+
+    return combined_prefs
+
+
+def session_languages(session):
+    """
+    Languages a session draws from, or None when it has no language filter.
+    """
+    if session.selected_languages:
+        return session.selected_languages
+
+    # Fallback to industry if no languages set
+    if session.industry == "bollywood":
+        return INDIAN_LANGUAGES
+    if session.industry == "hollywood":
+        return ["en"]
+
+    # mixed = no language filter
+    return None
+
+
+def pool_key(session, catalog_version):
+    languages = session_languages(session)
+    return (
+        catalog_version,
+        session.genre_id,
+        tuple(sorted(set(languages))) if languages is not None else None,
+        session.industry,
+    )
+
+
+def candidate_pool(session, catalog_version=None):
+    """
+    (ids, features) of every movie in the session's genre, restricted to
+    its languages (or the industry fallback). Built from the in-memory
+    candidate index and shared by every session with the same filter.
+    The arrays are read-only; filtering them returns copies.
+    """
+    candidate_index.ensure_current(catalog_version)
+    version = candidate_index.version
+
+    # Catalog synced: every cached pool is stale
+    if scoring.feature_matrix.version != version:
+        pool_cache.clear()
+    scoring.feature_matrix.ensure_current(version)
+
+    key = pool_key(session, version)
+    pool = pool_cache.get(key)
+    if pool is None:
+        ids = candidate_index.lookup(session.genre_id, session_languages(session))
+        ids, features = scoring.feature_matrix.features(ids.tolist())
+        ids.flags.writeable = False
+        features.flags.writeable = False
+        pool = (ids, features)
+        pool_cache.set(key, pool)
+
+    return pool
+
+
+def unseen_pool(session, exclude_ids=(), catalog_version=None):
+    """
+    The shared pool minus exclude_ids, as (ids, features) copies.
+    """
+    ids, features = candidate_pool(session, catalog_version)
+
+    if not exclude_ids or not len(ids):
+        return ids.copy(), features.copy()
+
+    excluded = np.fromiter(exclude_ids, dtype=np.int64, count=len(exclude_ids))
+    keep = ~np.isin(ids, excluded, assume_unique=True)
+    return ids[keep], features[keep]
+
+
+def candidate_ids(session, exclude_ids=(), catalog_version=None):
+    """
+    Movie ids in the session's genre, restricted to its languages
+    (or the industry fallback), minus exclude_ids.
+    """
+    ids, _ = unseen_pool(session, exclude_ids, catalog_version)
+    return ids.tolist()
+
+
+def rank_candidates(session, user, pool, combined_prefs, timeline=null_timeline):
+    """
+    Scores an (ids, features) pool and returns movie ids best-first.
+    """
+    with timeline.stage("prefs"):
+        ids, features = pool
+        scores = np.zeros(len(ids))
+
+        # Preference matching (main signal)
+        if combined_prefs:
+            pref_scores = scoring.preference_scores(features, combined_prefs)
+
+            # ✅ STRICT FILTER: Skip movies with score < 10
+            keep = pref_scores >= MIN_PREFERENCE_SCORE
+            ids, features, scores = ids[keep], features[keep], pref_scores[keep]
+
+    with timeline.stage("signals"):
+        # Taste, chemistry and exposure for the whole pool in a fixed number of queries
+        signals = load_ranking_signals(user, session, ids.tolist())
+        features[:, scoring.EXPOSURE] = [signals.exposure.get(m, 0) for m in ids.tolist()]
+
+        # Taste signal (user history) + chemistry signal (pair history)
+        scores += signals.scores(ids.tolist())
+
+    with timeline.stage("rank"):
+        # Penalize overexposed movies
+        scores -= scoring.exposure_penalties(features)
+
+        # ✅ STEP 6: Sort by score (best first)
+        return scoring.rank(ids, scores)
+
+
+def cold_start_bucket(session, combined_prefs):
+    """
+    (genre id, languages key, preferences key) of a ColdStartDeck.
+    """
+    languages = session_languages(session)
+    languages_key = "*"
+    if languages is not None:
+        # selected_languages is user input of any length: hash it like the preferences
+        languages_key = hashlib.sha1(",".join(sorted(set(languages))).encode()).hexdigest()
+    preferences_key = hashlib.sha1(preferences_json(combined_prefs).encode()).hexdigest()
+    return session.genre_id, languages_key, preferences_key
+
+
+def cold_start_rows(session, user, combined_prefs, catalog_version):
+    """
+    (movie_ids, pool_size, has_taste, has_chemistry) rows of the
+    ColdStartDeck for the session's bucket and catalog version.
+    """
+    genre_id, languages_key, preferences_key = cold_start_bucket(session, combined_prefs)
+
+    has_chemistry = Value(False)
+    if session.guest_id:
+        user_a_id, user_b_id = pair_ids(session)
+        has_chemistry = Exists(
+            PairChemistryVector.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id)
+        )
+
+    return ColdStartDeck.objects.filter(
+        genre_id=genre_id,
+        languages_key=languages_key,
+        preferences_key=preferences_key,
+        catalog_version=catalog_version,
+    ).annotate(
+        has_taste=Exists(UserTasteVector.objects.filter(user_id=user.id)),
+        has_chemistry=has_chemistry,
+    ).values_list("movie_ids", "pool_size", "has_taste", "has_chemistry")
+
+
+def cold_start_deck(session, user, combined_prefs, catalog_version):
+    """
+    (movie ids, pool size) of the precomputed deck for the session's
+    bucket, or None if there is none for this catalog version or the user
+    or the pair already has taste/chemistry to rank with. One indexed read.
+    """
+    row = cold_start_rows(session, user, combined_prefs, catalog_version).first()
+
+    if row is None:
+        return None
+
+    movie_ids, pool_size, has_taste, has_chemistry = row
+    if has_taste or has_chemistry:
+        return None
+    return movie_ids, pool_size
+
+
+def session_deck(session, user, seen, total_swipes, timeline=null_timeline):
+    """
+    The user's ranked deck for this session, reranked only when
+    its fingerprint changed since it was stored.
+    """
+    combined_prefs = combine_preferences(session)
+    catalog_version = get_catalog_version()
+    fingerprint = deck_fingerprint(session, combined_prefs, total_swipes, catalog_version)
+
+    deck = deck_store.get(session.id, user.id, fingerprint)
+    if deck is not None and not (deck.partial and not deck.has_more()):
+        return deck
+
+    # Untouched session: serve the precomputed top of the deck
+    if not seen and deck is None:
+        with timeline.stage("candidates"):
+            cold = cold_start_deck(session, user, combined_prefs, catalog_version)
+        if cold is not None:
+            ranked_ids, pool_size = cold
+            deck = Deck(fingerprint, ranked_ids, pool_size, 0, partial=True)
+            deck_store.put(session.id, user.id, deck)
+            return deck
+
+    with timeline.stage("candidates"):
+        pool = unseen_pool(session, exclude_ids=seen, catalog_version=catalog_version)
+
+    pool_size = len(pool[0])
+    ranked_ids = []
+    if pool_size:
+        ranked_ids = rank_candidates(session, user, pool, combined_prefs, timeline).tolist()
+
+    deck = Deck(fingerprint, ranked_ids, pool_size, len(seen))
+    deck_store.put(session.id, user.id, deck)
+    return deck
+
+
+def movies_in_order(movie_ids):
+    movies_by_id = Movie.objects.in_bulk(movie_ids)
+    return [movies_by_id[movie_id] for movie_id in movie_ids if movie_id in movies_by_id]
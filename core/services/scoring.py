@@ -0,0 +1,287 @@
+import threading
+
+import numpy as np
+
+from ..models import Movie
+
+
+# -------------------------------------------------------------------
+# Keyword tables (shared with calculate_preference_score)
+# -------------------------------------------------------------------
+
+MOOD_KEYWORDS = {
+    "happy": ["comedy", "fun", "laugh", "joy", "light", "cheerful", "humorous", "hilarious", "amusing", "witty"],
+    "intense": ["thriller", "suspense", "intense", "dark", "serious", "gripping", "tense", "dramatic", "noir"],
+    "emotional": ["drama", "emotional", "moving", "heartfelt", "touching", "tear", "powerful", "profound", "poignant"],
+    "exciting": ["action", "adventure", "exciting", "fast-paced", "thrilling", "explosive", "dynamic", "spectacular"],
+}
+
+PACE_KEYWORDS = {
+    "fast": ["action", "fast", "intense", "quick", "thrilling", "explosive", "adrenaline", "rush", "rapid"],
+    "slow": ["slow", "deliberate", "thoughtful", "contemplative", "meditative", "quiet", "introspective", "patient"],
+    "balanced": ["balanced", "mix", "variety", "blend", "diverse", "moderate"],
+}
+
+VIBE_KEYWORDS = {
+    "feel-good": ["uplifting", "inspiring", "heartwarming", "positive", "hopeful", "optimistic", "joyful", "warm"],
+    "mind-bending": ["twist", "complex", "mystery", "puzzle", "psychological", "surreal", "enigmatic", "cryptic"],
+    "escapist": ["fantasy", "adventure", "magical", "world", "epic", "mythical", "otherworldly", "imaginative"],
+    "realistic": ["real", "authentic", "true", "based on", "documentary", "life", "actual", "gritty"],
+}
+
+ERA_BUCKETS = ["classic", "2000s", "2010s", "recent"]
+
+MOOD_POINTS = 8
+PACE_POINTS = 6
+VIBE_POINTS = 6
+ERA_MATCH_POINTS = 15
+ERA_ANY_POINTS = 5
+ERA_MISS_PENALTY = 20
+
+OVEREXPOSED_THRESHOLD = 50
+OVEREXPOSED_PENALTY = 5
+
+
+# -------------------------------------------------------------------
+# Feature layout
+# -------------------------------------------------------------------
+
+def _build_columns():
+    columns = {}
+    for name in MOOD_KEYWORDS:
+        columns[("mood", name)] = len(columns)
+    for name in PACE_KEYWORDS:
+        columns[("pace", name)] = len(columns)
+    for name in VIBE_KEYWORDS:
+        columns[("vibe", name)] = len(columns)
+    for name in ERA_BUCKETS:
+        columns[("era", name)] = len(columns)
+    for name in ("has_date", "year", "rating", "exposure"):
+        columns[name] = len(columns)
+    return columns
+
+
+COLUMNS = _build_columns()
+HAS_DATE = COLUMNS["has_date"]
+YEAR = COLUMNS["year"]
+RATING = COLUMNS["rating"]
+EXPOSURE = COLUMNS["exposure"]
+
+
+def era_bucket(year):
+    if year < 2000:
+        return "classic"
+    if year < 2010:
+        return "2000s"
+    if year < 2020:
+        return "2010s"
+    return "recent"
+
+
+def movie_features(title, overview, release_date, rating, tag_names=None):
+    """
+    Static feature row for one movie.
+    Mirrors the substring rules of calculate_preference_score; when the
+    movie's keyword tags were precomputed at sync time they are used
+    instead of scanning the text.
+    """
+    row = np.zeros(len(COLUMNS), dtype=np.float32)
+
+    if tag_names is not None:
+        for category in ("mood", "pace", "vibe"):
+            for name in tag_names:
+                col = COLUMNS.get((category, name))
+                if col is not None:
+                    row[col] = 1
+    else:
+        overview_lower = (overview or "").lower()
+        title_lower = (title or "").lower()
+
+        for name, keywords in MOOD_KEYWORDS.items():
+            if any(k in overview_lower or k in title_lower for k in keywords):
+                row[COLUMNS[("mood", name)]] = 1
+        for name, keywords in PACE_KEYWORDS.items():
+            if any(k in overview_lower for k in keywords):
+                row[COLUMNS[("pace", name)]] = 1
+        for name, keywords in VIBE_KEYWORDS.items():
+            if any(k in overview_lower for k in keywords):
+                row[COLUMNS[("vibe", name)]] = 1
+
+    if release_date:
+        row[HAS_DATE] = 1
+        row[YEAR] = release_date.year
+        row[COLUMNS[("era", era_bucket(release_date.year))]] = 1
+
+    row[RATING] = rating or 0
+    return row
+
+
+# -------------------------------------------------------------------
+# Process-wide feature matrix
+# -------------------------------------------------------------------
+
+class MovieFeatureMatrix:
+    """
+    Precomputed feature rows for every movie seen so far.
+    Rows are built once from title/overview and reused across requests;
+    only the exposure column is filled in per scoring call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._row_of = {}
+        self._data = np.zeros((0, len(COLUMNS)), dtype=np.float32)
+        self.version = None
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def invalidate(self):
+        with self._lock:
+            self._row_of = {}
+            self._data = np.zeros((0, len(COLUMNS)), dtype=np.float32)
+
+    def ensure_current(self, version):
+        """
+        Drops every row when the catalog version moved since they were built.
+        """
+        if version != self.version:
+            self.invalidate()
+            self.version = version
+
+    def _load(self, movie_ids):
+        rows = list(
+            Movie.objects.filter(id__in=movie_ids)
+            .values_list("id", "release_date", "rating", "tagged_at")
+        )
+
+        # Tagged movies are built from their tags, the rest from raw text
+        tagged = [movie_id for movie_id, _, _, tagged_at in rows if tagged_at]
+        untagged = [movie_id for movie_id, _, _, tagged_at in rows if not tagged_at]
+
+        tag_names = {movie_id: [] for movie_id in tagged}
+        if tagged:
+            for movie_id, name in Movie.tags.through.objects.filter(
+                movie_id__in=tagged
+            ).values_list("movie_id", "movietag__name"):
+                tag_names[movie_id].append(name)
+
+        texts = {}
+        if untagged:
+            texts = {
+                movie_id: (title, overview)
+                for movie_id, title, overview in Movie.objects.filter(
+                    id__in=untagged
+                ).values_list("id", "title", "overview")
+            }
+
+        with self._lock:
+            rows = [r for r in rows if r[0] not in self._row_of]
+            if not rows:
+                return
+
+            start = len(self._row_of)
+            needed = start + len(rows)
+            if needed > len(self._data):
+                grown = np.zeros((max(needed, 2 * len(self._data)), len(COLUMNS)), dtype=np.float32)
+                grown[:start] = self._data[:start]
+                self._data = grown
+
+            for offset, (movie_id, release_date, rating, _) in enumerate(rows):
+                title, overview = texts.get(movie_id, (None, None))
+                self._data[start + offset] = movie_features(
+                    title, overview, release_date, rating, tag_names.get(movie_id)
+                )
+                self._row_of[movie_id] = start + offset
+
+    def rows(self, movie_ids):
+        """
+        Row indexes for movie_ids, loading any movie not yet in the matrix.
+        Movies that no longer exist are dropped.
+        """
+        missing = [m for m in movie_ids if m not in self._row_of]
+        if missing:
+            self._load(missing)
+
+        row_of = self._row_of
+        return np.fromiter(
+            (row_of[m] for m in movie_ids if m in row_of),
+            dtype=np.int64
+        )
+
+    def features(self, movie_ids):
+        """
+        Returns (ids, features) for the pool. The exposure column is left
+        for the caller to fill from its own exposure counts.
+        """
+        movie_ids = list(movie_ids)
+        rows = self.rows(movie_ids)
+        ids = np.fromiter(
+            (m for m in movie_ids if m in self._row_of),
+            dtype=np.int64,
+            count=len(rows)
+        )
+        return ids, self._data[rows]
+
+
+feature_matrix = MovieFeatureMatrix()
+
+
+# -------------------------------------------------------------------
+# Vectorized scoring
+# -------------------------------------------------------------------
+
+def preference_scores(features, preferences):
+    """
+    Vectorized equivalent of calculate_preference_score
+    for every row of the feature matrix.
+    """
+    scores = np.zeros(len(features), dtype=np.float64)
+
+    for mood in preferences.get("mood", []):
+        col = COLUMNS.get(("mood", mood))
+        if col is not None:
+            scores += MOOD_POINTS * features[:, col]
+
+    for pace in preferences.get("pace", []):
+        col = COLUMNS.get(("pace", pace))
+        if col is not None:
+            scores += PACE_POINTS * features[:, col]
+
+    for vibe in preferences.get("vibe", []):
+        col = COLUMNS.get(("vibe", vibe))
+        if col is not None:
+            scores += VIBE_POINTS * features[:, col]
+
+    eras = preferences.get("era", [])
+    has_date = features[:, HAS_DATE] > 0
+    era_match = np.zeros(len(features), dtype=bool)
+
+    for era in eras:
+        if era == "any":
+            scores += ERA_ANY_POINTS * has_date
+            era_match |= has_date
+            continue
+
+        col = COLUMNS.get(("era", era))
+        if col is not None:
+            hit = features[:, col] > 0
+            scores += ERA_MATCH_POINTS * hit
+            era_match |= hit
+
+    if eras and "any" not in eras:
+        scores -= ERA_MISS_PENALTY * ~era_match
+
+    return scores
+
+
+def exposure_penalties(features):
+    return OVEREXPOSED_PENALTY * (features[:, EXPOSURE] > OVEREXPOSED_THRESHOLD)
+
+
+def rank(ids, scores):
+    """
+    Ids ordered best-first. Ties keep the incoming (ascending id) order.
+    """
+    order = np.argsort(-scores, kind="stable")
+    return ids[order]
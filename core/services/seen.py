@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..models import Swipe
+from .catalog import bump_version, get_version
+
+
+MAX_SESSIONS = 2000
+
+# Swipes committed out of id/clock order still land inside this window
+SETTLE_SECONDS = 30
+
+SEEN_VERSION_KEY = "core:seen_version:{}"
+SEEN_VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def get_seen_version(session_id):
+    """
+    Bumped when a swipe is removed (undo), which an incremental
+    refresh cannot see.
+    """
+    return get_version(SEEN_VERSION_KEY.format(session_id), SEEN_VERSION_TIMEOUT)
+
+
+def bump_seen_version(session_id):
+    return bump_version(SEEN_VERSION_KEY.format(session_id), SEEN_VERSION_TIMEOUT)
+
+
+class SessionSeen:
+    """
+    Swipes of one session: swipe id -> movie id, plus the movie id set.
+    A match always follows two likes and cannot be undone, so matched
+    movies are already in the set.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.swipes = {}
+        self.movie_ids = set()
+        self.refreshed_at = None
+
+    def extend(self, rows, refreshed_at):
+        for swipe_id, movie_id in rows:
+            self.swipes[swipe_id] = movie_id
+            self.movie_ids.add(movie_id)
+        self.refreshed_at = refreshed_at
+
+    @property
+    def swipe_count(self):
+        return len(self.swipes)
+
+
+class SeenStore:
+    """
+    Process-wide, LRU-bounded seen-sets keyed by session.
+
+    The first request of a session loads its swipes once; after that each
+    request only reads swipes created in the last SETTLE_SECONDS, so the
+    query stays the same size however long the session runs.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self.max_sessions = max_sessions
+
+    def get(self, session_id):
+        """
+        Refreshed seen-set for the session. Returns (movie ids, swipe count);
+        the set is a copy the caller may keep.
+        """
+        version = get_seen_version(session_id)
+        now = timezone.now()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry.version != version:
+                entry = None
+
+        swipes = Swipe.objects.filter(session_id=session_id)
+        if entry is None:
+            entry = SessionSeen(version)
+        else:
+            swipes = swipes.filter(
+                created_at__gte=entry.refreshed_at - timedelta(seconds=SETTLE_SECONDS)
+            )
+        rows = list(swipes.values_list("id", "movie_id"))
+
+        with self._lock:
+            entry.extend(rows, now)
+            self._sessions[session_id] = entry
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+            return set(entry.movie_ids), entry.swipe_count
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+seen_store = SeenStore()
@@ -0,0 +1,109 @@
+import numpy as np
+
+from ..models import Movie, MovieExposure, PairChemistryVector, UserTasteVector
+from .tag_graph import tag_graph
+from .taste import unpack
+
+
+TASTE_WEIGHT = 2
+CHEMISTRY_WEIGHT = 3
+RELATED_TASTE_WEIGHT = 1
+
+
+def pair_ids(session):
+    """
+    normalize_pair() on ids, so the users never have to be fetched.
+    """
+    return tuple(sorted((session.host_id, session.guest_id)))
+
+
+class RankingSignals:
+    """
+    Taste, chemistry and exposure data for one ranking pass.
+    Taste, chemistry and related taste are dense vectors indexed by tag id,
+    so a movie's score is one dot product with its tag vector.
+    """
+
+    def __init__(self, tags_by_movie, taste, chemistry, exposure, related=None):
+        self.tags_by_movie = tags_by_movie
+        self.taste = taste
+        self.chemistry = chemistry
+        self.exposure = exposure
+        self.related = related if related is not None else np.zeros(0, dtype=np.float32)
+
+    def weights(self, size):
+        """
+        Combined per-tag weight vector, zero-padded to size.
+        """
+        weights = np.zeros(size)
+        for vector, weight in (
+            (self.taste, TASTE_WEIGHT),
+            (self.chemistry, CHEMISTRY_WEIGHT),
+            (self.related, RELATED_TASTE_WEIGHT),
+        ):
+            n = min(len(vector), size)
+            weights[:n] += vector[:n] * weight
+        return weights
+
+    def scores(self, movie_ids):
+        """
+        Taste + chemistry contribution for each movie, in movie_ids order.
+        """
+        movie_ids = list(movie_ids)
+        rows = []
+        tag_ids = []
+        for row, movie_id in enumerate(movie_ids):
+            tags = self.tags_by_movie.get(movie_id, ())
+            rows.extend([row] * len(tags))
+            tag_ids.extend(tags)
+
+        if not tag_ids:
+            return np.zeros(len(movie_ids))
+
+        tag_ids = np.asarray(tag_ids, dtype=np.int64)
+        weights = self.weights(int(tag_ids.max()) + 1)
+
+        # Sparse movie x tag incidence times the weight vector
+        return np.bincount(rows, weights=weights[tag_ids], minlength=len(movie_ids))
+
+
+def load_ranking_signals(user, session, movie_ids):
+    """
+    Loads every per-movie signal for the pool in a fixed number of queries:
+    tag links, the user's taste vector, the pair's chemistry vector and
+    exposure counts. The tag graph is served from memory.
+    """
+    movie_ids = list(movie_ids)
+
+    tags_by_movie = {}
+    for movie_id, tag_id in Movie.tags.through.objects.filter(
+        movie_id__in=movie_ids
+    ).values_list("movie_id", "movietag_id"):
+        tags_by_movie.setdefault(movie_id, []).append(tag_id)
+
+    taste = unpack(
+        UserTasteVector.objects.filter(user=user).values_list("vector", flat=True).first()
+    )
+
+    # Liked tags expanded into related tags via the precomputed closure
+    liked = np.nonzero(taste > 0)[0]
+    expanded = tag_graph.expand(dict(zip(liked.tolist(), taste[liked].tolist())))
+    related = np.zeros(max(expanded, default=-1) + 1, dtype=np.float32)
+    for tag_id, weight in expanded.items():
+        related[tag_id] = weight
+
+    chemistry = unpack(None)
+    if session.guest_id:
+        user_a_id, user_b_id = pair_ids(session)
+        chemistry = unpack(
+            PairChemistryVector.objects.filter(
+                user_a_id=user_a_id, user_b_id=user_b_id
+            ).values_list("matches", flat=True).first()
+        )
+
+    exposure = dict(
+        MovieExposure.objects.filter(movie_id__in=movie_ids)
+        .values_list("movie_id", "exposed_count")
+    )
+
+    return RankingSignals(tags_by_movie, taste, chemistry, exposure, related)
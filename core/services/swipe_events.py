@@ -0,0 +1,89 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from ..models import Swipe
+from .analytics import analytics_queue, swipe_event
+from .decks import deck_store
+from .prefetch import maybe_prefetch
+from .signals import pair_ids
+
+
+def session_group(session_id):
+    return f"session_{session_id}"
+
+
+def swipe_messages(session, user_id, recorded):
+    """
+    Channel layer messages for recorded swipes (SwipeResult or SwipeItem):
+    one swipe_event for the batch plus a match_event per match.
+    """
+    messages = [{"type": "swipe_event", "user_id": user_id}]
+
+    for swipe in recorded:
+        if swipe.match_created:
+            messages.append({
+                "type": "match_event",
+                "session_id": session.id,
+                "movie_id": swipe.movie.id,
+                "movie_title": swipe.movie.title or "Unknown Movie",
+            })
+
+    return messages
+
+
+def after_swipes(session, user_id, recorded):
+    """
+    In-process bookkeeping once swipes are committed: marks them seen in
+    the swiper's deck, tops the deck up when it runs low, and queues the
+    taste/chemistry events for the analytics worker. Never touches the
+    database, so async callers can run it inline.
+    """
+    for swipe in recorded:
+        deck_store.mark_seen(session.id, swipe.movie.id)
+    maybe_prefetch(session.id, user_id)
+
+    pair = pair_ids(session)
+    for swipe in recorded:
+        analytics_queue.add(swipe_event(
+            user_id,
+            pair,
+            swipe.movie.id,
+            liked=swipe.swipe.reaction == Swipe.LIKE,
+            matched=swipe.match_created,
+        ))
+
+
+def publish_swipes(session, user_id, recorded):
+    """
+    after_swipes() plus the WebSocket fan-out, from sync code.
+    """
+    if not recorded:
+        return
+
+    after_swipes(session, user_id, recorded)
+
+    channel_layer = get_channel_layer()
+    try:
+        if channel_layer:
+            for message in swipe_messages(session, user_id, recorded):
+                async_to_sync(channel_layer.group_send)(session_group(session.id), message)
+    except Exception:
+        pass  # Continue even if WebSocket fails
+
+
+async def apublish_swipes(channel_layer, session, user_id, recorded):
+    """
+    publish_swipes() from async code (consumers, async views), awaiting
+    the channel layer directly.
+    """
+    if not recorded:
+        return
+
+    after_swipes(session, user_id, recorded)
+
+    try:
+        if channel_layer:
+            for message in swipe_messages(session, user_id, recorded):
+                await channel_layer.group_send(session_group(session.id), message)
+    except Exception:
+        pass  # Continue even if WebSocket fails
@@ -0,0 +1,189 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import status
+
+from ..models import Match, Movie, Session, Swipe
+from .counters import session_counters
+from .likes import like_store
+
+
+MAX_BATCH_SIZE = getattr(settings, "SWIPE_BATCH_MAX_SIZE", 50)
+
+
+class SwipeRejected(Exception):
+    """
+    A swipe the session rules do not allow, with the HTTP status to answer.
+    """
+
+    def __init__(self, error, status_code):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+
+
+class SwipeItem:
+    """
+    Outcome of one swipe in a batch. error/status_code are set when it
+    was rejected; movie and swipe when it was recorded.
+    """
+
+    def __init__(self, movie_id, reaction):
+        self.movie_id = movie_id
+        self.reaction = reaction
+        self.movie = None
+        self.swipe = None
+        self.match_created = False
+        self.error = None
+        self.status_code = status.HTTP_201_CREATED
+
+    def reject(self, error, status_code):
+        self.error = error
+        self.status_code = status_code
+
+    @property
+    def recorded(self):
+        return self.error is None
+
+
+class SwipeResult:
+    def __init__(self, session, movie, swipe, match_created):
+        self.session = session
+        self.movie = movie
+        self.swipe = swipe
+        self.match_created = match_created
+
+
+def record_swipes(session_id, user_id, swipes):
+    """
+    Records an ordered list of (movie_id, reaction) swipes for one user
+    atomically. Returns (session, [SwipeItem]) in input order.
+
+    The session row is locked for the duration, so the two partners'
+    swipes are applied one after the other: the duplicate checks and the
+    partner's earlier likes can never race. Candidate matches are checked
+    against the Match rows before they are inserted.
+
+    Session state and membership are checked once for the whole batch
+    (SwipeRejected); a bad item only rejects that item. Earlier swipes and
+    matches come from like_store set lookups, so the cost is fixed however
+    long the batch: lock session, load movies, insert swipes, and if
+    anything matched, read and insert matches. Counters are only bumped in memory (session_counters).
+    """
+    for attempt in range(2):
+        items = [SwipeItem(movie_id, reaction) for movie_id, reaction in swipes]
+
+        try:
+            return _record_swipes(session_id, user_id, items)
+        except SwipeRejected:
+            raise
+        except IntegrityError:
+            # like_store missed an earlier swipe (evicted, or written by a
+            # worker it isn't shared with): reload it from the rows and retry
+            like_store.discard(session_id)
+            session_counters.discard(session_id)
+            if attempt:
+                raise SwipeRejected("Already swiped on this movie", status.HTTP_409_CONFLICT)
+        except Exception:
+            # The stores may hold swipes that were rolled back
+            like_store.discard(session_id)
+            session_counters.discard(session_id)
+            raise
+
+
+def _record_swipes(session_id, user_id, items):
+    with transaction.atomic():
+        session = Session.objects.select_for_update().only(
+            "id", "host_id", "guest_id", "ended_at"
+        ).filter(id=session_id).first()
+
+        if session is None:
+            raise SwipeRejected("Session not found", status.HTTP_400_BAD_REQUEST)
+
+        if session.ended_at:
+            raise SwipeRejected("Session has ended", status.HTTP_403_FORBIDDEN)
+
+        if not session.host_id or not session.guest_id:
+            raise SwipeRejected("Session is not ready yet", status.HTTP_400_BAD_REQUEST)
+
+        if user_id not in (session.host_id, session.guest_id):
+            raise SwipeRejected("You are not part of this session", status.HTTP_403_FORBIDDEN)
+
+        partner_id = session.guest_id if user_id == session.host_id else session.host_id
+        movie_ids = {item.movie_id for item in items}
+
+        movies = Movie.objects.only("id", "title").in_bulk(movie_ids)
+
+        # {movie_id: {user_id: reaction}}, at most one entry per partner
+        reactions, matched_ids = like_store.reactions(
+            session.id, (user_id, partner_id), movie_ids
+        )
+
+        recorded = []
+        for item in items:
+            movie = movies.get(item.movie_id)
+            by_user = reactions[item.movie_id]
+
+            if movie is None:
+                item.reject("Movie not found", status.HTTP_400_BAD_REQUEST)
+            elif item.movie_id in matched_ids:
+                item.reject("This movie is already matched", status.HTTP_409_CONFLICT)
+            elif user_id in by_user:
+                item.reject("Already swiped on this movie", status.HTTP_409_CONFLICT)
+            else:
+                item.movie = movie
+                item.match_created = (
+                    item.reaction == Swipe.LIKE and by_user.get(partner_id) == Swipe.LIKE
+                )
+                by_user[user_id] = item.reaction
+                if item.match_created:
+                    matched_ids.add(item.movie_id)
+                recorded.append(item)
+
+        if not recorded:
+            return session, items
+
+        created = Swipe.objects.bulk_create([
+            Swipe(session_id=session.id, user_id=user_id, movie_id=item.movie_id, reaction=item.reaction)
+            for item in recorded
+        ])
+        for item, swipe in zip(recorded, created):
+            item.swipe = swipe
+
+        matched = [item for item in recorded if item.match_created]
+        if matched:
+            # like_store may have missed a match: the rows decide which are
+            # new. Nobody else can insert one while we hold the session lock.
+            existing = set(Match.objects.filter(
+                session_id=session.id, movie_id__in=[item.movie_id for item in matched]
+            ).values_list("movie_id", flat=True))
+            for item in matched:
+                item.match_created = item.movie_id not in existing
+            matched = [item for item in matched if item.match_created]
+
+            Match.objects.bulk_create(
+                [Match(session_id=session.id, movie_id=item.movie_id) for item in matched]
+            )
+
+        # SessionStats is written by session_counters, off the swipe path
+        session_counters.add(session.id, len(recorded), len(matched))
+
+        like_store.record(
+            session.id,
+            user_id,
+            [(item.movie_id, item.reaction) for item in recorded],
+            [item.movie_id for item in matched],
+        )
+
+    return session, items
+
+
+def record_swipe(session_id, user_id, movie_id, reaction):
+    """
+    Records one swipe through record_swipes() and returns a SwipeResult.
+    Raises SwipeRejected if the swipe was not recorded.
+    """
+    session, (item,) = record_swipes(session_id, user_id, [(movie_id, reaction)])
+
+    if not item.recorded:
+        raise SwipeRejected(item.error, item.status_code)
+    return SwipeResult(session, item.movie, item.swipe, item.match_created)
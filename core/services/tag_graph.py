@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+
+from ..models import MovieTagRelation
+from .catalog import get_tag_graph_version
+
+
+MAX_HOPS = 3
+HOP_DECAY = 0.5
+
+
+class TagGraph:
+    """
+    Weighted k-hop closure of the MovieTagRelation graph.
+
+    closure[i, j] = sum over h = 1..MAX_HOPS of HOP_DECAY^(h-1) * (W^h)[i, j],
+    so expanding a set of liked tags is one vector-matrix product.
+    Rebuilt whenever the tag graph version moves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._index = {}
+        self._tag_ids = np.zeros(0, dtype=np.int64)
+        self._closure = np.zeros((0, 0))
+
+    def rebuild(self, version=None):
+        if version is None:
+            version = get_tag_graph_version()
+
+        edges = list(
+            MovieTagRelation.objects.values_list("from_tag_id", "to_tag_id", "weight")
+        )
+
+        tag_ids = sorted({tag_id for edge in edges for tag_id in edge[:2]})
+        index = {tag_id: i for i, tag_id in enumerate(tag_ids)}
+
+        weights = np.zeros((len(tag_ids), len(tag_ids)))
+        for from_tag_id, to_tag_id, weight in edges:
+            weights[index[from_tag_id], index[to_tag_id]] = weight
+
+        closure = np.zeros_like(weights)
+        hop = np.eye(len(tag_ids))
+        for h in range(MAX_HOPS):
+            hop = hop @ weights
+            closure += (HOP_DECAY ** h) * hop
+
+        with self._lock:
+            self._index = index
+            self._tag_ids = np.array(tag_ids, dtype=np.int64)
+            self._closure = closure
+            self.version = version
+
+    def ensure_current(self, version=None):
+        if version is None:
+            version = get_tag_graph_version()
+        if version != self.version:
+            self.rebuild(version)
+
+    def expand(self, tag_weights):
+        """
+        {tag_id: weight} -> {related_tag_id: weight} through the closure.
+        Tags outside the graph contribute nothing.
+        """
+        self.ensure_current()
+
+        with self._lock:
+            index, tag_ids, closure = self._index, self._tag_ids, self._closure
+
+        vector = np.zeros(len(index))
+        for tag_id, weight in tag_weights.items():
+            i = index.get(tag_id)
+            if i is not None:
+                vector[i] = weight
+
+        if not vector.any():
+            return {}
+
+        expanded = vector @ closure
+        hits = np.nonzero(expanded)[0]
+        return dict(zip(tag_ids[hits].tolist(), expanded[hits].tolist()))
+
+
+tag_graph = TagGraph()
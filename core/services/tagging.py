@@ -0,0 +1,135 @@
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Movie, MovieTag
+from .scoring import MOOD_KEYWORDS, PACE_KEYWORDS, VIBE_KEYWORDS
+
+
+# -------------------------------------------------------------------
+# Single multi-pattern matcher over every keyword table
+# -------------------------------------------------------------------
+
+KEYWORD_TABLES = {
+    "mood": MOOD_KEYWORDS,
+    "pace": PACE_KEYWORDS,
+    "vibe": VIBE_KEYWORDS,
+}
+
+# Mood keywords also count when they appear in the title
+TITLE_CATEGORIES = {"mood"}
+
+# Every keyword-derived tag, e.g. "happy", "slow", "mind-bending"
+KEYWORD_TAGS = [name for table in KEYWORD_TABLES.values() for name in table]
+
+
+def _build_matcher():
+    owners = {}
+    for category, table in KEYWORD_TABLES.items():
+        for name, keywords in table.items():
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add((category, name))
+
+    keywords = sorted(owners, key=len, reverse=True)
+
+    # A lookahead finds the longest keyword starting at every position;
+    # any shorter keyword starting there is one of its prefixes.
+    prefixes = {
+        keyword: [other for other in keywords if keyword.startswith(other)]
+        for keyword in keywords
+    }
+
+    pattern = re.compile("(?=(%s))" % "|".join(re.escape(k) for k in keywords))
+    return pattern, owners, prefixes
+
+
+_PATTERN, _OWNERS, _PREFIXES = _build_matcher()
+
+
+def keyword_hits(text):
+    """
+    Every keyword that occurs in text as a substring, found in one scan.
+    """
+    found = set()
+    for match in _PATTERN.finditer(text.lower()):
+        found.update(_PREFIXES[match.group(1)])
+    return found
+
+
+def keyword_tag_names(title, overview):
+    """
+    Tag names for a movie, following the same substring rules as
+    calculate_preference_score (moods also match the title).
+    """
+    names = set()
+
+    for keyword in keyword_hits(overview or ""):
+        for category, name in _OWNERS[keyword]:
+            names.add(name)
+
+    for keyword in keyword_hits(title or ""):
+        for category, name in _OWNERS[keyword]:
+            if category in TITLE_CATEGORIES:
+                names.add(name)
+
+    return names
+
+
+# -------------------------------------------------------------------
+# Bulk tag writer
+# -------------------------------------------------------------------
+
+def keyword_tags():
+    """
+    {name: MovieTag} for the keyword vocabulary, creating missing tags.
+    Only missing names are inserted: on Postgres every conflicting insert
+    still burns a sequence value, which would spread the tag ids that
+    index the taste vectors.
+    """
+    tags = {tag.name: tag for tag in MovieTag.objects.filter(name__in=KEYWORD_TAGS)}
+    missing = [name for name in KEYWORD_TAGS if name not in tags]
+
+    if missing:
+        MovieTag.objects.bulk_create(
+            [MovieTag(name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        tags = {tag.name: tag for tag in MovieTag.objects.filter(name__in=KEYWORD_TAGS)}
+
+    return tags
+
+
+def tag_movies(movies, tags=None):
+    """
+    Replaces the keyword tags of the given movies in bulk.
+    Tags outside the keyword vocabulary are left untouched.
+    Returns the number of tag links written.
+    """
+    movies = list(movies)
+    if not movies:
+        return 0
+
+    tags = tags or keyword_tags()
+    Through = Movie.tags.through
+    now = timezone.now()
+
+    links = [
+        Through(movie_id=movie.id, movietag_id=tags[name].id)
+        for movie in movies
+        for name in keyword_tag_names(movie.title, movie.overview)
+    ]
+
+    movie_ids = [movie.id for movie in movies]
+    for movie in movies:
+        movie.tagged_at = now
+
+    with transaction.atomic():
+        Through.objects.filter(
+            movie_id__in=movie_ids,
+            movietag_id__in=[tag.id for tag in tags.values()],
+        ).delete()
+        Through.objects.bulk_create(links, ignore_conflicts=True, batch_size=5000)
+        Movie.objects.filter(id__in=movie_ids).update(tagged_at=now)
+
+    return len(links)
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+# -------------------------------------------------------------------
+# Packed tag vectors
+# -------------------------------------------------------------------
+
+DTYPE = np.dtype("<f4")
+
+
+def unpack(data, size=0):
+    """
+    bytes -> float32 array indexed by tag id, zero-padded to size.
+    """
+    vector = np.frombuffer(bytes(data or b""), dtype=DTYPE)
+    if len(vector) < size:
+        vector = np.pad(vector, (0, size - len(vector)))
+    return vector.astype(np.float32, copy=True)
+
+
+def pack(vector):
+    return np.asarray(vector, dtype=DTYPE).tobytes()
+
+
+def add_at(data, tag_ids, delta):
+    """
+    Adds delta to every tag id in the packed vector, growing it when
+    a tag id is past its end. Returns the new packed bytes.
+    """
+    tag_ids = np.asarray(list(tag_ids), dtype=np.int64)
+    size = int(tag_ids.max()) + 1 if len(tag_ids) else 0
+    vector = unpack(data, size)
+    np.add.at(vector, tag_ids, delta)
+    return pack(vector)
+
+
+def add_counts(data, counts):
+    """
+    add_at() with a different delta per tag: {tag_id: delta}.
+    """
+    return add_at(data, list(counts), np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import MovieTag, MovieTagRelation
+from .services.catalog import bump_tag_graph_version
+
+
+@receiver(post_save, sender=MovieTagRelation)
+@receiver(post_delete, sender=MovieTagRelation)
+@receiver(post_delete, sender=MovieTag)
+def tag_graph_changed(sender, **kwargs):
+    """
+    Every process rebuilds its tag-graph closure on next use,
+    once the change is committed.
+    """
+    transaction.on_commit(bump_tag_graph_version)
@@ -1,3 +1,1281 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .models import (
+    ArchivedSwipe,
+    CatalogVersion,
+    ColdStartDeck,
+    Genre,
+    Match,
+    Movie,
+    MovieExposure,
+    MovieTag,
+    MovieTagRelation,
+    PairChemistryVector,
+    Session,
+    SessionStats,
+    Swipe,
+    UserTasteVector,
+)
+from .middleware import TokenAuthMiddleware
+from .routing import websocket_urlpatterns
+from .services import scoring
+from .services.analytics import AnalyticsQueue, analytics_queue, swipe_event
+from .services.candidates import candidate_index
+from .services.catalog import CATALOG_VERSION_KEY, bump_catalog_version, get_catalog_version
+from .services.cold_start import ColdStartBuilder, build_cold_start_decks, cold_start_builder
+from .services.counters import session_counters
+from .services.decks import Deck, DeckStore, deck_store
+from .services.exposure import ExposureBuffer, exposure_buffer
+from .services.idempotency import IN_PROGRESS, cache_key
+from .services.likes import LIKES_KEY, CacheLikeStore, LikeStore, like_store
+from .services.metrics import MetricsRegistry, Timeline, metrics
+from .services.prefetch import maybe_prefetch, prefetch_deck
+from .services.partitions import (
+    SWIPE_PARTITION_SESSIONS,
+    Partition,
+    archivable_partitions,
+    archive_ended_sessions,
+    archive_partition,
+    is_partitioned,
+    partitions,
+)
+from .services.recommendations import (
+    INDIAN_LANGUAGES,
+    candidate_ids,
+    candidate_pool,
+    combine_preferences,
+    pool_cache,
+    rank_candidates,
+    session_deck,
+)
+from .services.seen import SeenStore, bump_seen_version, seen_store
+from .services.signals import load_ranking_signals
+from .services.swipes import SwipeRejected, record_swipe, record_swipes
+from .services.tag_graph import tag_graph
+from .services.tagging import KEYWORD_TAGS, keyword_tag_names, keyword_tags, tag_movies
+from .services.taste import add_at, unpack
+from .urls import hot_path_urls
+from .views import calculate_preference_score
+
+
+def hold_session_counters(test):
+    """
+    Keeps session_counters off its background thread for the test and
+    drops what it counted, so nothing is left for the atexit flush once
+    the test database is gone.
+    """
+    session_counters.clear()
+    patcher = mock.patch.object(session_counters, "autostart", False)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    test.addCleanup(session_counters.clear)
+
+
+class PreferenceScoringParityTests(TestCase):
+    """
+    The vectorized engine must score and rank exactly like
+    calculate_preference_score.
+    """
+
+    OVERVIEWS = [
+        ("Laugh Riot", "A hilarious comedy about a witty family.", date(1995, 5, 1)),
+        ("Dark Waters", "A gripping, tense thriller with a dark twist.", date(2004, 3, 2)),
+        ("Slow River", "A quiet, contemplative drama about real life.", date(2015, 7, 9)),
+        ("Skyfall Run", "Explosive action and adrenaline in a magical world.", date(2022, 1, 1)),
+        ("Untitled", "", None),
+        ("Heartfelt", "An uplifting, heartwarming and moving story based on true events.", date(2019, 12, 31)),
+        ("Puzzle Box", "A complex psychological mystery with a surreal blend.", date(2000, 1, 1)),
+        ("Fun Times", "Nothing to see here.", date(2010, 6, 6)),
+    ]
+
+    PREFERENCES = [
+        {},
+        {"mood": ["happy"], "pace": [], "vibe": [], "era": []},
+        {"mood": ["intense", "exciting"], "pace": ["fast"], "vibe": ["mind-bending"], "era": ["2000s"]},
+        {"mood": ["emotional"], "pace": ["slow", "balanced"], "vibe": ["realistic", "feel-good"], "era": ["2010s", "recent"]},
+        {"mood": ["happy", "unknown"], "pace": ["fast"], "vibe": ["escapist"], "era": ["any"]},
+        {"mood": [], "pace": [], "vibe": [], "era": ["classic", "any"]},
+        {"mood": ["exciting"], "pace": [], "vibe": [], "era": ["recent", "recent"]},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movies = [
+            Movie.objects.create(
+                tmdb_id=i,
+                title=title,
+                overview=overview,
+                release_date=release_date,
+                rating=6.5,
+            )
+            for i, (title, overview, release_date) in enumerate(cls.OVERVIEWS, start=1)
+        ]
+
+    def setUp(self):
+        scoring.feature_matrix.invalidate()
+
+    def test_scores_match_python_scorer(self):
+        ids, features = scoring.feature_matrix.features([m.id for m in self.movies])
+
+        for prefs in self.PREFERENCES:
+            vectorized = scoring.preference_scores(features, prefs)
+            expected = [calculate_preference_score(m, prefs) for m in self.movies]
+            self.assertEqual(vectorized.tolist(), expected, prefs)
+
+    def test_ranking_matches_python_sort(self):
+        ids, features = scoring.feature_matrix.features([m.id for m in self.movies])
+
+        for prefs in self.PREFERENCES:
+            scored = [(calculate_preference_score(m, prefs), m.id) for m in self.movies]
+            scored.sort(key=lambda x: x[0], reverse=True)
+
+            ranked = scoring.rank(ids, scoring.preference_scores(features, prefs))
+            self.assertEqual(ranked.tolist(), [movie_id for _, movie_id in scored], prefs)
+
+    def test_sync_time_tags_match_text_features(self):
+        movie_ids = [m.id for m in self.movies]
+        _, from_text = scoring.feature_matrix.features(movie_ids)
+
+        tag_movies(Movie.objects.filter(id__in=movie_ids))
+        scoring.feature_matrix.invalidate()
+
+        with self.assertNumQueries(2):
+            _, from_tags = scoring.feature_matrix.features(movie_ids)
+        self.assertEqual(from_tags.tolist(), from_text.tolist())
+
+        heartfelt = Movie.objects.get(title="Heartfelt")
+        self.assertEqual(
+            set(heartfelt.tags.values_list("name", flat=True)),
+            {"emotional", "feel-good", "realistic"},
+        )
+
+
+class MovieTaggingTests(TestCase):
+    """
+    Movies created or edited through the API are (re)tagged right away
+    instead of waiting for the next tag_movies run.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("editor", "editor@example.com", "pw123456"))
+        patcher = mock.patch.object(cold_start_builder, "autostart", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tag_names(self, movie_id):
+        return set(Movie.objects.get(id=movie_id).tags.values_list("name", flat=True))
+
+    def test_create_and_update_retag(self):
+        created = self.client.post(
+            "/api/movies/create/",
+            {"tmdb_id": 9900, "title": "Night Shift", "overview": "A hilarious, happy romp."},
+            format="json",
+            secure=True,
+        )
+        movie_id = created.json()["id"]
+        self.assertEqual(self.tag_names(movie_id), keyword_tag_names("Night Shift", "A hilarious, happy romp."))
+        self.assertIsNotNone(Movie.objects.get(id=movie_id).tagged_at)
+
+        self.client.patch(
+            f"/api/movies/{movie_id}/update/", {"overview": "A slow, quiet drama."}, format="json", secure=True
+        )
+        self.assertEqual(self.tag_names(movie_id), keyword_tag_names("Night Shift", "A slow, quiet drama."))
+
+    def test_keyword_tags_only_inserts_missing_names(self):
+        keyword_tags()
+        with self.assertNumQueries(1):
+            tags = keyword_tags()
+        self.assertEqual(set(tags), set(KEYWORD_TAGS))
+
+
+class RankingSignalsQueryTests(TestCase):
+    """
+    Loading signals must cost the same number of queries
+    however large the candidate pool is.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("host", "host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("guest", "guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="SIG001", host=cls.host, guest=cls.guest)
+
+        tags = [MovieTag.objects.create(name=name) for name in ("chaotic", "dark humor", "slow burn")]
+        cls.movies = []
+        for i in range(60):
+            movie = Movie.objects.create(tmdb_id=1000 + i, title=f"Movie {i}")
+            movie.tags.add(tags[i % 3], tags[(i + 1) % 3])
+            cls.movies.append(movie)
+
+        UserTasteVector.objects.create(user=cls.host, vector=add_at(b"", [tags[0].id], 4 - 1))
+        PairChemistryVector.objects.create(
+            user_a=cls.host, user_b=cls.guest, matches=add_at(b"", [tags[1].id], 2)
+        )
+        MovieExposure.objects.create(movie=cls.movies[0], exposed_count=70)
+
+    def setUp(self):
+        tag_graph.rebuild()
+
+    def test_fixed_query_count(self):
+        for size in (5, 60):
+            ids = [m.id for m in self.movies[:size]]
+            with self.assertNumQueries(4):
+                signals = load_ranking_signals(self.host, self.session, ids)
+            self.assertEqual(len(signals.tags_by_movie), size)
+
+    def test_scores(self):
+        ids = [m.id for m in self.movies[:3]]
+        signals = load_ranking_signals(self.host, self.session, ids)
+
+        # movie 0: chaotic + dark humor, movie 1: dark humor + slow burn, movie 2: slow burn + chaotic
+        self.assertEqual(signals.scores(ids).tolist(), [3 * 2 + 2 * 3, 2 * 3, 3 * 2])
+        self.assertEqual(signals.exposure, {self.movies[0].id: 70})
+
+    def test_related_tags_expand_liked_tags(self):
+        chaotic, dark_humor, slow_burn = MovieTag.objects.order_by("id")
+        with self.captureOnCommitCallbacks(execute=True):
+            MovieTagRelation.objects.create(from_tag=chaotic, to_tag=dark_humor, weight=1.0)
+            MovieTagRelation.objects.create(from_tag=dark_humor, to_tag=slow_burn, weight=0.5)
+
+        # Net taste for "chaotic" is 3: one hop to dark humor, two hops to slow burn
+        self.assertEqual(
+            tag_graph.expand({chaotic.id: 3}),
+            {dark_humor.id: 3.0, slow_burn.id: 3 * 0.5 * 0.5},
+        )
+
+        ids = [self.movies[1].id]  # dark humor + slow burn
+        signals = load_ranking_signals(self.host, self.session, ids)
+        self.assertEqual(signals.scores(ids).tolist(), [2 * 3 + 3.0 + 0.75])
+
+
+class AnalyticsQueueTests(TestCase):
+    """
+    Swipe events are folded into the taste and chemistry vectors in
+    batches whose query count does not depend on the batch size.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("vec-host", "vec-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("vec-guest", "vec-guest@example.com", "pw123456")
+        cls.pair = (cls.host.id, cls.guest.id)
+
+        tags = [MovieTag.objects.create(name=f"vec-{i}") for i in range(3)]
+        cls.tag_ids = [tag.id for tag in tags]
+        cls.movies = []
+        for i in range(3):
+            movie = Movie.objects.create(tmdb_id=6000 + i, title=f"Movie {i}")
+            movie.tags.add(tags[i], tags[(i + 1) % 3])
+            cls.movies.append(movie)
+
+    def test_batches_fold_into_vectors(self):
+        queue = AnalyticsQueue(autostart=False)
+        a, b, c = self.movies
+        queue.add(swipe_event(self.host.id, self.pair, a.id, liked=True, matched=False))
+        queue.add(swipe_event(self.host.id, self.pair, b.id, liked=False, matched=False))
+        queue.add(swipe_event(self.guest.id, self.pair, a.id, liked=True, matched=True))
+
+        # users, SAVEPOINT, tags, taste insert/lock/update, chemistry insert/lock/update, RELEASE
+        with self.assertNumQueries(10):
+            queue.flush()
+        self.assertEqual(len(queue), 0)
+
+        t0, t1, t2 = self.tag_ids
+        size = max(self.tag_ids) + 1
+        taste = unpack(UserTasteVector.objects.get(user=self.host).vector, size)
+        self.assertEqual((taste[t0], taste[t1], taste[t2]), (1, 0, -1))
+
+        chemistry = PairChemistryVector.objects.get(user_a=self.host, user_b=self.guest)
+        swipes, matches = unpack(chemistry.swipes, size), unpack(chemistry.matches, size)
+        self.assertEqual((swipes[t0], swipes[t1], swipes[t2]), (2, 3, 1))
+        self.assertEqual((matches[t0], matches[t1], matches[t2]), (1, 1, 0))
+
+        for movie in self.movies * 5:
+            queue.add(swipe_event(self.guest.id, self.pair, movie.id, liked=True, matched=False))
+        with self.assertNumQueries(10):
+            queue.flush()
+
+        self.assertIn("analytics.lag_seconds", metrics.snapshot()["gauges"])
+
+    def test_only_the_batch_pairs_are_written(self):
+        other = User.objects.create_user("vec-other", "vec-other@example.com", "pw123456")
+        # Matched by the user_a/user_b IN lists, but not a pair in the batch
+        bystander = PairChemistryVector.objects.create(user_a=self.host, user_b=other)
+
+        queue = AnalyticsQueue(autostart=False)
+        queue.add(swipe_event(self.host.id, self.pair, self.movies[0].id, liked=True, matched=False))
+        queue.add(swipe_event(other.id, (self.guest.id, other.id), self.movies[1].id, liked=True, matched=False))
+        self.assertEqual(queue.flush(), 4)
+
+        bystander.refresh_from_db()
+        self.assertEqual(bytes(bystander.swipes), b"")
+        self.assertTrue(PairChemistryVector.objects.get(user_a=self.guest, user_b=other).swipes)
+
+    def test_events_of_deleted_users_are_dropped(self):
+        gone = User.objects.create_user("vec-gone", "vec-gone@example.com", "pw123456")
+        metrics.reset()
+
+        queue = AnalyticsQueue(autostart=False)
+        queue.add(swipe_event(gone.id, (self.host.id, gone.id), self.movies[0].id, liked=True, matched=False))
+        queue.add(swipe_event(self.host.id, (self.host.id, gone.id), self.movies[1].id, liked=True, matched=False))
+        queue.add(swipe_event(self.host.id, self.pair, self.movies[2].id, liked=True, matched=False))
+        gone.delete()
+
+        # Host taste and the host/guest pair; nothing requeued
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(metrics.snapshot()["gauges"]["analytics.dropped"], 2)
+        self.assertFalse(UserTasteVector.objects.filter(user_id=gone.id).exists())
+
+    def test_failing_batches_are_retried_then_dropped(self):
+        metrics.reset()
+        queue = AnalyticsQueue(autostart=False, max_attempts=2, max_pending=2)
+        first = swipe_event(self.host.id, self.pair, self.movies[0].id, liked=True, matched=False)
+        queue.add(first)
+
+        with mock.patch("core.services.analytics.write_swipe_events", side_effect=DatabaseError) as write:
+            with self.assertRaises(DatabaseError):
+                queue.flush()
+            queue.add(swipe_event(self.host.id, self.pair, self.movies[1].id, liked=True, matched=False))
+            queue.add(swipe_event(self.host.id, self.pair, self.movies[2].id, liked=True, matched=False))
+            # Over max_pending
+            queue.add(swipe_event(self.guest.id, self.pair, self.movies[2].id, liked=True, matched=False))
+            self.assertEqual(len(queue), 3)
+
+            # The retry runs alone and is given up on; the newer events wait
+            with self.assertLogs("core.services.analytics", "ERROR"), self.assertRaises(DatabaseError):
+                queue.flush()
+            self.assertEqual([call.args[0] for call in write.call_args_list], [[first], [first]])
+
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(metrics.snapshot()["gauges"]["analytics.dropped"], 2)
+        self.assertEqual(queue.flush(), 2)
+        self.assertEqual(len(queue), 0)
+
+
+class DeckPagingTests(TestCase):
+
+    def test_page_skips_seen_and_advances_cursor(self):
+        deck = Deck(fingerprint=None, ranked_ids=[5, 3, 9, 1, 7, 2], pool_size=8, seen_count=0)
+
+        self.assertEqual(deck.page(set(), 3), [5, 3, 9])
+        # Partner swiped 3 and 5 only: head moves past 5 and 3, 9 is still due
+        self.assertEqual(deck.page({5, 3}, 3), [9, 1, 7])
+        self.assertEqual(deck.cursor, 2)
+        self.assertEqual(deck.page({5, 3, 9, 7}, 3), [1, 2])
+        self.assertEqual(deck.candidates_left({5, 3, 9, 7}), 4)
+
+    def test_store_reranks_on_new_fingerprint(self):
+        store = DeckStore(max_sessions=2)
+        store.put(1, 10, Deck("a", [1, 2], 2, 0))
+
+        self.assertIsNotNone(store.get(1, 10, "a"))
+        self.assertIsNone(store.get(1, 10, "b"))
+        self.assertIsNone(store.get(1, 11, "a"))
+
+        store.put(2, 10, Deck("a", [], 0, 0))
+        store.put(3, 10, Deck("a", [], 0, 0))
+        self.assertIsNone(store.get(1, 10, "a"))
+
+
+class DeckPrefetchTests(TestCase):
+    """
+    Once the client runs low on cards the next ones are pushed over the
+    socket, and the following HTTP page does not repeat them.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        action = Genre.objects.create(tmdb_id=28, name="Action")
+        cls.host = User.objects.create_user("pre-host", "pre-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("pre-guest", "pre-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(
+            code="PRE001", host=cls.host, guest=cls.guest, genre=action, industry="hollywood",
+        )
+        for i in range(70):
+            movie = Movie.objects.create(tmdb_id=4100 + i, title=f"Movie {i}", original_language="en")
+            movie.genres.add(action)
+
+    def setUp(self):
+        hold_session_counters(self)
+        cache.delete(CATALOG_VERSION_KEY)
+        candidate_index.rebuild()
+        pool_cache.clear()
+        deck_store.clear()
+        seen_store.clear()
+        patcher = mock.patch.object(exposure_buffer, "autostart", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(exposure_buffer.flush)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.host)
+
+    def page(self):
+        response = self.client.get(f"/api/recommendations/?session_id={self.session.id}", secure=True)
+        return [movie["id"] for movie in response.json()["movies"]]
+
+    def test_prefetched_cards_are_not_served_again(self):
+        served = self.page()
+        self.assertEqual(len(served), 40)
+
+        with mock.patch("core.services.prefetch.executor") as executor:
+            # Plenty of cards left
+            self.assertFalse(maybe_prefetch(self.session.id, self.host.id))
+
+            for movie_id in served[:35]:
+                Swipe.objects.create(session=self.session, user=self.host, movie_id=movie_id, reaction=Swipe.DISLIKE)
+                deck_store.mark_seen(self.session.id, movie_id)
+            self.assertTrue(maybe_prefetch(self.session.id, self.host.id))
+            # Already running
+            self.assertFalse(maybe_prefetch(self.session.id, self.host.id))
+            executor.submit.assert_called_once_with(prefetch_deck, self.session.id, self.host.id)
+
+        # Run on this thread, inside the test transaction: keep its connection open
+        layer = mock.Mock(group_send=mock.AsyncMock())
+        with mock.patch("core.services.prefetch.get_channel_layer", return_value=layer):
+            with mock.patch("core.services.prefetch.close_old_connections"):
+                prefetch_deck(self.session.id, self.host.id)
+
+        group, event = layer.group_send.call_args.args
+        self.assertEqual((group, event["type"], event["user_id"]), (f"session_{self.session.id}", "deck_ready_event", self.host.id))
+        pushed = [movie["id"] for movie in event["movies"]]
+        self.assertEqual(len(pushed), 20)
+        self.assertFalse(set(pushed) & set(served))
+        self.assertFalse(deck_store.peek(self.session.id, self.host.id).prefetching)
+
+        # The unswiped head and the rest of the deck, without the pushed cards
+        following = self.page()
+        self.assertEqual(following[:5], served[35:])
+        self.assertEqual(len(following), 15)
+        self.assertFalse(set(following) & set(pushed))
+
+
+class SeenStoreTests(TestCase):
+    """
+    After the first load, refreshing a session's seen-set reads only
+    recent swipes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("seen-host", "seen-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("seen-guest", "seen-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="SEEN01", host=cls.host, guest=cls.guest)
+        cls.movies = [
+            Movie.objects.create(tmdb_id=3000 + i, title=f"Movie {i}") for i in range(4)
+        ]
+
+    def swipe(self, user, movie):
+        return Swipe.objects.create(session=self.session, user=user, movie=movie, reaction=Swipe.LIKE)
+
+    def test_incremental_refresh_and_undo(self):
+        store = SeenStore()
+        self.swipe(self.host, self.movies[0])
+        self.swipe(self.guest, self.movies[0])
+        self.assertEqual(store.get(self.session.id), ({self.movies[0].id}, 2))
+
+        undone = self.swipe(self.host, self.movies[1])
+        with self.assertNumQueries(1):
+            seen, count = store.get(self.session.id)
+        self.assertEqual((seen, count), ({self.movies[0].id, self.movies[1].id}, 3))
+
+        undone.delete()
+        bump_seen_version(self.session.id)
+        self.assertEqual(store.get(self.session.id), ({self.movies[0].id}, 2))
+
+
+class CandidateIndexTests(TestCase):
+    """
+    Index lookups must return the same ids as the SQL candidate query.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.action = Genre.objects.create(tmdb_id=28, name="Action")
+        cls.comedy = Genre.objects.create(tmdb_id=35, name="Comedy")
+        host = User.objects.create_user("idx-host", "idx@example.com", "pw123456")
+        cls.session = Session.objects.create(code="IDX001", host=host, genre=cls.action)
+
+        for i, language in enumerate(["en", "hi", "ta", "fr", None, "en", "hi"] * 3):
+            movie = Movie.objects.create(tmdb_id=2000 + i, title=f"Movie {i}", original_language=language)
+            movie.genres.add(cls.action if i % 2 else cls.comedy)
+            if i % 3 == 0:
+                movie.genres.add(cls.action)
+
+    def setUp(self):
+        candidate_index.rebuild()
+        pool_cache.clear()
+
+    def sql_ids(self, **language_filter):
+        return sorted(
+            Movie.objects.filter(genres=self.action, **language_filter)
+            .values_list("id", flat=True).distinct()
+        )
+
+    def test_language_fallbacks(self):
+        cases = [
+            ({"selected_languages": ["hi", "fr"]}, {"original_language__in": ["hi", "fr"]}),
+            ({"industry": "bollywood"}, {"original_language__in": INDIAN_LANGUAGES}),
+            ({"industry": "hollywood"}, {"original_language": "en"}),
+            ({"industry": "mixed"}, {}),
+        ]
+        for fields, language_filter in cases:
+            self.session.selected_languages = None
+            self.session.industry = None
+            for name, value in fields.items():
+                setattr(self.session, name, value)
+
+            self.assertEqual(candidate_ids(self.session), self.sql_ids(**language_filter), fields)
+
+    def test_exclusions(self):
+        self.session.industry = "mixed"
+        all_ids = self.sql_ids()
+
+        self.assertEqual(
+            candidate_ids(self.session, exclude_ids={all_ids[0], all_ids[-1], 999999}),
+            all_ids[1:-1]
+        )
+
+    def test_genre_ids_match_the_catalog_join(self):
+        for languages in (["ta"], ["en", "fr"], ["ko"]):
+            self.assertEqual(
+                candidate_index.genre_ids(languages),
+                set(Genre.objects.filter(movie__original_language__in=languages).values_list("id", flat=True)),
+                languages,
+            )
+
+    def test_pool_is_shared_and_dropped_on_sync(self):
+        other = Session(code="IDX002", genre=self.action, selected_languages=["fr", "hi"])
+        self.session.selected_languages = ["hi", "fr"]
+
+        pool = candidate_pool(self.session)
+        self.assertIs(candidate_pool(other), pool)
+        self.assertFalse(pool[1].flags.writeable)
+
+        candidate_index.rebuild(bump_catalog_version())
+        self.assertIsNot(candidate_pool(other), pool)
+        self.assertEqual(len(pool_cache), 1)
+
+
+class ColdStartDeckTests(TestCase):
+    """
+    An untouched session is served the precomputed deck, which must
+    match what a full ranking would give a user with no history.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.action = Genre.objects.create(tmdb_id=28, name="Action")
+        cls.host = User.objects.create_user("cold-host", "cold-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("cold-guest", "cold-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(
+            code="COLD01", host=cls.host, guest=cls.guest, genre=cls.action, industry="hollywood",
+            host_preferences={"mood": ["happy"], "pace": [], "vibe": [], "era": ["recent"]},
+            guest_preferences={"mood": ["happy"], "pace": ["fast"], "vibe": [], "era": []},
+        )
+
+        for i in range(12):
+            movie = Movie.objects.create(
+                tmdb_id=4000 + i,
+                title=f"Movie {i}",
+                overview=["A funny and fast story.", "A slow drama.", "A hilarious, happy romp."][i % 3],
+                release_date=date(2000 + i * 2, 1, 1),
+                original_language="en",
+            )
+            movie.genres.add(cls.action)
+
+    def setUp(self):
+        # Versions cached by earlier tests outlive their rolled back rows
+        cache.delete(CATALOG_VERSION_KEY)
+        candidate_index.rebuild()
+        pool_cache.clear()
+        deck_store.clear()
+        build_cold_start_decks(size=5)
+
+    def test_untouched_session_is_served_from_table(self):
+        with self.assertNumQueries(1):
+            deck = session_deck(self.session, self.host, set(), 0)
+
+        combined_prefs = combine_preferences(self.session)
+        ids, features = candidate_pool(self.session)
+        full = rank_candidates(self.session, self.host, (ids.copy(), features.copy()), combined_prefs)
+
+        self.assertTrue(deck.partial)
+        self.assertEqual(deck.ranked_ids, full[:5].tolist())
+        self.assertEqual(deck.pool_size, 12)
+
+        # bollywood / hollywood / mixed defaults plus this session's preferences
+        self.assertEqual(ColdStartDeck.objects.filter(catalog_version=get_catalog_version()).count(), 4)
+
+    def test_decks_follow_the_stored_catalog_version(self):
+        # Another worker with its own cache reads the same version...
+        cache.delete(CATALOG_VERSION_KEY)
+        self.assertTrue(session_deck(self.session, self.host, set(), 0).partial)
+
+        # ...and stops serving the decks once any process bumps it
+        deck_store.clear()
+        CatalogVersion.objects.update_or_create(
+            key=CATALOG_VERSION_KEY, defaults={"value": get_catalog_version() + 1}
+        )
+        cache.delete(CATALOG_VERSION_KEY)
+        self.assertFalse(session_deck(self.session, self.host, set(), 0).partial)
+
+        builder = ColdStartBuilder(autostart=False)
+        builder.request()
+        self.assertEqual(builder.flush(), 4)
+        self.assertEqual(builder.flush(), 0)
+        deck_store.clear()
+        self.assertTrue(session_deck(self.session, self.host, set(), 0).partial)
+
+    def test_long_language_lists_fit_the_key(self):
+        languages = [f"x{i:02}" for i in range(60)]
+        session = Session.objects.create(
+            code="COLD02", host=self.host, genre=self.action, selected_languages=languages,
+        )
+        self.assertEqual(build_cold_start_decks(size=5), 5)
+
+        deck = session_deck(session, self.guest, set(), 0)
+        self.assertTrue(deck.partial)
+        self.assertEqual(deck.pool_size, 0)
+
+    def test_user_with_taste_gets_a_full_ranking(self):
+        UserTasteVector.objects.create(user=self.host, vector=add_at(b"", [1], 1))
+
+        deck = session_deck(self.session, self.host, set(), 0)
+        self.assertFalse(deck.partial)
+
+
+class SwipeWritePathTests(TestCase):
+    """
+    A swipe is one transaction with a fixed query budget; SessionStats is
+    only written when session_counters flushes.
+    """
+
+    # SAVEPOINT, lock session, movie, insert swipe, RELEASE
+    SWIPE_QUERIES = 5
+    # + existing matches, insert match
+    MATCH_QUERIES = SWIPE_QUERIES + 2
+    # + the session's swipes and matches, the first time like_store sees it
+    LOAD_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("swipe-host", "swipe-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("swipe-guest", "swipe-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="SWP001", host=cls.host, guest=cls.guest)
+        cls.movies = [
+            Movie.objects.create(tmdb_id=5000 + i, title=f"Movie {i}") for i in range(3)
+        ]
+        SessionStats.objects.create(session=cls.session)
+
+    def setUp(self):
+        like_store.clear()
+        hold_session_counters(self)
+
+    def swipe(self, user, movie, reaction=Swipe.LIKE):
+        return record_swipe(self.session.id, user.id, movie.id, reaction)
+
+    def test_query_budget(self):
+        with self.assertNumQueries(self.SWIPE_QUERIES + self.LOAD_QUERIES):
+            self.swipe(self.host, self.movies[0])
+        with self.assertNumQueries(self.SWIPE_QUERIES):
+            self.swipe(self.guest, self.movies[1], Swipe.DISLIKE)
+        with self.assertNumQueries(self.MATCH_QUERIES):
+            result = self.swipe(self.guest, self.movies[0])
+
+        self.assertTrue(result.match_created)
+
+    def test_counters_and_conflicts(self):
+        self.swipe(self.host, self.movies[0])
+        self.assertFalse(self.swipe(self.guest, self.movies[2], Swipe.DISLIKE).match_created)
+        self.assertTrue(self.swipe(self.guest, self.movies[0]).match_created)
+
+        with self.assertRaisesMessage(SwipeRejected, "already matched"):
+            self.swipe(self.host, self.movies[0])
+        with self.assertRaisesMessage(SwipeRejected, "Already swiped"):
+            self.swipe(self.guest, self.movies[2])
+
+        outsider = User.objects.create_user("swipe-out", "swipe-out@example.com", "pw123456")
+        with self.assertRaises(SwipeRejected) as raised:
+            record_swipe(self.session.id, outsider.id, self.movies[1].id, Swipe.LIKE)
+        self.assertEqual(raised.exception.status_code, 403)
+
+        self.assertEqual(session_counters.get(self.session.id), (3, 1))
+        self.assertEqual(Match.objects.filter(session=self.session).count(), 1)
+
+    def test_stale_like_store_falls_back_to_the_rows(self):
+        self.swipe(self.host, self.movies[0])
+
+        # Recorded by a worker this store is not shared with
+        Swipe.objects.create(session=self.session, user=self.guest, movie=self.movies[1], reaction=Swipe.LIKE)
+
+        with self.assertRaisesMessage(SwipeRejected, "Already swiped"):
+            self.swipe(self.guest, self.movies[1])
+        self.assertTrue(self.swipe(self.guest, self.movies[0]).match_created)
+
+        # A match the store never saw is not announced a second time
+        like_store.clear()
+        self.swipe(self.host, self.movies[2])
+        Match.objects.create(session=self.session, movie=self.movies[2])
+        self.assertFalse(self.swipe(self.guest, self.movies[2]).match_created)
+        self.assertEqual(Match.objects.filter(session=self.session).count(), 2)
+
+    def test_batch_has_the_same_fixed_cost(self):
+        self.swipe(self.host, self.movies[0])
+        self.swipe(self.host, self.movies[1])
+
+        batch = [
+            (self.movies[0].id, Swipe.LIKE),
+            (self.movies[1].id, Swipe.DISLIKE),
+            (self.movies[2].id, Swipe.LIKE),
+            (self.movies[2].id, Swipe.LIKE),
+            (999999, Swipe.LIKE),
+        ]
+        with self.assertNumQueries(self.MATCH_QUERIES):
+            _, items = record_swipes(self.session.id, self.guest.id, batch)
+
+        self.assertEqual(
+            [(item.recorded, item.match_created, item.status_code) for item in items],
+            [(True, True, 201), (True, False, 201), (True, False, 201), (False, False, 409), (False, False, 400)],
+        )
+        self.assertEqual(session_counters.get(self.session.id), (5, 1))
+
+    def test_counters_are_flushed_from_the_log(self):
+        self.assertEqual(session_counters.get(self.session.id), (0, 0))
+        self.swipe(self.host, self.movies[0])
+        self.swipe(self.guest, self.movies[0])
+
+        # Bumped in memory only
+        self.assertEqual(session_counters.get(self.session.id), (2, 1))
+        stats = SessionStats.objects.get(session=self.session)
+        self.assertEqual((stats.total_swipes, stats.total_matches), (0, 0))
+
+        # Recounted, not incremented: flushing twice changes nothing
+        self.assertEqual(session_counters.flush(), 1)
+        self.assertEqual(session_counters.flush(), 0)
+        stats.refresh_from_db()
+        self.assertEqual((stats.total_swipes, stats.total_matches), (2, 1))
+
+        # An undone swipe leaves the in-memory count but still counts in SessionStats
+        Swipe.objects.filter(session=self.session, user=self.host).delete()
+        session_counters.undo(self.session.id)
+        self.assertEqual(session_counters.get(self.session.id), (1, 1))
+        self.assertEqual(session_counters.flush(), 1)
+        stats.refresh_from_db()
+        self.assertEqual((stats.total_swipes, stats.undone_swipes), (2, 1))
+
+        stats = session_counters.persist(self.session.id)
+        self.assertEqual((stats.total_swipes, stats.total_matches), (2, 1))
+        self.assertEqual(len(session_counters), 0)
+
+
+class LikeStoreTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("like-host", "like-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("like-guest", "like-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="LIK001", host=cls.host, guest=cls.guest)
+        cls.movies = [Movie.objects.create(tmdb_id=8000 + i, title=f"Movie {i}") for i in range(3)]
+
+        first, second, _ = cls.movies
+        Swipe.objects.create(session=cls.session, user=cls.host, movie=first, reaction=Swipe.LIKE)
+        Swipe.objects.create(session=cls.session, user=cls.guest, movie=first, reaction=Swipe.LIKE)
+        Swipe.objects.create(session=cls.session, user=cls.host, movie=second, reaction=Swipe.DISLIKE)
+        Match.objects.create(session=cls.session, movie=first)
+
+    def setUp(self):
+        hold_session_counters(self)
+
+    def test_backends_agree_and_load_once(self):
+        users = (self.host.id, self.guest.id)
+        first, second, third = [movie.id for movie in self.movies]
+        cache.delete(LIKES_KEY.format(self.session.id))
+
+        for store in (LikeStore(), CacheLikeStore()):
+            with self.assertNumQueries(2):
+                reactions, matched = store.reactions(self.session.id, users, {first, second, third})
+            self.assertEqual(reactions, {
+                first: {self.host.id: Swipe.LIKE, self.guest.id: Swipe.LIKE},
+                second: {self.host.id: Swipe.DISLIKE},
+                third: {},
+            })
+            self.assertEqual(matched, {first})
+
+            store.record(self.session.id, self.guest.id, [(third, Swipe.LIKE)], [third])
+            with self.assertNumQueries(0):
+                reactions, matched = store.reactions(self.session.id, users, {second, third})
+            self.assertEqual(reactions, {second: {self.host.id: Swipe.DISLIKE}, third: {self.guest.id: Swipe.LIKE}})
+            self.assertEqual(matched, {third})
+
+            # The local store edits its sets; the cache store reloads from the rows
+            Swipe.objects.filter(session=self.session, movie_id=second).delete()
+            store.remove(self.session.id, self.host.id, second)
+            reactions, _ = store.reactions(self.session.id, users, {second})
+            self.assertEqual(reactions, {second: {}})
+            store.discard(self.session.id)
+            Swipe.objects.create(session=self.session, user=self.host, movie_id=second, reaction=Swipe.DISLIKE)
+
+    def test_evicted_cache_entries_keep_the_partner_likes(self):
+        store = CacheLikeStore()
+        first, _, third = self.movies
+
+        with mock.patch("core.services.swipes.like_store", store):
+            store.reactions(self.session.id, (self.host.id,), {third.id})
+            record_swipe(self.session.id, self.host.id, third.id, Swipe.LIKE)
+
+            # The session's likes are one key: evicting it loses nothing
+            cache.delete(LIKES_KEY.format(self.session.id))
+            self.assertTrue(record_swipe(self.session.id, self.guest.id, third.id, Swipe.LIKE).match_created)
+
+            with self.assertRaisesMessage(SwipeRejected, "already matched"):
+                record_swipe(self.session.id, self.host.id, first.id, Swipe.LIKE)
+
+
+class SwipeSocketTests(TransactionTestCase):
+    # database_sync_to_async closes connections left in a transaction,
+    # which is every connection inside TestCase on Postgres
+
+    def setUp(self):
+        hold_session_counters(self)
+        deck_store.clear()
+        like_store.clear()
+        self.host = User.objects.create_user("ws-host", "ws-host@example.com", "pw123456")
+        self.guest = User.objects.create_user("ws-guest", "ws-guest@example.com", "pw123456")
+        self.session = Session.objects.create(code="WSS001", host=self.host, guest=self.guest)
+        self.movie = Movie.objects.create(tmdb_id=7000, title="Socket Movie")
+        self.tokens = {user: Token.objects.create(user=user).key for user in (self.host, self.guest)}
+
+    async def connect(self, user=None):
+        # asgiref's communicator: channels.testing needs daphne installed
+        application = TokenAuthMiddleware(URLRouter(websocket_urlpatterns))
+        socket = ApplicationCommunicator(application, {
+            "type": "websocket",
+            "path": f"/ws/session/{self.session.id}/",
+            "query_string": f"token={self.tokens[user]}".encode() if user else b"",
+            "headers": [],
+            "subprotocols": [],
+        })
+        await socket.send_input({"type": "websocket.connect"})
+        self.assertEqual((await socket.receive_output(1))["type"], "websocket.accept")
+        return socket
+
+    @staticmethod
+    async def send(socket, message):
+        await socket.send_input({"type": "websocket.receive", "text": json.dumps(message)})
+
+    @staticmethod
+    async def receive(socket):
+        # Presence events race the rest on a networked channel layer
+        while True:
+            message = json.loads((await socket.receive_output(1))["text"])
+            if message["type"] != "presence":
+                return message
+
+    @staticmethod
+    async def receive_types(socket, timeout=0.5):
+        types = []
+        while not await socket.receive_nothing(timeout):
+            message = json.loads((await socket.receive_output())["text"])
+            if message["type"] != "presence":
+                types.append(message["type"])
+        return types
+
+    def test_swipe_errors_keep_the_socket_open(self):
+        async def run():
+            host = await self.connect(self.host)
+
+            with mock.patch("core.consumers.record_swipes", side_effect=RuntimeError("database gone")):
+                await self.send(host, {"type": "swipe", "movie": self.movie.id, "reaction": "like", "ref": 1})
+                failed = await self.receive(host)
+
+            await self.send(host, {"type": "swipe", "movie": self.movie.id, "reaction": "like", "ref": 2})
+            recorded = await self.receive(host)
+
+            await host.send_input({"type": "websocket.disconnect", "code": 1000})
+            await host.wait(1)
+            return failed, recorded
+
+        with self.assertLogs("core.consumers", "ERROR"), mock.patch.object(analytics_queue, "autostart", False):
+            failed, recorded = async_to_sync(run)()
+            analytics_queue.flush()
+
+        self.assertEqual((failed["ref"], failed["success"], failed["status"]), (1, False, 500))
+        self.assertEqual((recorded["ref"], recorded["success"]), (2, True))
+
+    def test_prefetched_cards_reach_only_their_user(self):
+        async def run():
+            sockets = {"host": await self.connect(self.host), "guest": await self.connect(self.guest)}
+            sockets["anonymous"] = await self.connect()
+
+            await get_channel_layer().group_send(f"session_{self.session.id}", {
+                "type": "deck_ready_event",
+                "session_id": self.session.id,
+                "user_id": self.host.id,
+                "movies": [],
+            })
+
+            received = {name: await self.receive_types(socket) for name, socket in sockets.items()}
+            for socket in sockets.values():
+                await socket.send_input({"type": "websocket.disconnect", "code": 1000})
+                await socket.wait(1)
+            return received
+
+        self.assertEqual(async_to_sync(run)(), {"host": ["deck_ready"], "guest": [], "anonymous": []})
+
+    def test_swipes_are_acked_and_fanned_out(self):
+        async def run():
+            host = await self.connect(self.host)
+            guest = await self.connect(self.guest)
+            anonymous = await self.connect()
+
+            await self.send(anonymous, {"type": "swipe", "movie": self.movie.id, "reaction": "like"})
+            denied = await self.receive(anonymous)
+
+            await self.send(host, {"type": "swipe", "movie": self.movie.id, "reaction": "like", "ref": 1})
+            await self.send(guest, {"type": "swipe", "movie": self.movie.id, "reaction": "like", "ref": 2})
+            await self.send(guest, {"type": "swipe", "movie": self.movie.id, "reaction": "like", "ref": 3})
+
+            host_messages = [await self.receive(host) for _ in range(4)]
+            guest_messages = [await self.receive(guest) for _ in range(5)]
+
+            for socket in (host, guest, anonymous):
+                await socket.send_input({"type": "websocket.disconnect", "code": 1000})
+                await socket.wait(1)
+            return denied, host_messages, guest_messages
+
+        with mock.patch.object(analytics_queue, "autostart", False):
+            denied, host_messages, guest_messages = async_to_sync(run)()
+            analytics_queue.flush()
+
+        self.assertEqual((denied["success"], denied["status"]), (False, 401))
+
+        acks = {m["ref"]: m for m in host_messages + guest_messages if m["type"] == "swipe_ack"}
+        self.assertEqual((acks[1]["success"], acks[1]["match"]), (True, False))
+        self.assertEqual((acks[2]["success"], acks[2]["match"]), (True, True))
+        self.assertEqual((acks[3]["success"], acks[3]["status"]), (False, 409))
+
+        self.assertIn("match_event", [m["type"] for m in host_messages])
+        self.assertEqual(Match.objects.filter(session=self.session).count(), 1)
+
+
+# e.g. TEST_REDIS_HOSTS=redis://localhost:6379/15; several URLs are sharded
+TEST_REDIS_HOSTS = [url for url in os.getenv("TEST_REDIS_HOSTS", "").split(",") if url]
+
+
+def channel_layer_profiles():
+    """
+    CHANNEL_LAYERS for each profile under test: in-memory always, the
+    Redis layers only when TEST_REDIS_HOSTS points at a local server.
+    """
+    profiles = {"memory": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}}
+    if TEST_REDIS_HOSTS:
+        for profile, backend in (
+            ("redis", "channels_redis.core.RedisChannelLayer"),
+            ("pubsub", "channels_redis.pubsub.RedisPubSubChannelLayer"),
+        ):
+            profiles[profile] = {
+                "default": {"BACKEND": backend, "CONFIG": {"hosts": TEST_REDIS_HOSTS, "prefix": "flick-test"}}
+            }
+    return profiles
+
+
+class ChannelLayerTests(SimpleTestCase):
+
+    def test_group_send_reaches_every_member_once(self):
+        async def fan_out():
+            layer = get_channel_layer()
+            members = [await layer.new_channel() for _ in range(3)]
+            outsider = await layer.new_channel()
+            for channel in members:
+                await layer.group_add("session_test", channel)
+            await asyncio.sleep(0.05)  # Pub/Sub subscriptions are asynchronous
+
+            await layer.group_send("session_test", {"type": "match_event", "movie_id": 7})
+            received = [await asyncio.wait_for(layer.receive(channel), 2) for channel in members]
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(layer.receive(outsider), 0.2)
+
+            for channel in members:
+                await layer.group_discard("session_test", channel)
+            await layer.flush()
+            return received
+
+        for profile, layers in channel_layer_profiles().items():
+            with self.subTest(profile), override_settings(CHANNEL_LAYERS=layers):
+                received = async_to_sync(fan_out)()
+                self.assertEqual([message["movie_id"] for message in received], [7, 7, 7])
+
+
+@skipUnless(TEST_REDIS_HOSTS, "set TEST_REDIS_HOSTS to run against a local Redis")
+@override_settings(CHANNEL_LAYERS=channel_layer_profiles().get("pubsub"))
+class RedisSwipeSocketTests(SwipeSocketTests):
+    """
+    The socket flow on the Redis layer production uses.
+    """
+
+
+class AsyncUrlConf:
+    def __init__(self, async_views):
+        self.urlpatterns = [path("api/", include(hot_path_urls(async_views)))]
+
+
+class AsyncViewParityTests(TestCase):
+    """
+    The async hot-path views answer exactly like the DRF ones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("async-host", "async-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("async-guest", "async-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="ASY001", host=cls.host, guest=cls.guest)
+        cls.movies = [Movie.objects.create(tmdb_id=9000 + i, title=f"Movie {i}") for i in range(2)]
+        cls.auth = {"Authorization": f"Token {Token.objects.create(user=cls.host).key}"}
+
+    def setUp(self):
+        hold_session_counters(self)
+        deck_store.clear()
+        like_store.clear()
+
+    async def responses(self, async_views, movie):
+        client = AsyncClient()
+        with override_settings(ROOT_URLCONF=AsyncUrlConf(async_views)):
+            return [
+                await client.get(f"/api/sessions/status/?code={self.session.code}", headers=self.auth, secure=True),
+                await client.get(f"/api/sessions/{self.session.id}/", headers=self.auth, secure=True),
+                await client.get(f"/api/sessions/{self.session.id}/", secure=True),
+                await client.post(
+                    "/api/swipes/",
+                    {"session": self.session.id, "movie": movie.id, "reaction": Swipe.DISLIKE},
+                    content_type="application/json", headers=self.auth, secure=True,
+                ),
+                await client.post(
+                    "/api/swipes/",
+                    {"session": self.session.id, "movie": movie.id, "reaction": Swipe.DISLIKE},
+                    content_type="application/json", headers=self.auth, secure=True,
+                ),
+            ]
+
+    async def test_same_status_and_body(self):
+        with mock.patch.object(analytics_queue, "autostart", False):
+            sync = await self.responses(False, self.movies[0])
+            native = await self.responses(True, self.movies[1])
+            await sync_to_async(analytics_queue.flush)()
+
+        self.assertEqual(
+            [(r.status_code, r.json()) for r in sync],
+            [(r.status_code, r.json()) for r in native],
+        )
+        self.assertEqual([r.status_code for r in native], [200, 200, 401, 201, 409])
+
+    async def test_malformed_json_is_a_parse_error(self):
+        client = AsyncClient()
+        responses = []
+        for async_views in (False, True):
+            with override_settings(ROOT_URLCONF=AsyncUrlConf(async_views)):
+                responses.append(await client.post(
+                    "/api/swipes/", '{"session": ', content_type="application/json",
+                    headers=self.auth, secure=True,
+                ))
+
+        sync, native = [(r.status_code, r.json()) for r in responses]
+        self.assertEqual(native, sync)
+        self.assertEqual(native[0], 400)
+        self.assertTrue(native[1]["errors"]["detail"].startswith("JSON parse error"))
+
+
+class IdempotencyTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.host = User.objects.create_user("idem-host", "idem-host@example.com", "pw123456")
+        cls.guest = User.objects.create_user("idem-guest", "idem-guest@example.com", "pw123456")
+        cls.session = Session.objects.create(code="IDM001", host=cls.host, guest=cls.guest)
+        cls.movies = [Movie.objects.create(tmdb_id=9500 + i, title=f"Movie {i}") for i in range(2)]
+
+    def setUp(self):
+        hold_session_counters(self)
+        cache.clear()
+        deck_store.clear()
+        like_store.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.host)
+
+    def swipe(self, movie, key):
+        return self.client.post(
+            "/api/swipes/",
+            {"session": self.session.id, "movie": movie.id, "reaction": Swipe.DISLIKE},
+            format="json", secure=True, HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retries_replay_the_first_response(self):
+        with mock.patch.object(analytics_queue, "autostart", False):
+            first = self.swipe(self.movies[0], "swipe-1")
+            analytics_queue.flush()
+
+        with self.assertNumQueries(0):
+            retry = self.swipe(self.movies[0], "swipe-1")
+
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Swipe.objects.filter(session=self.session).count(), 1)
+
+        self.assertEqual(self.swipe(self.movies[1], "swipe-1").status_code, 422)
+
+        created = [
+            self.client.post("/api/sessions/create/", secure=True, HTTP_IDEMPOTENCY_KEY="create-1")
+            for _ in range(2)
+        ]
+        self.assertEqual(created[0].json(), created[1].json())
+        self.assertEqual(Session.objects.filter(host=self.host).count(), 2)
+
+    def forget_worker_state(self):
+        # What a retry landing on another worker would not see
+        deck_store.clear()
+        like_store.clear()
+        session_counters.clear()
+
+    def test_keys_are_shared_across_workers(self):
+        with mock.patch.object(analytics_queue, "autostart", False):
+            first = self.swipe(self.movies[0], "swipe-2")
+            analytics_queue.flush()
+
+        self.forget_worker_state()
+        retry = self.swipe(self.movies[0], "swipe-2")
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Swipe.objects.filter(session=self.session).count(), 1)
+
+        self.forget_worker_state()
+        self.assertEqual(self.swipe(self.movies[1], "swipe-2").status_code, 422)
+
+        # Claimed by another worker and still running
+        cache.set(cache_key(self.host.id, "POST", "/api/swipes/", "swipe-3"), IN_PROGRESS)
+        self.assertEqual(self.swipe(self.movies[1], "swipe-3").status_code, 409)
+        self.assertEqual(Swipe.objects.filter(session=self.session).count(), 1)
+
+
+class SwipeArchiveTests(TestCase):
+
+    def test_only_long_ended_sessions_are_moved(self):
+        if is_partitioned():
+            self.skipTest("Postgres archives whole partitions")
+
+        host = User.objects.create_user("arc-host", "arc-host@example.com", "pw123456")
+        movie = Movie.objects.create(tmdb_id=9500, title="Old Movie")
+        old = Session.objects.create(code="ARC001", host=host, ended_at=timezone.now() - timedelta(days=120))
+        recent = Session.objects.create(code="ARC002", host=host, ended_at=timezone.now() - timedelta(days=10))
+        for session in (old, recent):
+            Swipe.objects.create(session=session, user=host, movie=movie, reaction=Swipe.LIKE)
+
+        moved = archive_ended_sessions(timezone.now() - timedelta(days=90), batch_size=1)
+
+        self.assertEqual(moved, 1)
+        self.assertEqual(list(Swipe.objects.values_list("session_id", flat=True)), [recent.id])
+        self.assertEqual(list(ArchivedSwipe.objects.values_list("session_id", "reaction")), [(old.id, Swipe.LIKE)])
+
+    def test_abandoned_sessions_do_not_pin_partitions(self):
+        host = User.objects.create_user("arc-host", "arc-host@example.com", "pw123456")
+        movies = [Movie.objects.create(tmdb_id=9510 + i, title=f"Old Movie {i}") for i in range(2)]
+        long_ago = timezone.now() - timedelta(days=120)
+        cutoff = timezone.now() - timedelta(days=90)
+
+        # Never ended, last swiped long ago; the live session sits in the next range
+        abandoned = Session.objects.create(code="ARC003", host=host)
+        Session.objects.create(id=SWIPE_PARTITION_SESSIONS + 1, code="ARC004", host=host)
+        swipe = Swipe.objects.create(session=abandoned, user=host, movie=movies[0], reaction=Swipe.LIKE)
+        Session.objects.filter(id=abandoned.id).update(created_at=long_ago)
+        Swipe.objects.filter(id=swipe.id).update(created_at=long_ago)
+
+        if is_partitioned():
+            first = partitions()[0]
+        else:
+            first = Partition(f"core_swipe_p0_{SWIPE_PARTITION_SESSIONS}", 0, SWIPE_PARTITION_SESSIONS)
+            patcher = mock.patch("core.services.partitions.partitions", return_value=[first])
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.assertEqual(archivable_partitions(cutoff), [first])
+
+        # Swiping in it again makes it live
+        recent = Swipe.objects.create(session=abandoned, user=host, movie=movies[1], reaction=Swipe.LIKE)
+        self.assertEqual(archivable_partitions(cutoff), [])
+        recent.delete()
+
+        if is_partitioned():
+            # The test transaction still holds the deferred foreign key checks
+            with connection.cursor() as cursor:
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            archive_partition(first)
+            self.assertEqual(list(ArchivedSwipe.objects.values_list("session_id", flat=True)), [abandoned.id])
+            self.assertFalse(Swipe.objects.filter(session=abandoned).exists())
+
+
+class ExposureBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movies = [Movie.objects.create(tmdb_id=3000 + i, title=f"Movie {i}") for i in range(3)]
+        MovieExposure.objects.create(movie=cls.movies[0], exposed_count=10)
+
+    def test_flush_applies_buffered_increments(self):
+        buffer = ExposureBuffer(autostart=False)
+        first, second, third = [m.id for m in self.movies]
+
+        buffer.add([first, second])
+        buffer.add([first, third, 999999])
+        self.assertEqual(len(buffer), 4)
+
+        with self.assertNumQueries(5):
+            self.assertEqual(buffer.flush(), 3)
+
+        counts = dict(MovieExposure.objects.values_list("movie_id", "exposed_count"))
+        self.assertEqual(counts, {first: 12, second: 1, third: 1})
+        self.assertEqual(len(buffer), 0)
+        self.assertFalse(MovieExposure.objects.filter(last_exposed_at__isnull=True).exists())
+
+
+class StageTimingTests(TestCase):
+
+    def test_stages_count_queries_and_feed_registry(self):
+        registry = MetricsRegistry()
+        timeline = Timeline("recommendations", registry)
+
+        with timeline.stage("candidates"):
+            list(Movie.objects.all())
+        with timeline.stage("rank"):
+            pass
+        with timeline.stage("candidates"):
+            list(Genre.objects.all())
+        timeline.finish()
+
+        stages = timeline.as_dict()
+        self.assertEqual(list(stages), ["candidates", "rank"])
+        self.assertEqual(stages["candidates"]["queries"], 2)
+        self.assertEqual(stages["rank"]["queries"], 0)
+        self.assertIn('candidates;dur=', timeline.server_timing())
+
+        snapshot = registry.snapshot()["timings"]
+        self.assertEqual(snapshot["recommendations.candidates"]["count"], 1)
+        self.assertEqual(snapshot["recommendations.candidates"]["queries_mean"], 2)
+        self.assertEqual(snapshot["recommendations.total"]["queries_mean"], 2)
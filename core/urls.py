@@ -1,5 +1,12 @@
+from django.conf import settings
 from django.urls import path, include
 from django.contrib import admin
+from .async_views import (
+    AsyncRecommendationView,
+    AsyncSessionDetailView,
+    AsyncSessionStatusView,
+    AsyncSwipeCreateView,
+)
 from .views import (
     MovieListView,
     MovieDetailView,
@@ -9,6 +16,7 @@ from .views import (
     RegisterView,
     LoginView,
     SwipeCreateView,
+    SwipeBatchView,
     SessionCreateView, 
     SessionJoinView,
     MatchListView,
@@ -17,6 +25,7 @@ from .views import (
     SessionEndView,
     MovieSyncTMDBView,
     RecommendationView,
+    MetricsView,
     GenreListView,
     SessionDetailView,
     SessionStatusView,
@@ -31,7 +40,28 @@ from .views import (
 
     )
 
-urlpatterns = [
+
+def hot_path_urls(async_views):
+    """
+    Swipe, recommendations and session polling, served by the native
+    async views when settings.ASYNC_VIEWS is on.
+    """
+    if async_views:
+        swipe, recommendations = AsyncSwipeCreateView, AsyncRecommendationView
+        detail, status = AsyncSessionDetailView, AsyncSessionStatusView
+    else:
+        swipe, recommendations = SwipeCreateView, RecommendationView
+        detail, status = SessionDetailView, SessionStatusView
+
+    return [
+        path('swipes/', swipe.as_view(), name='swipe-create'),
+        path("recommendations/", recommendations.as_view(), name="recommendations"),
+        path("sessions/<int:session_id>/", detail.as_view(), name="session-detail"),
+        path("sessions/status/", status.as_view(), name="session-status"),
+    ]
+
+
+urlpatterns = hot_path_urls(getattr(settings, "ASYNC_VIEWS", False)) + [
     # Change all these to have // prefix
     path('movies/', MovieListView.as_view(), name='movie-list'),
     path('movies/<int:pk>/', MovieDetailView.as_view(), name='movie-detail'),
@@ -41,17 +71,15 @@ urlpatterns = [
     path("movies/sync-tmdb/", MovieSyncTMDBView.as_view(), name="movie-sync-tmdb"),
     path('auth/login/', LoginView.as_view(), name='login'),
     path('auth/register/', RegisterView.as_view(), name='register'),
-    path('swipes/', SwipeCreateView.as_view(), name='swipe-create'),
     path('sessions/create/', SessionCreateView.as_view(), name='session-create'),  # ← Add //
     path('sessions/join/', SessionJoinView.as_view(), name='session-join'),
     path("sessions/end/", SessionEndView.as_view(), name="session-end"),
     path("matches/", MatchListView.as_view(), name="match-list"),
+    path("swipes/batch/", SwipeBatchView.as_view(), name="swipe-batch"),
     path("swipes/undo/", SwipeUndoView.as_view(), name="swipe-undo"),
     path("swipes/history/", SwipeHistoryView.as_view(), name="swipe-history"),
-    path("recommendations/", RecommendationView.as_view(), name="recommendations"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("genres/", GenreListView.as_view(), name="genre-list"),  # ← Add //
-    path("sessions/<int:session_id>/", SessionDetailView.as_view(), name="session-detail"),
-    path("sessions/status/", SessionStatusView.as_view(), name="session-status"),
     path("sessions/genre/", SessionSetGenreView.as_view(), name="session-genre"),
     path("genres/sync-tmdb/", GenreSyncTMDBView.as_view()),
     path('sessions/preferences/', SessionSetPreferencesView.as_view()),
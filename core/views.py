@@ -22,7 +22,7 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
@@ -30,15 +30,27 @@ from rest_framework import status
 
 
 from .models import Movie, Swipe, Match, Session, Genre
-from .serializers import MovieSerializer, RegisterSerializer, SwipeSerializer, SessionDetailSerializer
+from .serializers import MovieSerializer, RegisterSerializer, SwipeBatchRequestSerializer, SwipeRequestSerializer, SessionDetailSerializer
 from .pagination import SwipeHistoryPagination
 from .models import Genre
 from .models import MovieExposure
-from .models import SessionStats
-from .models import UserTasteSignal
-from .models import SessionChemistry
 from .models import MovieTagRelation
 from .models import MovieTag
+from .services.candidates import candidate_index
+from .services.catalog import bump_catalog_version
+from .services.counters import session_counters
+from .services.cold_start import cold_start_builder
+from .services.decks import deck_store
+from .services.exposure import exposure_buffer
+from .services.idempotency import idempotent
+from .services.likes import like_store
+from .services.metrics import Timeline, metrics
+from .services.recommendations import movies_in_order, session_deck
+from .services.scoring import MOOD_KEYWORDS, PACE_KEYWORDS, VIBE_KEYWORDS
+from .services.seen import bump_seen_version, seen_store
+from .services.swipe_events import publish_swipes
+from .services.swipes import SwipeRejected, record_swipe, record_swipes
+from .services.tagging import tag_movies
 
 
 # -------------------------------------------------------------------
@@ -51,7 +63,6 @@ CANDIDATE_POOL_SIZE = 120
 FINAL_DECK_SIZE = 40
 MIN_DECK_SIZE = 16
 MAX_DECK_SIZE = 50
-INDIAN_LANGUAGES = ["hi", "ta", "te", "bn", "mr", "gu", "kn", "ml", "pa"]
 User = get_user_model()
 
 # -------------------------------------------------------------------
@@ -79,30 +90,9 @@ def calculate_preference_score(movie, preferences):
     overview_lower = movie.overview.lower()
     title_lower = movie.title.lower()
     
-    # Mood keywords
-    mood_keywords = {
-        "happy": ["comedy", "fun", "laugh", "joy", "light", "cheerful", "humorous", "hilarious", "amusing", "witty"],
-        "intense": ["thriller", "suspense", "intense", "dark", "serious", "gripping", "tense", "dramatic", "noir"],
-        "emotional": ["drama", "emotional", "moving", "heartfelt", "touching", "tear", "powerful", "profound", "poignant"],
-        "exciting": ["action", "adventure", "exciting", "fast-paced", "thrilling", "explosive", "dynamic", "spectacular"],
-    }
-    
-    pace_keywords = {
-        "fast": ["action", "fast", "intense", "quick", "thrilling", "explosive", "adrenaline", "rush", "rapid"],
-        "slow": ["slow", "deliberate", "thoughtful", "contemplative", "meditative", "quiet", "introspective", "patient"],
-        "balanced": ["balanced", "mix", "variety", "blend", "diverse", "moderate"],
-    }
-    
-    vibe_keywords = {
-        "feel-good": ["uplifting", "inspiring", "heartwarming", "positive", "hopeful", "optimistic", "joyful", "warm"],
-        "mind-bending": ["twist", "complex", "mystery", "puzzle", "psychological", "surreal", "enigmatic", "cryptic"],
-        "escapist": ["fantasy", "adventure", "magical", "world", "epic", "mythical", "otherworldly", "imaginative"],
-        "realistic": ["real", "authentic", "true", "based on", "documentary", "life", "actual", "gritty"],
-    }
-    
     # Check moods
     for mood in preferences.get("mood", []):
-        keywords = mood_keywords.get(mood, [])
+        keywords = MOOD_KEYWORDS.get(mood, [])
         for keyword in keywords:
             if keyword in overview_lower or keyword in title_lower:
                 score += 8  # ✅ INCREASED
@@ -110,7 +100,7 @@ def calculate_preference_score(movie, preferences):
     
     # Check pace
     for pace in preferences.get("pace", []):
-        keywords = pace_keywords.get(pace, [])
+        keywords = PACE_KEYWORDS.get(pace, [])
         for keyword in keywords:
             if keyword in overview_lower:
                 score += 6  # ✅ INCREASED
@@ -118,7 +108,7 @@ def calculate_preference_score(movie, preferences):
     
     # Check vibe
     for vibe in preferences.get("vibe", []):
-        keywords = vibe_keywords.get(vibe, [])
+        keywords = VIBE_KEYWORDS.get(vibe, [])
         for keyword in keywords:
             if keyword in overview_lower:
                 score += 6  # ✅ INCREASED
@@ -181,6 +171,12 @@ class MovieCreateView(generics.CreateAPIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        tag_movies([serializer.instance])
+        bump_catalog_version()
+        cold_start_builder.request()
+
 
 class MovieUpdateView(generics.UpdateAPIView):
     """
@@ -191,6 +187,13 @@ class MovieUpdateView(generics.UpdateAPIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        # Keyword tags follow the title and overview
+        tag_movies([serializer.instance])
+        bump_catalog_version()
+        cold_start_builder.request()
+
 
 class MovieDeleteView(generics.DestroyAPIView):
     """
@@ -200,6 +203,11 @@ class MovieDeleteView(generics.DestroyAPIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        bump_catalog_version()
+        cold_start_builder.request()
+
 
 # -------------------------------------------------------------------
 # Authentication APIs
@@ -358,6 +366,7 @@ class SessionCreateView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         session = Session.objects.create(
             host=request.user,
@@ -507,6 +516,7 @@ class SessionJoinView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         code = request.data.get("code")
 
@@ -554,6 +564,7 @@ class SessionEndView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
         session_id = request.data.get("session_id")
 
@@ -573,7 +584,12 @@ class SessionEndView(APIView):
 
         session.ended_at = timezone.now()
         session.save()
-        stats, _ = SessionStats.objects.get_or_create(session=session)
+        deck_store.discard(session.id)
+        seen_store.discard(session.id)
+        like_store.discard(session.id)
+
+        # Final counts, recounted from the session's swipes and matches
+        stats = session_counters.persist(session.id)
 
         if session.created_at:
             duration = timezone.now() - session.created_at
@@ -617,8 +633,7 @@ class SessionEndView(APIView):
         # Clamp score
         stats.quality_score = max(0, min(score, 100))
         stats.highlights = highlights
-        stats.save(update_fields=["quality_score", "highlights"])
-        stats.save(update_fields=["duration_ms", "ended_by"])
+        stats.save(update_fields=["quality_score", "highlights", "duration_ms", "ended_by"])
 
         channel_layer = get_channel_layer()
         async_to_sync(channel_layer.group_send)(
@@ -651,8 +666,9 @@ class SwipeCreateView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @idempotent
     def post(self, request):
-        serializer = SwipeSerializer(data=request.data)
+        serializer = SwipeRequestSerializer(data=request.data)
 
         # 1. Validate request payload
         if not serializer.is_valid():
@@ -661,65 +677,21 @@ class SwipeCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        session = serializer.validated_data["session"]
-        movie = serializer.validated_data["movie"]
         reaction = serializer.validated_data["reaction"]
 
-        # 2. Session state checks
-        if session.ended_at:
-            return Response(
-                {"success": False, "error": "Session has ended"},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
-        if not session.host or not session.guest:
-            return Response(
-                {"success": False, "error": "Session is not ready yet"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # 3. Membership check
-        if request.user not in (session.host, session.guest):
-            return Response(
-                {"success": False, "error": "You are not part of this session"},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
-        # 4. Block swipes if movie already matched
-        if Match.objects.filter(session=session, movie=movie).exists():
-            return Response(
-                {"success": False, "error": "This movie is already matched"},
-                status=status.HTTP_409_CONFLICT
-            )
-
-        # 5. Create swipe (unique constraint enforced at DB level)
+        # 2-5. Session rules, duplicate check, swipe, match claim and
+        # counters in one transaction with the session row locked
         try:
-            swipe = Swipe.objects.create(
-                user=request.user,
-                session=session,
-                movie=movie,
-                reaction=reaction
+            result = record_swipe(
+                serializer.validated_data["session"],
+                request.user.id,
+                serializer.validated_data["movie"],
+                reaction,
             )
-            
-            # Update stats safely
-            stats, _ = SessionStats.objects.get_or_create(session=session)
-            stats.total_swipes += 1
-            stats.save(update_fields=["total_swipes"])
-            
-            # Notify partner that a swipe happened
-            channel_layer = get_channel_layer()
-            if channel_layer:  # ✅ SAFER: Check if channel layer exists
-                async_to_sync(channel_layer.group_send)(
-                    f"session_{session.id}",
-                    {
-                        "type": "swipe_event",
-                        "user_id": request.user.id,
-                    }
-                )
-        except IntegrityError:
+        except SwipeRejected as e:
             return Response(
-                {"success": False, "error": "Already swiped on this movie"},
-                status=status.HTTP_409_CONFLICT
+                {"success": False, "error": e.error},
+                status=e.status_code
             )
         except Exception as e:
             # ✅ ADD GENERIC ERROR HANDLING
@@ -728,93 +700,10 @@ class SwipeCreateView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        # ✅ SAFER: Wrap user analysis in try/except
-        try:
-            user_a, user_b = normalize_pair(session.host, session.guest)
-
-            for tag in movie.tags.all():
-                # Taste signal
-                signal, _ = UserTasteSignal.objects.get_or_create(
-                    user=request.user,
-                    tag=tag
-                )
-
-                if reaction == Swipe.LIKE:
-                    signal.like_count += 1
-                else:
-                    signal.dislike_count += 1
-
-                signal.save(update_fields=["like_count", "dislike_count"])
-
-                # Session drift signal
-                chemistry, _ = SessionChemistry.objects.get_or_create(
-                    user_a=user_a,
-                    user_b=user_b,
-                    tag=tag.name
-                )
-
-                chemistry.swipe_count += 1
-                chemistry.save(update_fields=["swipe_count"])
-        except Exception as e:
-            pass  # Continue even if analytics fail
-
-        # 6. Match detection
-        match_created = False
-
-        if reaction == Swipe.LIKE:
-            try:
-                liked_users = Swipe.objects.filter(
-                    session=session,
-                    movie=movie,
-                    reaction=Swipe.LIKE
-                ).values_list("user_id", flat=True)
-
-                if len(set(liked_users)) == 2:
-                    Match.objects.create(session=session, movie=movie)
-                    
-                    # Update match stats safely
-                    try:
-                        stats, _ = SessionStats.objects.get_or_create(session=session)
-                        stats.total_matches += 1
-                        stats.save(update_fields=["total_matches"])
-                    except Exception:
-                        pass  # Continue even if stats fail
-
-                    # Update chemistry safely
-                    try:
-                        user_a, user_b = normalize_pair(session.host, session.guest)
-                        for tag in movie.tags.all():
-                            chemistry, _ = SessionChemistry.objects.get_or_create(
-                                user_a=user_a,
-                                user_b=user_b,
-                                tag=tag.name
-                            )
-                            chemistry.match_count += 1
-                            chemistry.last_matched_at = timezone.now()
-                            chemistry.save(update_fields=["match_count", "last_matched_at"])
-                    except Exception:
-                        pass  # Continue even if chemistry fails
-
-                    match_created = True
-
-                    # Emit WebSocket event safely
-                    try:
-                        channel_layer = get_channel_layer()
-                        if channel_layer:
-                            async_to_sync(channel_layer.group_send)(
-                                f"session_{session.id}",
-                                {
-                                    "type": "match_event",
-                                    "session_id": session.id,
-                                    "movie_id": movie.id,
-                                    "movie_title": movie.title or "Unknown Movie",
-                                }
-                            )
-                    except Exception:
-                        pass  # Continue even if WebSocket fails
-
-            except Exception as e:
-                pass  # Continue even if match detection fails
+        match_created = result.match_created
+
+        # 6. Deck bookkeeping, WebSocket events and analytics
+        publish_swipes(result.session, request.user.id, [result])
 
         # 7. Final response
         return Response(
@@ -829,6 +718,70 @@ class SwipeCreateView(APIView):
         )
 
 
+class SwipeBatchView(APIView):
+    """
+    Records an ordered list of swipes for one session.
+    Session state and membership are checked once; each swipe gets its own
+    result, so one duplicate does not reject the rest of the batch.
+    """
+
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @idempotent
+    def post(self, request):
+        serializer = SwipeBatchRequestSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {"success": False, "errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            session, items = record_swipes(
+                serializer.validated_data["session"],
+                request.user.id,
+                [(s["movie"], s["reaction"]) for s in serializer.validated_data["swipes"]],
+            )
+        except SwipeRejected as e:
+            return Response(
+                {"success": False, "error": e.error},
+                status=e.status_code
+            )
+        except Exception:
+            return Response(
+                {"success": False, "error": "Failed to record swipes"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        recorded = [item for item in items if item.recorded]
+        publish_swipes(session, request.user.id, recorded)
+
+        results = []
+        for item in items:
+            result = {"movie": item.movie_id, "success": item.recorded}
+            if item.recorded:
+                result["match"] = item.match_created
+                result["reaction"] = item.reaction
+            else:
+                result["error"] = item.error
+                result["status"] = item.status_code
+            results.append(result)
+
+        matches = sum(item.match_created for item in recorded)
+        return Response(
+            {
+                "success": bool(recorded),
+                "recorded": len(recorded),
+                "matches": matches,
+                "ask_to_end": matches > 0,
+                "results": results,
+            },
+            status=status.HTTP_201_CREATED if recorded else status.HTTP_409_CONFLICT
+        )
+
+
 class SwipeUndoView(APIView):
     """
     Undo a swipe within a 10-second window if no match exists.
@@ -872,6 +825,13 @@ class SwipeUndoView(APIView):
             )
 
         swipe.delete()
+
+        # The undone movie sits before the deck cursor; start over from the top
+        deck_store.rewind(swipe.session_id, swipe.movie_id)
+        bump_seen_version(swipe.session_id)
+        like_store.remove(swipe.session_id, swipe.user_id, swipe.movie_id)
+        session_counters.undo(swipe.session_id)
+
         return Response(
             {"success": True, "message": "Swipe undone"},
             status=status.HTTP_200_OK
@@ -881,6 +841,9 @@ class SwipeUndoView(APIView):
 class SwipeHistoryView(APIView):
     """
     Paginated swipe history for the logged-in user.
+
+    Reads core_swipe only: swipes of sessions moved to core_swipe_archive
+    by archive_swipes (over for --days, 90 by default) are left out.
     """
 
     authentication_classes = [TokenAuthentication]
@@ -972,6 +935,7 @@ class MovieSyncTMDBView(APIView):
         from .services.tmdb import get_popular_movies
 
         movies_created = 0
+        synced = []
         tmdb_data = get_popular_movies(page=1)
 
         for item in tmdb_data.get("results", []):
@@ -998,6 +962,17 @@ class MovieSyncTMDBView(APIView):
             if created:
                 movies_created += 1
 
+            synced.append(movie)
+
+        # Derive keyword/vibe tags once, at sync time
+        tag_movies(synced)
+
+        # Catalog changed: refresh this process's candidate index right away,
+        # other workers pick up the new version on their next request.
+        # Ranking every cold start bucket takes too long for the request.
+        candidate_index.rebuild(bump_catalog_version())
+        cold_start_builder.request()
+
         return Response(
             {
                 "success": True,
@@ -1007,10 +982,69 @@ class MovieSyncTMDBView(APIView):
             status=status.HTTP_200_OK
         )
 
+def recommendation_payload(session, user, timeline):
+    """
+    The next page of the user's deck for a checked session, or the
+    exhausted marker. Shared by the sync and async recommendation views.
+    """
+    with timeline.stage("candidates"):
+        # Already swiped/matched movies, refreshed incrementally per session
+        seen, total_swiped = seen_store.get(session.id)
+
+        total_swipes, total_matches = session_counters.get(session.id)
+
+    # Serve from the materialized deck; rank only when its inputs changed
+    deck = session_deck(session, user, seen, total_swipes, timeline)
+
+    candidates_left = deck.candidates_left(seen)
+
+    # ✅ CHECK: If no movies left, return empty
+    if candidates_left <= 0:
+        return {
+            "success": True,
+            "session_id": session.id,
+            "genre": session.genre.name,
+            "movies": [],
+            "exhausted": True,  # ✅ NEW FLAG
+            "total_swiped": total_swiped,
+            "total_matched": Match.objects.filter(session=session).count(),
+        }
+
+    # ✅ STEP 7: Return top 30 movies (adaptive batch)
+    if total_swipes < 10:
+        batch_size = 40  # Larger batch early
+    elif total_matches >= 3:
+        batch_size = 20  # Smaller batch if matching well
+    else:
+        batch_size = 30  # Default
+
+    top_ids = deck.page(seen, batch_size)
+
+    # Update exposure (buffered, flushed in bulk in the background)
+    with timeline.stage("exposure"):
+        exposure_buffer.add(top_ids)
+
+    with timeline.stage("serialize"):
+        movies = movies_in_order(top_ids)
+        movies_data = MovieSerializer(movies, many=True).data
+
+    return {
+        "success": True,
+        "session_id": session.id,
+        "genre": session.genre.name,
+        "movies": movies_data,
+        "exhausted": False,
+        "remaining_candidates": candidates_left - batch_size,  # ✅ NEW
+    }
+
+
 class RecommendationView(APIView):
     """
     Returns swipeable movie recommendations
     filtered by the session's selected genre.
+
+    Every stage is timed. Staff get the breakdown in a Server-Timing
+    header, and in the body with ?debug=timing.
     """
 
     authentication_classes = [TokenAuthentication]
@@ -1045,159 +1079,49 @@ class RecommendationView(APIView):
                 status=400
             )
 
-        # Get already swiped/matched movies
-        swiped_movie_ids = list(Swipe.objects.filter(
-            session=session
-        ).values_list("movie_id", flat=True))
+        timeline = Timeline("recommendations")
+        data = recommendation_payload(session, request.user, timeline)
 
-        matched_movie_ids = list(Match.objects.filter(
-            session=session
-        ).values_list("movie_id", flat=True))
+        return self.timed_response(request, timeline, data, status=status.HTTP_200_OK)
 
-        # ✅ STEP 1: Start with ALL movies in genre
-        base_qs = Movie.objects.filter(genres=session.genre)
+    def timed_response(self, request, timeline, data, **kwargs):
+        timeline.finish()
 
-        # ✅ STEP 2: Apply STRICT language filtering
-        if session.selected_languages:
-            base_qs = base_qs.filter(original_language__in=session.selected_languages)
-        else:
-            # Fallback to industry if no languages set
-            if session.industry == "bollywood":
-                base_qs = base_qs.filter(original_language__in=INDIAN_LANGUAGES)
-            elif session.industry == "hollywood":
-                base_qs = base_qs.filter(original_language="en")
-            # mixed = no language filter
-
-        # ✅ STEP 3: Get ALL candidates (not limited to 120 anymore)
-        all_candidate_ids = list(
-            base_qs
-            .exclude(id__in=swiped_movie_ids)
-            .exclude(id__in=matched_movie_ids)
-            .values_list("id", flat=True)
-            .distinct()
-        )
+        if not request.user.is_staff:
+            return Response(data, **kwargs)
 
-        # ✅ CHECK: If no movies left, return empty
-        if not all_candidate_ids:
-            return Response(
-                {
-                    "success": True,
-                    "session_id": session.id,
-                    "genre": session.genre.name,
-                    "movies": [],
-                    "exhausted": True,  # ✅ NEW FLAG
-                    "total_swiped": len(swiped_movie_ids),
-                    "total_matched": len(matched_movie_ids),
-                },
-                status=status.HTTP_200_OK
-            )
-
-        candidate_movies = Movie.objects.filter(id__in=all_candidate_ids)
-
-        # ✅ STEP 4: Extract combined preferences
-        combined_prefs = {}
-        if session.host_preferences and session.guest_preferences:
-            host_prefs = session.host_preferences
-            guest_prefs = session.guest_preferences
-            
-            # Find intersection (common ground)
-            combined_prefs = {
-                "mood": list(set(host_prefs.get("mood", [])) & set(guest_prefs.get("mood", []))),
-                "pace": list(set(host_prefs.get("pace", [])) & set(guest_prefs.get("pace", []))),
-                "vibe": list(set(host_prefs.get("vibe", [])) & set(guest_prefs.get("vibe", []))),
-                "era": list(set(host_prefs.get("era", [])) & set(guest_prefs.get("era", []))),
-            }
-            
-            # If no overlap, use union
-            for key in ["mood", "pace", "vibe", "era"]:
-                if not combined_prefs[key]:
-                    combined_prefs[key] = list(set(host_prefs.get(key, [])) | set(guest_prefs.get(key, [])))
-
-        # ✅ STEP 5: Score ALL movies
-        scored_movies = []
+        if request.query_params.get("debug") == "timing":
+            data["timing"] = timeline.as_dict()
 
-        for movie in candidate_movies:
-            score = 0
-            
-            # Preference matching (main signal)
-            if combined_prefs:
-                pref_score = calculate_preference_score(movie, combined_prefs)
-                
-                # ✅ STRICT FILTER: Skip movies with score < 10
-                if pref_score < 10:
-                    continue
-                
-                score += pref_score
-            
-            # Taste signal (user history)
-            for tag in movie.tags.all():
-                try:
-                    signal = UserTasteSignal.objects.get(user=request.user, tag=tag)
-                    score += (signal.like_count - signal.dislike_count) * 2
-                except UserTasteSignal.DoesNotExist:
-                    pass
-            
-            # Chemistry signal (pair history)
-            user_a, user_b = normalize_pair(session.host, session.guest)
-            for tag in movie.tags.all():
-                try:
-                    chem = SessionChemistry.objects.get(
-                        user_a=user_a, user_b=user_b, tag=tag.name
-                    )
-                    score += chem.match_count * 3
-                except SessionChemistry.DoesNotExist:
-                    pass
-
-            # Penalize overexposed movies
-            try:
-                exposure = MovieExposure.objects.get(movie=movie)
-                if exposure.exposed_count > 50:
-                    score -= 5
-            except MovieExposure.DoesNotExist:
-                pass
-
-            scored_movies.append((score, movie))
-
-        # ✅ STEP 6: Sort by score (best first)
-        scored_movies.sort(key=lambda x: x[0], reverse=True)
-
-        # ✅ STEP 7: Return top 30 movies (adaptive batch)
-        stats, _ = SessionStats.objects.get_or_create(session=session)
-        
-        if stats.total_swipes < 10:
-            batch_size = 40  # Larger batch early
-        elif stats.total_matches >= 3:
-            batch_size = 20  # Smaller batch if matching well
-        else:
-            batch_size = 30  # Default
+        response = Response(data, **kwargs)
+        response["Server-Timing"] = timeline.server_timing()
+        return response
 
-        movies = [m for (score, m) in scored_movies[:batch_size]]
 
-        # Update exposure
-        for movie in movies:
-            try:
-                exposure, _ = MovieExposure.objects.get_or_create(movie=movie)
-                exposure.exposed_count += 1
-                exposure.last_exposed_at = timezone.now()
-                exposure.save(update_fields=["exposed_count", "last_exposed_at"])
-            except Exception:
-                pass
+class MetricsView(APIView):
+    """
+    Aggregate stage timings and gauges for this worker process (staff only).
+    """
 
-        serializer = MovieSerializer(movies, many=True)
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAdminUser]
 
+    def get(self, request):
         return Response(
-            {
-                "success": True,
-                "session_id": session.id,
-                "genre": session.genre.name,
-                "movies": serializer.data,
-                "exhausted": False,
-                "remaining_candidates": len(all_candidate_ids) - batch_size,  # ✅ NEW
-            },
+            {"success": True, **metrics.snapshot()},
             status=status.HTTP_200_OK
         )
 
 
+def genres_with_languages(languages):
+    """
+    Genres with at least one movie in one of the languages, answered from
+    the candidate index instead of joining the catalog per request.
+    """
+    candidate_index.ensure_current()
+    return Genre.objects.filter(id__in=candidate_index.genre_ids(languages)).order_by("name")
+
+
 class GenreListView(APIView):
     authentication_classes = []
     permission_classes = []
@@ -1228,9 +1152,7 @@ class GenreListView(APIView):
             else:  # hollywood
                 languages = ["en"]
 
-            genres = Genre.objects.filter(
-                movie__original_language__in=languages
-            ).distinct().order_by("name")
+            genres = genres_with_languages(languages)
 
         return Response(
             {
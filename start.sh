@@ -6,6 +6,9 @@ echo "▶️ Starting Flick backend..."
 echo "🧱 Running database migrations..."
 python manage.py migrate --noinput
 
+echo "🗂️ Creating swipe partitions ahead of new sessions..."
+python manage.py partition_swipes
+
 # Optional one-time / manual syncs
 # These should NOT run on every deploy
 if [[ "$SYNC_TMDB_GENRES" == "true" ]]; then
@@ -21,6 +24,10 @@ fi
 echo "🎨 Collecting static files..."
 python manage.py collectstatic --noinput
 
+# uvicorn runs WEB_CONCURRENCY workers. More than one needs Redis
+# (REDIS_URL, or CHANNEL_REDIS_HOSTS with a Redis CHANNEL_LAYER) for
+# idempotency keys, catalog versions and match detection; without it
+# settings.py raises ImproperlyConfigured and the migrate step above fails.
 echo "🚀 Launching ASGI server..."
 exec uvicorn backend.asgi:application \
   --host 0.0.0.0 \